@@ -1,52 +1,304 @@
+import math
+
 import numpy as np
-import scipy.special as sp
 
-def angular_wavefunction(l,m,theta,phi):
+from Physics.cache import state_cache
+from Physics.grid import Grid
+from Physics.precision import resolve_dtype
+
+def lm_index(l, m):
+    """
+    Position of the real orbital (l, m) in the stacked output of angular_wavefunction_all.
+    Orbitals are stored shell by shell: (0,0), (1,-1), (1,0), (1,1), (2,-2), ...
+    Args:
+        l (int): azimuthal quantum number
+        m (int): magnetic quantum number
+    Returns:
+        int: l*l + l + m
+    """
+    return l * l + l + m
+
+@state_cache(maxsize=1024)
+def _legendre_coefficients(l, m):
+    """
+    Constants of the normalized Legendre recurrence for column m, up to degree l.
+    Cached per (l, m) since they never change and cost a pile of sqrt calls.
+    Returns:
+        tuple: (diag, a, b) where diag is the constant in P~_mm = diag * sin^m(theta),
+        and a[j], b[j] are the coefficients of the step that produces degree j (j >= m+2).
+    """
+    diag = 1 / math.sqrt(4 * math.pi)
+    for i in range(1, m + 1):
+        diag *= math.sqrt((2 * i + 1) / (2 * i))
+    a = [0.0] * (l + 1)
+    b = [0.0] * (l + 1)
+    for j in range(m + 2, l + 1):
+        a[j] = math.sqrt((4 * j * j - 1) / (j * j - m * m))
+        b[j] = math.sqrt(((j - 1) ** 2 - m * m) / (4 * (j - 1) ** 2 - 1))
+    return diag, tuple(a), tuple(b)
+
+def _legendre_all(l_max, x, s):
+    """
+    Fully normalized associated Legendre functions P~_lm(cos theta) for 0 <= m <= l <= l_max.
+    P~_lm already contains sqrt((2l+1)/4pi * (l-m)!/(l+m)!) and NO Condon-Shortley phase,
+    so Y_l0 = P~_l0 and the real m != 0 harmonics are sqrt(2) * P~_l|m| * cos/sin(|m| phi).
+    Args:
+        l_max (int): largest l
+        x (numpy.ndarray): cos(theta)
+        s (numpy.ndarray): sin(theta)
+    Returns:
+        numpy.ndarray: shape (l_max+1, l_max+1) + x.shape indexed [l, m] (zero for m > l)
     """
-    This function computes  normalized Real Spherical Harmonic Y_lm(Real) 
-    using scipy spherical function and a phase shifting exponential factor
 
-    Here the function take arguments in the order in l , m ,theta and phi as 
-    in physics convention .In Physics's convention: theta is polar fucntion(0-pi) and 
-    phi is azimuthal (0-2*pi) whereas Scipy's convention: theta is azimuthal(0-2*pi) 
-    and phi is polar(0-pi)
+    '''The recurrences (all of them only use normalized values, so nothing blows up):
+         P~_00 = 1/sqrt(4pi)
+         P~_mm = sqrt((2m+1)/(2m)) * sin(theta) * P~_(m-1)(m-1)             (diagonal)
+         P~_(m+1)m = sqrt(2m+3) * cos(theta) * P~_mm                          (first step off it)
+         P~_lm = a_lm * (cos(theta) * P~_(l-1)m - b_lm * P~_(l-2)m)           (walk up in l)
+       with a_lm = sqrt((4l^2-1)/(l^2-m^2)) and b_lm = sqrt(((l-1)^2-m^2)/(4(l-1)^2-1)).
+       This is the standard "normalized" form used in geodesy codes, it is stable to l in the thousands.'''
+    shape = np.broadcast(x, s).shape
+    P = np.zeros((l_max + 1, l_max + 1) + shape, dtype=x.dtype)
+
+    diag = np.full(shape, 1 / math.sqrt(4 * math.pi), dtype=x.dtype)
+    for m in range(l_max + 1):
+        if m > 0:
+            diag = math.sqrt((2 * m + 1) / (2 * m)) * s * diag
+        P[m, m] = diag
+        if m < l_max:
+            P[m + 1, m] = math.sqrt(2 * m + 3) * x * diag
+        _, a, b = _legendre_coefficients(l_max, m)
+        for l in range(m + 2, l_max + 1):
+            P[l, m] = a[l] * (x * P[l - 1, m] - b[l] * P[l - 2, m])
+    return P
+
+def _legendre(l, m, x, s):
+    """
+    Single fully normalized associated Legendre function P~_lm(cos theta), m >= 0.
+    Same recurrence as _legendre_all but only walks the one column we need.
+    """
+    diag, a, b = _legendre_coefficients(l, m)
+    shape = np.broadcast(x, s).shape
+    P_prev = None
+    P_curr = np.full(shape, diag, dtype=x.dtype)
+    if m > 0:
+        P_curr = P_curr * s ** m
+    for j in range(m + 1, l + 1):
+        if P_prev is None:
+            P_prev, P_curr = P_curr, math.sqrt(2 * m + 3) * x * P_curr
+        else:
+            P_prev, P_curr = P_curr, a[j] * (x * P_curr - b[j] * P_prev)
+    return P_curr
+
+def _azimuthal_all(m_max, phi, dtype=np.float64):
+    """
+    cos(m*phi) and sin(m*phi) for m = 0 .. m_max from a single cos/sin call.
+    Uses the angle-addition recurrence (a rotation by phi each step).
+    Returns:
+        tuple: (cos_table, sin_table), each of shape (m_max+1,) + phi.shape
+    """
+    phi = np.asarray(phi, dtype=dtype)
+    c1, s1 = np.cos(phi), np.sin(phi)
+    cos_m = np.empty((m_max + 1,) + phi.shape, dtype=dtype)
+    sin_m = np.empty((m_max + 1,) + phi.shape, dtype=dtype)
+    cos_m[0], sin_m[0] = 1.0, 0.0
+    for m in range(1, m_max + 1):
+        cos_m[m] = cos_m[m - 1] * c1 - sin_m[m - 1] * s1
+        sin_m[m] = sin_m[m - 1] * c1 + cos_m[m - 1] * s1
+    return cos_m, sin_m
+
+def angular_wavefunction(l,m,theta,phi=None,dtype=None):
+    """
+    This function computes  normalized Real Spherical Harmonic Y_lm(Real)
+    using the normalized associated Legendre recurrence and cos/sin(m*phi)
+
+    Here the function take arguments in the order in l , m ,theta and phi as
+    in physics convention .In Physics's convention: theta is polar fucntion(0-pi) and
+    phi is azimuthal (0-2*pi) (Scipy's sph_harm used the opposite order, we don't use it anymore)
      Args:
         m (int): magnetic quantum number
         l (int): azimuthal quantum number
-        theta (numpy.ndarray): polar angle
-        phi (int): azimuthal angle
+        theta (numpy.ndarray or Grid): polar angle, or a Grid (then leave phi out)
+        phi (numpy.ndarray): azimuthal angle (may be left out for m = 0, which doesn't depend on it)
+        dtype: float64 or float32 (default: the Grid's dtype, else float64)
     Returns:
-        numpy.ndarray: wavefunction angular 
+        numpy.ndarray: wavefunction angular
         component
      Mathematical Transformation:
       We convert Complex Y_lm (Eigenfunctions of Lz) to Real Y_lm (Cartesian orbitals).
       Complex: Y_lm ~ P_lm(cos theta) * e^(i*m*phi)
       Real:  Linear combinations of +m and -m to isolate sin(m*phi) and cos(m*phi).
     """
-    
+    if l < 0 or abs(m) > l:
+        raise ValueError(f"Physics violation: need |m| <= l. You passed l={l}, m={m}")
+
+    '''Why no sph_harm anymore?
+       sph_harm built the complex Y_lm and we threw half of it away with np.real/np.imag.
+       It is also deprecated (and gone in new SciPy). The real orbital is just
+       P~_l|m|(cos theta) times cos or sin of |m|*phi, so we compute exactly that.'''
+    if isinstance(theta, Grid):
+        return _angular_on_grid(l, m, theta, resolve_dtype(dtype, default=theta.dtype))
+
+    if phi is None:
+        # np.asarray(None) would quietly turn into NaN
+        if m != 0:
+            raise ValueError(f"angular_wavefunction needs phi for m != 0 (or a Grid as theta). You passed m={m}")
+        phi = 0.0
+    dtype = resolve_dtype(dtype)
+    theta = np.asarray(theta, dtype=dtype)
+    phi = np.asarray(phi, dtype=dtype)
+    P = _legendre(l, abs(m), np.cos(theta), np.sin(theta))
+
     #Case 1: m=0(z-oriented orbitals like p_z ,d_z^2). Here Y_l0 is real.The exponential term is e^0=1
     if m==0:
-        Y_Complex = sp.sph_harm(m,l,phi,theta)
-        return np.real(Y_Complex)
-    
+        return P * np.ones_like(phi)# keeps the theta/phi grid shape
+
     elif m > 0:
-        '''Case 2: m>0(Cosine-like orbitals likep_z, d_x^2-y^2).
-        Here we want the real part of complex harmonic.
+        '''Case 2: m>0(Cosine-like orbitals like p_x, d_x^2-y^2).
         formula: Y_real = sqrt(2) * (-1)^m * Re(Y_l^m).
-        (-1)^m is Condon-Shortley phase.It ensures the orbitals lobes 
+        (-1)^m is Condon-Shortley phase.It ensures the orbitals lobes
         align with positive axes(Some Quantum chemistry convention)
-        P.S: I'm a Physics major , i don't know much about Condon-Shortley 
+        P~ has no Condon-Shortley phase in it, so the two (-1)^m cancel
+        and we are left with sqrt(2) * P~ * cos(m*phi).
+        P.S: I'm a Physics major , i don't know much about Condon-Shortley
         phase . I saw it in a textbook'''
-        
-        Y_Complex = sp.sph_harm(m,l,phi,theta)
-        return np.sqrt(2)*np.real(Y_Complex)*((-1)**m)# taking real part for the cosine component.
+        return math.sqrt(2) * P * np.cos(m * phi)# the cosine component.
 
     else:
         '''Case:3 m<0 (sine-like orbitals like p_y, d_xy)
-        Here we want the imaginary complex harmonic 
         formula: Y_real = sqrt(2) * (-1)^m * Im(Y_l^|m|)
-        We use abs(m) because Y_l^-m and Y_l^m share the same
-        Calculating from positive m is numerically safer and standard.'''
-        
-        Y_pos=sp.sph_harm(abs(m),l,phi,theta)
-        return np.sqrt(2)*np.imag(Y_pos)*((-1)**m)# np.imag to extract sine compoenent.
\ No newline at end of file
+        We use abs(m) because Y_l^-m and Y_l^m share the same Legendre part.
+        Same cancellation of phases as above, so it is sqrt(2) * P~ * sin(|m|*phi).'''
+        return math.sqrt(2) * P * np.sin(abs(m) * phi)# the sine compoenent.
+
+def _angular_on_grid(l, m, grid, dtype):
+    """
+    angular_wavefunction on a Grid: cos/sin(theta) and cos/sin(m*phi) come from the grid's cache.
+    """
+    P = _legendre(l, abs(m), grid.cos_theta.astype(dtype, copy=False),
+                  grid.sin_theta.astype(dtype, copy=False))
+    if m == 0:
+        return np.broadcast_to(P, grid.shape).copy()
+    cos_m, sin_m = grid.azimuthal(abs(m))
+    trig = (cos_m if m > 0 else sin_m).astype(dtype, copy=False)
+    return np.broadcast_to(math.sqrt(2) * P * trig, grid.shape).copy()
+
+def angular_wavefunction_all(l_max, theta, phi=None, dtype=None):
+    """
+    Computes every Real Spherical Harmonic Y_lm with l <= l_max in one sweep.
+    Same conventions as angular_wavefunction, but all (l, m) share one Legendre
+    recurrence and one cos/sin(m*phi) recurrence, all in real arithmetic.
+    Args:
+        l_max (int): largest azimuthal quantum number
+        theta (numpy.ndarray or Grid): polar angle, or a Grid (then leave phi out)
+        phi (numpy.ndarray): azimuthal angle
+        dtype: float64 or float32 (default: the Grid's dtype, else float64)
+    Returns:
+        numpy.ndarray: shape ((l_max+1)**2,) + broadcast shape of theta/phi.
+        Orbital (l, m) is at index lm_index(l, m).
+    """
+    if l_max < 0:
+        raise ValueError(f"l_max must be >= 0. You passed l_max={l_max}")
+
+    if isinstance(theta, Grid):
+        grid = theta
+        dtype = resolve_dtype(dtype, default=grid.dtype)
+        P = _legendre_all(l_max, grid.cos_theta.astype(dtype, copy=False),
+                          grid.sin_theta.astype(dtype, copy=False))
+        tables = [grid.azimuthal(m) for m in range(l_max + 1)]
+        cos_m = [c for c, _ in tables]
+        sin_m = [s for _, s in tables]
+        shape = grid.shape
+    else:
+        if phi is None:
+            raise ValueError("angular_wavefunction_all needs phi (or a Grid as theta)")
+        dtype = resolve_dtype(dtype)
+        theta = np.asarray(theta, dtype=dtype)
+        P = _legendre_all(l_max, np.cos(theta), np.sin(theta))
+        cos_m, sin_m = _azimuthal_all(l_max, phi, dtype)
+        shape = np.broadcast(theta, np.asarray(phi)).shape
+
+    Y = np.empty(((l_max + 1) ** 2,) + shape, dtype=dtype)
+    root2 = math.sqrt(2)
+    for l in range(l_max + 1):
+        Y[lm_index(l, 0)] = P[l, 0]
+        for m in range(1, l + 1):
+            Y[lm_index(l, m)] = root2 * P[l, m] * cos_m[m]
+            Y[lm_index(l, -m)] = root2 * P[l, m] * sin_m[m]
+    return Y
+
+def rotation_blocks(l_max, rotation):
+    """
+    How the real Y_lm of each l mix under a rotation of space.
+    For the rotation matrix R, the block U_l of shell l satisfies
+        Y_lm(R^T r) = sum_m' U_l[m', m] * Y_lm'(r)
+    (rows and columns in the lm_index order m = -l .. l), i.e. U_l is the rotation
+    operator written in the real orbitals of shell l. Every U_l is orthogonal.
+    Args:
+        l_max (int): largest l
+        rotation (numpy.ndarray): 3x3 rotation matrix
+    Returns:
+        list of numpy.ndarray: U_0 .. U_l_max, U_l has shape (2l+1, 2l+1)
+    """
+    rotation = np.asarray(rotation, dtype=np.float64)
+
+    '''No Wigner-d formulas needed: Y_lm(R^T r) is again a combination of the Y_lm'
+       of the same l, so we evaluate both sides on a few random directions and
+       solve for the coefficients (least squares, exact up to rounding since
+       the system is consistent). Twice as many points as unknowns keeps it well conditioned.'''
+    points = np.random.default_rng(0).normal(size=(3, 4 * l_max + 16))
+    points /= np.linalg.norm(points, axis=0)
+    moved = rotation.T @ points
+    Y = angular_wavefunction_all(l_max, Grid(*points, points.shape[1:]))
+    Y_moved = angular_wavefunction_all(l_max, Grid(*moved, moved.shape[1:]))
+    blocks = []
+    for l in range(l_max + 1):
+        rows = slice(l * l, (l + 1) * (l + 1))
+        blocks.append(np.linalg.lstsq(Y[rows].T, Y_moved[rows].T, rcond=None)[0])
+    return blocks
+
+def real_solid_harmonic(l, m, x, y, z, dtype=np.float64):
+    """
+    Computes r^l * Y_lm (real) straight from Cartesian coordinates.
+    No arccos, no atan2, no division by r: it is a polynomial in x, y, z.
+    Args:
+        l (int): azimuthal quantum number
+        m (int): magnetic quantum number
+        x, y, z (numpy.ndarray): Cartesian coordinates (broadcastable)
+        dtype: float64 (default) or float32
+    Returns:
+        numpy.ndarray: r^l * Y_lm(theta, phi) with the same conventions as angular_wavefunction
+    """
+    if l < 0 or abs(m) > l:
+        raise ValueError(f"Physics violation: need |m| <= l. You passed l={l}, m={m}")
+
+    '''The trick.
+       r^l * Y_lm = r^l * P~_l|m|(cos theta) * cos/sin(|m| phi).
+       The sin(theta)^|m| * cos/sin(|m| phi) * r^|m| piece is Re/Im of (x + iy)^|m|,
+       which we build with real multiplies:
+           C_m = x*C_(m-1) - y*S_(m-1),   S_m = x*S_(m-1) + y*C_(m-1)
+       What is left, r^(l-|m|) * P~_lm / sin^m, obeys the SAME Legendre recurrence as before
+       with cos(theta) -> z and the two-steps-back term picking up r^2:
+           Q_lm = a_lm * (z * Q_(l-1)m - b_lm * r^2 * Q_(l-2)m)'''
+    dtype = resolve_dtype(dtype)
+    x, y, z = (np.asarray(v, dtype=dtype) for v in (x, y, z))
+    mu = abs(m)
+    shape = np.broadcast(x, y, z).shape
+
+    C, S = np.ones(shape, dtype=dtype), np.zeros(shape, dtype=dtype)
+    for i in range(1, mu + 1):
+        C, S = x * C - y * S, x * S + y * C
+
+    diag, a, b = _legendre_coefficients(l, mu)
+    Q_prev = None
+    Q_curr = np.full(shape, diag, dtype=dtype)
+    r2 = x * x + y * y + z * z if l > mu + 1 else None
+    for j in range(mu + 1, l + 1):
+        if Q_prev is None:
+            Q_prev, Q_curr = Q_curr, math.sqrt(2 * mu + 3) * z * Q_curr
+        else:
+            Q_prev, Q_curr = Q_curr, a[j] * (z * Q_curr - b[j] * r2 * Q_prev)
+
+    if m == 0:
+        return Q_curr
+    return math.sqrt(2) * Q_curr * (C if m > 0 else S)
@@ -0,0 +1,168 @@
+import json
+import os
+
+import numpy as np
+
+from Physics.radial import _log_normalization
+from Physics.tables import RadialTable, install_atlas
+
+'''The orbital atlas.
+   Every fresh process re-does the same warm-up: build the radial tables,
+   work out the normalization constants, find the nodes. For a few thousand
+   states that is seconds of work per process, and our workers restart a lot.
+   The atlas does that work once and writes everything into one file:
+
+     [ magic (8 bytes) | header length (8 bytes) | JSON header | padding | arrays ... ]
+
+   The header says where each array starts, its dtype and its shape.
+   Every array starts on a 64-byte boundary, so after one np.memmap of the
+   whole file each array is just a view into it. Nothing is read or copied
+   until a lookup actually touches it, and every process that opens the same
+   file shares the same pages through the OS page cache.'''
+
+MAGIC = b'HATLAS01'
+_ALIGN = 64
+
+def build_atlas(path, n_max, rtol=1e-7, a0=1.0):
+    """
+    Builds radial tables, normalization constants and node positions for every
+    state up to n_max and writes them to a single atlas file.
+    Args:
+        path (str): where to write the atlas
+        n_max (int): largest principal quantum number
+        rtol (float): error target of the radial tables (see RadialTable)
+        a0 (float): Bohr radius
+    Returns:
+        str: the path written
+    """
+    if n_max < 1:
+        raise ValueError(f"n_max must be >= 1. You passed n_max={n_max}")
+
+    '''Step 1: Do all the work in memory.
+       Arrays get queued with their (future) offset. The offsets are relative
+       to the start of the data block, which we only know once the header is written.'''
+    arrays, states, offset = [], [], 0
+    def queue(array):
+        nonlocal offset
+        array = np.ascontiguousarray(array)
+        entry = [offset, array.dtype.str, list(array.shape)]
+        arrays.append((offset, array))
+        offset += -(-array.nbytes // _ALIGN) * _ALIGN
+        return entry
+
+    import scipy.special as sp  # imported here so loading an atlas never touches SciPy
+    for n in range(1, n_max + 1):
+        for l in range(n):
+            table = RadialTable(n, l, rtol=rtol, a0=a0)
+            k = n - l - 1
+            nodes = sp.roots_genlaguerre(k, 2 * l + 1)[0] * (n * a0 / 2) if k > 0 else np.zeros(0)
+            state = {'n': n, 'l': l, 'r_max': table.r_max, 'peak': table.peak,
+                     'bucket': table._bucket, 'log_normalization': _log_normalization(n, l, a0),
+                     'knots': queue(table.knots), 'coefficients': queue(table.coefficients),
+                     'nodes': queue(nodes)}
+            if table._bucket_first is not None:
+                state['bucket_first'] = queue(table._bucket_first)
+            states.append(state)
+
+    '''Step 2: Write it out.
+       We write to a temporary name and rename at the end, so a worker that
+       opens the atlas while it is being rebuilt sees either the old file or
+       the new one, never half a file.'''
+    header = json.dumps({'n_max': n_max, 'rtol': rtol, 'a0': a0, 'states': states}).encode()
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // _ALIGN) * _ALIGN
+    temporary = f"{path}.tmp{os.getpid()}"
+    with open(temporary, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header)).tobytes())
+        f.write(header)
+        for array_offset, array in arrays:
+            f.seek(data_start + array_offset)
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(temporary, path)
+    return path
+
+class Atlas:
+    """
+    A loaded atlas: every array is a read-only view into one memory map.
+    Get one with load_atlas(path).
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an orbital atlas (bad magic bytes)")
+            header_length = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+            header = json.loads(f.read(header_length))
+        self.path = path
+        self.n_max, self.rtol, self.a0 = header['n_max'], header['rtol'], header['a0']
+        self._data_start = -(-(len(MAGIC) + 8 + header_length) // _ALIGN) * _ALIGN
+        self._raw = np.memmap(path, dtype=np.uint8, mode='r')
+        self._states = {(s['n'], s['l']): s for s in header['states']}
+        self._tables = {}
+
+    def _array(self, entry):
+        # View of one stored array inside the memory map (no copy)
+        offset, dtype, shape = entry
+        dtype = np.dtype(dtype)
+        start = self._data_start + offset
+        count = int(np.prod(shape, dtype=np.int64))
+        return self._raw[start:start + count * dtype.itemsize].view(dtype).reshape(shape)
+
+    def _state(self, n, l):
+        if (n, l) not in self._states:
+            raise KeyError(f"State ({n},{l}) is not in the atlas (n_max={self.n_max})")
+        return self._states[(n, l)]
+
+    def covers(self, n, l, rtol=None, a0=1.0):
+        """
+        True if the atlas has (n, l) at least as accurate as rtol, for this a0.
+        """
+        return ((n, l) in self._states and a0 == self.a0
+                and (rtol is None or self.rtol <= rtol))
+
+    def table(self, n, l):
+        """
+        The RadialTable of (n, l), served straight from the memory map.
+        """
+        if (n, l) not in self._tables:
+            s = self._state(n, l)
+            bucket_first = self._array(s['bucket_first']) if 'bucket_first' in s else None
+            self._tables[(n, l)] = RadialTable.from_arrays(
+                n, l, self._array(s['knots']), self._array(s['coefficients']), bucket_first,
+                s['bucket'], s['r_max'], s['peak'], self.rtol, self.a0)
+        return self._tables[(n, l)]
+
+    def nodes(self, n, l):
+        """
+        Radii of the n-l-1 radial nodes of R_nl (sorted, absolute radii for the atlas's a0,
+        same units as r everywhere else, not divided by a0).
+        """
+        return self._array(self._state(n, l)['nodes'])
+
+    def log_normalization(self, n, l):
+        """
+        log of the radial normalization constant N_nl.
+        """
+        return self._state(n, l)['log_normalization']
+
+    def states(self):
+        """
+        Every (n, l) in the atlas.
+        """
+        return list(self._states)
+
+def load_atlas(path, install=True):
+    """
+    Opens an atlas with np.memmap (near-instant, whatever its size).
+    Args:
+        path (str): atlas file written by build_atlas
+        install (bool): let radial_table (and so the 'table' radial backend)
+                        serve its tables from this atlas
+    Returns:
+        Atlas
+    """
+    atlas = Atlas(path)
+    if install:
+        install_atlas(atlas)
+    return atlas
@@ -0,0 +1,47 @@
+import functools
+
+'''The per-state constant cache.
+   A lot of the setup work in radial.py and angular.py only depends on the
+   quantum numbers (normalization constants, recurrence coefficients), not on the grid.
+   An interactive session asks for the same few hundred states over and over,
+   so we remember those constants instead of recomputing them every call.
+
+   functools.lru_cache does the heavy lifting: it is bounded (least recently used
+   entries get dropped), it is safe to call from several threads, and it already
+   counts hits and misses. This module just keeps a list of every cached function
+   so the stats can be read (and the caches cleared) from one place.'''
+
+_registry = {}
+
+def state_cache(maxsize=1024):
+    """
+    Decorator: memoize a per-state constant function with a bounded LRU cache.
+    Arguments must be hashable (ints, floats, dtype names).
+    Args:
+        maxsize (int): how many distinct states to keep
+    """
+    def decorator(func):
+        cached = functools.lru_cache(maxsize=maxsize)(func)
+        _registry[f"{func.__module__}.{func.__name__}"] = cached
+        return cached
+    return decorator
+
+def cache_stats():
+    """
+    Hit/miss statistics for every per-state cache.
+    Returns:
+        dict: name -> {'hits', 'misses', 'size', 'maxsize'}
+    """
+    stats = {}
+    for name, cached in _registry.items():
+        info = cached.cache_info()
+        stats[name] = {'hits': info.hits, 'misses': info.misses,
+                       'size': info.currsize, 'maxsize': info.maxsize}
+    return stats
+
+def clear_caches():
+    """
+    Empties every per-state cache (and resets its counters).
+    """
+    for cached in _registry.values():
+        cached.cache_clear()
@@ -0,0 +1,269 @@
+import numpy as np
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.csgraph
+import scipy.sparse.linalg
+
+from Physics.angular import rotation_blocks
+from Physics.transitions import COMPONENTS, basis_index, basis_states, dipole_matrices
+from Physics.wavepacket import Wavepacket
+
+'''Hydrogen in a laser field, inside a truncated basis.
+   Write Psi(t) = sum_k c_k(t) |n l m>_k over every real orbital with n <= n_max.
+   In atomic units (length gauge, field along a unit vector e) the TDSE for the c's is
+       i dc/dt = (H0 + F(t) D) c,     H0 = diag(-1 / 2n^2),   D = e . (x, y, z)
+   H0 is diagonal and D is the sparse dipole matrix from Physics.transitions,
+   so the whole problem is two fixed matrices and one number F(t) per step.
+
+   Two integrators:
+     'split'  (default) Strang splitting with the matrices built ONCE:
+                  c <- exp(-i H0 dt/2) exp(-i F dt D) exp(-i H0 dt/2) c
+              exp(-i H0 dt/2) is a vector of phases. For exp(-i F dt D) we
+              diagonalize D one time, D = V diag(lambda) V^T, and then every step
+              is two sparse products and a vector of phases, whatever F is.
+              That is only cheap if V is sparse. z keeps m (and parity), so
+              D_z splits into small independent blocks and so does V. A field
+              along any other direction is turned into the z axis first (see
+              DrivenAtom._diagonalize), otherwise e.g. e = (1,1,1) couples all
+              2870 states of n_max = 20 into one dense block.
+              Exactly unitary, error O(dt^2).
+     'krylov' exp(-i dt H(t_mid)) c with scipy.sparse.linalg.expm_multiply each step.
+              No eigenvectors, so it works for any basis, but it is slower per step.
+
+   P.S: A truncated basis has no continuum, so there is no ionization here.
+        Keep the field weak (F << 1/n_max^4) or take the results as a sketch.'''
+
+def oscillating_field(amplitude, omega, phase=0.0, ramp=0.0):
+    """
+    F(t) = amplitude * cos(omega t + phase), switched on over 'ramp' (a sin^2 turn-on).
+    Args:
+        amplitude (float): peak field in atomic units (1 a.u. = 5.14e11 V/m)
+        omega (float): angular frequency in Hartree (1s-2p resonance is 0.375)
+        phase (float): carrier phase
+        ramp (float): turn-on time in atomic units (0 = sudden)
+    Returns:
+        callable: F(t) taking a float or an array
+    """
+    def field(t):
+        t = np.asarray(t, dtype=np.float64)
+        envelope = 1.0 if ramp <= 0 else np.sin(0.5 * np.pi * np.clip(t / ramp, 0, 1)) ** 2
+        return amplitude * envelope * np.cos(omega * t + phase)
+    return field
+
+class DrivenAtom:
+    """
+    The matrices of a driven hydrogen atom in the basis n <= n_max, built once and reused.
+    """
+
+    def __init__(self, n_max, polarization='z', a0=1.0):
+        """
+        Args:
+            n_max (int): largest principal quantum number in the basis
+            polarization (str or array): 'x', 'y', 'z' or a 3-vector (normalized for you)
+            a0 (float): Bohr radius
+        """
+        if n_max < 1:
+            raise ValueError(f"n_max must be at least 1. You passed n_max={n_max}")
+        if isinstance(polarization, str):
+            if polarization not in COMPONENTS:
+                raise ValueError(f"Unknown polarization '{polarization}'. Use 'x', 'y', 'z' or a vector.")
+            polarization = [float(c == polarization) for c in COMPONENTS]
+        e = np.asarray(polarization, dtype=np.float64)
+        if e.shape != (3,) or not np.any(e):
+            raise ValueError("polarization must be 'x', 'y', 'z' or a non-zero 3-vector")
+        e = e / np.linalg.norm(e)
+
+        self.n_max = n_max
+        self.a0 = a0
+        self.polarization = e
+        self.states = basis_states(n_max)
+        self.energies = -0.5 / self.states[:, 0].astype(np.float64) ** 2
+        used = [c for c, w in zip(COMPONENTS, e) if w != 0]
+        matrices = dipole_matrices(n_max, used, a0)
+        self.dipole = sum(w * matrices[c] for c, w in zip(COMPONENTS, e) if w != 0).tocsr()
+        self._eigen = None
+
+    def _diagonalize(self):
+        """
+        D_z = V diag(lambda) V^T, block by block, plus the rotation U, U^T (None for a z field).
+        Done once, on first use.
+        """
+        if self._eigen is not None:
+            return self._eigen
+
+        '''Step 1: Point z along the field.
+           With R a rotation taking z to e, D = e . r is D_z rotated:
+               D = U D_z U^T,   U = the rotation written in the real orbitals
+           U only mixes the m's of one (n, l) (blocks from angular.rotation_blocks), and
+           H0 only depends on n, so U commutes with H0. So the steps run on D_z
+           (small blocks) and _split_steps rotates into and out of that frame
+           once per stretch of steps.'''
+        rotation = None
+        matrix = self.dipole
+        if not np.allclose(self.polarization, [0.0, 0.0, 1.0]):
+            matrix = dipole_matrices(self.n_max, ['z'], self.a0)['z'].tocsr()
+            rotation = self._rotation_matrix()
+
+        '''Step 2: The blocks are the connected pieces of the coupling graph
+           (two states are in the same block if D_z links them, directly or through others).
+           Each block is a small dense symmetric matrix for scipy.linalg.eigh.'''
+        count, label = scipy.sparse.csgraph.connected_components(matrix, directed=False)
+        dense_blocks = []
+        values = np.zeros(len(self.states))
+        for block in range(count):
+            members = np.flatnonzero(label == block)
+            sub = matrix[members][:, members].toarray()
+            lam, vec = scipy.linalg.eigh(sub)
+            values[members] = lam
+            dense_blocks.append((members, vec))
+
+        rows = np.concatenate([np.repeat(m, len(m)) for m, _ in dense_blocks])
+        cols = np.concatenate([np.tile(m, len(m)) for m, _ in dense_blocks])
+        data = np.concatenate([v.ravel() for _, v in dense_blocks])
+        '''Stored complex on purpose: scipy multiplies a complex matrix by a complex
+           vector about twice as fast as a real one (no mixed-type conversion per step).'''
+        V = scipy.sparse.csr_matrix((data.astype(np.complex128), (rows, cols)), shape=self.dipole.shape)
+        self._eigen = (values, V, V.T.tocsr(), rotation)
+        return self._eigen
+
+    def _rotation_matrix(self):
+        """
+        U as a sparse matrix over the whole basis, for a rotation that takes z onto the polarization.
+        """
+        e = self.polarization
+        axis = np.cross([0.0, 0.0, 1.0], e)
+        sine, cosine = np.linalg.norm(axis), e[2]
+        if sine < 1e-12:
+            R = np.diag([1.0, -1.0, -1.0])  # e = -z: half a turn about x
+        else:
+            # Rodrigues' formula, turning by the angle between z and e about z x e
+            kx, ky, kz = axis / sine
+            K = np.array([[0, -kz, ky], [kz, 0, -kx], [-ky, kx, 0]])
+            R = np.eye(3) + sine * K + (1 - cosine) * K @ K
+
+        blocks = rotation_blocks(self.n_max - 1, R)
+        rows, cols, data = [], [], []
+        for n in range(1, self.n_max + 1):
+            for l in range(n):
+                first = basis_index(n, l, -l)
+                index = first + np.arange(2 * l + 1)
+                rows.append(np.repeat(index, len(index)))
+                cols.append(np.tile(index, len(index)))
+                data.append(blocks[l].ravel())
+        U = scipy.sparse.csr_matrix((np.concatenate(data).astype(np.complex128),
+                                     (np.concatenate(rows), np.concatenate(cols))), shape=self.dipole.shape)
+        return U, U.T.tocsr()
+
+    def initial_state(self, n, l, m):
+        """
+        Coefficient vector with all the population in (n, l, m).
+        """
+        if not (1 <= n <= self.n_max and 0 <= l < n and abs(m) <= l):
+            raise ValueError(f"({n}, {l}, {m}) is not in the basis n <= {self.n_max}")
+        c = np.zeros(len(self.states), dtype=np.complex128)
+        c[basis_index(n, l, m)] = 1.0
+        return c
+
+    def propagate(self, initial, times, field, dt=None, method='split'):
+        """
+        Solves i dc/dt = (H0 + F(t) D) c and samples c at the requested times.
+        Args:
+            initial (array or tuple): start coefficients, or an (n, l, m) to start from
+            times (array): increasing sample times in atomic units, starting at t0
+            field (callable): F(t) in atomic units (see oscillating_field)
+            dt (float): largest time step (default: 1/16 of the fastest Bohr period in the basis)
+            method (str): 'split' or 'krylov'
+        Returns:
+            dict:
+                'times': the sample times,
+                'coefficients': complex array (samples, states),
+                'populations': |c|^2, shape (samples, states),
+                'shell_populations': summed over l and m, shape (samples, n_max)
+        """
+        if method not in ('split', 'krylov'):
+            raise ValueError(f"Unknown method '{method}'. Use 'split' or 'krylov'.")
+        if isinstance(initial, tuple):
+            initial = self.initial_state(*initial)
+        c = np.array(initial, dtype=np.complex128).ravel()
+        if c.shape != (len(self.states),):
+            raise ValueError(f"Need {len(self.states)} initial coefficients, got {c.shape[0]}")
+        times = np.asarray(times, dtype=np.float64).ravel()
+        if np.any(np.diff(times) < 0):
+            raise ValueError("times must be increasing")
+        if dt is None:
+            span = self.energies.max() - self.energies.min()
+            dt = 2 * np.pi / (16 * span) if span > 0 else 1.0
+
+        '''Step 1: March from one sample time to the next.
+           Each gap is cut into equal steps no longer than dt, and the field is
+           read at the middle of every step (midpoint rule, second order like the splitting).'''
+        samples = np.empty((len(times), len(c)), dtype=np.complex128)
+        if len(times):
+            samples[0] = c
+        for i in range(1, len(times)):
+            gap = times[i] - times[i - 1]
+            steps = max(1, int(np.ceil(gap / dt)))
+            h = gap / steps
+            midpoints = times[i - 1] + (np.arange(steps) + 0.5) * h
+            strengths = np.broadcast_to(np.asarray(field(midpoints), dtype=np.float64), midpoints.shape)
+            if method == 'split':
+                c = self._split_steps(c, h, strengths)
+            else:
+                c = self._krylov_steps(c, h, strengths)
+            samples[i] = c
+
+        '''Step 2: What people actually look at.'''
+        populations = samples.real ** 2 + samples.imag ** 2
+        shell_populations = np.zeros((len(times), self.n_max))
+        np.add.at(shell_populations.T, self.states[:, 0] - 1, populations.T)
+        return {'times': times, 'coefficients': samples,
+                'populations': populations, 'shell_populations': shell_populations}
+
+    def _split_steps(self, c, h, strengths):
+        """
+        Strang steps with the field values 'strengths', all of length h.
+        """
+        values, V, Vt, rotation = self._diagonalize()
+        if rotation is not None:
+            c = rotation[1] @ c  # into the frame where the field is along z
+        half = np.exp(-0.5j * h * self.energies)
+        c = half * c
+        for k, F in enumerate(strengths):
+            c = V @ (np.exp(-1j * h * F * values) * (Vt @ c))
+            '''Two half steps of H0 back to back are one full step,
+               so only the very last one is a half step.'''
+            c = (half * half if k + 1 < len(strengths) else half) * c
+        return c if rotation is None else rotation[0] @ c
+
+    def _krylov_steps(self, c, h, strengths):
+        """
+        One expm_multiply per step with the frozen midpoint Hamiltonian.
+        """
+        H0 = scipy.sparse.diags(self.energies).tocsr()
+        for F in strengths:
+            c = scipy.sparse.linalg.expm_multiply(-1j * h * (H0 + F * self.dipole), c)
+        return c
+
+def density_frames(atom, result, grid=None, min_population=1e-8, **wavepacket_options):
+    """
+    Turns a propagate() result into |Psi(t)|^2 frames through Physics.wavepacket.
+    Only states that ever reach 'min_population' are put on the grid.
+    Args:
+        atom (DrivenAtom): the atom that produced the result
+        result (dict): what propagate returned
+        grid (Grid): where to draw (default: Wavepacket's XZ slice)
+        min_population (float): drop states below this everywhere in time
+        wavepacket_options: passed on to Wavepacket (range_a0, resolution, dtype, ...)
+    Yields:
+        tuple: (t, density) with density of shape grid.shape
+    """
+    keep = np.flatnonzero(result['populations'].max(axis=0) >= min_population)
+    states = [tuple(s) for s in atom.states[keep]]
+    coefficients = result['coefficients'][:, keep]
+
+    '''The c's already carry the e^(-iEt) phases, so each frame is the packet
+       with that frame's coefficients, looked at at t = 0 (no extra phase).'''
+    packet = Wavepacket(states, coefficients[0], grid=grid, normalize=False, **wavepacket_options)
+    for t, c in zip(result['times'], coefficients):
+        packet.set_coefficients(c, normalize=False)
+        yield t, packet.density(0.0)
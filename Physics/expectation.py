@@ -0,0 +1,151 @@
+import numpy as np
+
+'''Expectation values without integrating anything.
+   For hydrogen the radial moments <r^k> have exact answers, so sampling
+   radial_wavefunction on a linspace and running a quadrature is a waste
+   (and gets worse as n grows and the grid has to follow the nodes).
+
+   The tool is Kramers' recursion (a0 = 1):
+     (k+1)/n^2 <r^k> - (2k+1) <r^(k-1)> + k/4 [(2l+1)^2 - k^2] <r^(k-2)> = 0
+   Seeded with <r^0> = 1 and <r^-1> = 1/n^2 it walks up to any positive k,
+   and seeded with <r^-1> and <r^-2> = 1/(n^3 (l+1/2)) it walks down.
+   Every step is a couple of array operations over all the states at once,
+   so thousands of (n, l) pairs cost about as much as one.'''
+
+def _state_arrays(n, l):
+    # Broadcast n and l to float arrays and check the quantum numbers once for all states
+    n, l = np.broadcast_arrays(np.asarray(n), np.asarray(l))
+    if np.any(n < 1) or np.any(l < 0) or np.any(l >= n):
+        raise ValueError("Physics violation: need n >= 1 and 0 <= l < n for every state")
+    return n.astype(np.float64), l.astype(np.float64)
+
+def radial_moment(n, l, k, a0=1.0):
+    """
+    Exact <r^k> of the hydrogen state (n, l), for any integer k.
+    Args:
+        n (int or array): principal quantum number(s)
+        l (int or array): azimuthal quantum number(s), broadcast against n
+        k (int): the power (negative is fine)
+        a0 (float): Bohr radius
+    Returns:
+        numpy.ndarray (or float for scalar input): <r^k> in units of a0^k.
+        inf where the integral diverges (k <= -2l - 3, e.g. <r^-3> for s states).
+    """
+    if int(k) != k:
+        raise ValueError(f"k must be an integer, got {k}")
+    k = int(k)
+    n, l = _state_arrays(n, l)
+    n2 = n * n
+    c = (2 * l + 1) ** 2
+
+    '''Step 1: The two seeds.
+       <r^0> = 1 (normalization) and <r^-1> = 1/n^2 (virial theorem).
+       Positive k only ever needs these two.'''
+    if k >= 0:
+        prev2, prev1 = 1 / n2, np.ones_like(n)
+        for j in range(1, k + 1):
+            # Kramers solved for the top term
+            moment = n2 / (j + 1) * ((2 * j + 1) * prev1 - j / 4 * (c - j * j) * prev2)
+            prev2, prev1 = prev1, moment
+        return _result(prev1 * a0 ** k)
+
+    '''Step 2: Going down.
+       Kramers at j = 0 has no <r^-2> term, so <r^-2> needs its own closed form
+       (1 / (n^3 (l + 1/2))). Below that the recursion is solved for the
+       bottom term instead. The divisor j/4 [(2l+1)^2 - j^2] hits 0 exactly
+       where the integral stops converging, those states get inf.'''
+    moment = 1 / n2
+    if k <= -2:
+        upper, moment = moment, 1 / (n2 * n * (l + 0.5))
+        for j in range(-1, k + 1, -1):
+            lower_coeff = j / 4 * (c - j * j)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                below = ((2 * j + 1) * moment - (j + 1) / n2 * upper) / lower_coeff
+            upper, moment = moment, below
+        moment = np.where(k >= -2 * l - 2, moment, np.inf)
+    return _result(moment * float(a0) ** k)
+
+def _result(values):
+    # Hand back a plain float when the caller passed plain ints
+    return values.item() if values.ndim == 0 else values
+
+def radial_spread(n, l, a0=1.0):
+    """
+    Width of the radial distribution: sqrt(<r^2> - <r>^2).
+    Args:
+        n, l (int or array): quantum numbers (broadcast)
+        a0 (float): Bohr radius
+    """
+    n, l = _state_arrays(n, l)
+    '''Both moments are closed form, so the difference is too:
+       <r^2> - <r>^2 = (n^2 (n^2 + 2) - l^2 (l+1)^2) / 4'''
+    variance = (n * n * (n * n + 2) - (l * (l + 1)) ** 2) / 4
+    return _result(np.sqrt(variance) * a0)
+
+def most_probable_radius(n, l, a0=1.0, tol=1e-12, max_iter=50):
+    """
+    Where P(r) = r^2 |R_nl|^2 is largest (the peak of plot_radial's curve).
+    For l = n-1 this is exactly n^2 a0 (the Bohr orbit), for other l there is no
+    closed form, so it is found with a vectorized, safeguarded Newton iteration.
+    Args:
+        n, l (int or array): quantum numbers (broadcast)
+        a0 (float): Bohr radius
+        tol (float): relative tolerance on r
+        max_iter (int): Newton step limit
+    """
+    n, l = _state_arrays(n, l)
+    ll = l * (l + 1)
+
+    '''Step 1: Where to look.
+       For hydrogen the outermost lobe of u(r) = r R(r) is always the tallest,
+       and it sits just inside the classical turning point
+         r_out = n^2 (1 + sqrt(1 - l(l+1)/n^2)).
+       Near r_out the radial equation looks like the Airy equation
+       u'' = F (r - r_out) u, whose first maximum is 1.0188 F^(-1/3) inside r_out
+       and whose last node is 2.3381 F^(-1/3) inside. That gives a first guess and
+       a bracket for the peak.'''
+    r_out = n * n * (1 + np.sqrt(1 - ll / (n * n)))
+    F = 2 / r_out**2 - 2 * ll / r_out**3
+    delta = F ** (-1 / 3)
+    hi = r_out
+    lo = np.maximum(r_out - 2.3381 * delta, r_out * 1e-3)
+    r = np.clip(r_out - 1.0188 * delta, lo, hi)
+
+    '''Step 2: Newton on h = (log u)'.
+       The peak is where h = 0. The radial equation gives h for free as a Riccati
+       equation, h' = l(l+1)/r^2 - 2/r + 1/n^2 - h^2, and inside the turning point
+       h' < 0, so h only crosses 0 once in the lobe. When Newton would jump
+       out of the bracket we bisect instead.'''
+    for _ in range(max_iter):
+        h = _log_derivative(n, l, r)
+        hi = np.where(h < 0, r, hi)
+        lo = np.where(h > 0, r, lo)
+        dh = ll / (r * r) - 2 / r + 1 / (n * n) - h * h
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = r - h / dh
+        step = np.where((step > lo) & (step < hi), step, (lo + hi) / 2)
+        done = np.abs(step - r) <= tol * r
+        r = step
+        if np.all(done):
+            break
+    return _result(r * a0)
+
+def _log_derivative(n, l, r):
+    """
+    d/dr log(r R_nl(r)) for arrays of states, in units of a0 = 1.
+    Uses the ratio t_j = L_j / L_(j-1) of the Laguerre recurrence, which never overflows.
+    """
+    k = n - l - 1
+    alpha = 2 * l + 1
+    rho = 2 * r / n
+
+    '''x L_k' = k L_k - (k + alpha) L_(k-1), so L'/L only needs the last ratio t_k.
+       States with different k run in the same loop, each one just stops
+       updating once it reaches its own k.'''
+    ratio = 1 + alpha - rho  # t_1 = L_1 / L_0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for j in range(1, int(k.max(initial=0))):
+            update = (2 * j + 1 + alpha - rho - (j + alpha) / ratio) / (j + 1)
+            ratio = np.where(j < k, update, ratio)
+        laguerre_term = np.where(k > 0, (k - (k + alpha) / ratio) / rho, 0.0)
+    return (l + 1) / r - 1 / n + (2 / n) * laguerre_term
@@ -0,0 +1,249 @@
+import math
+import os
+
+import numpy as np
+
+from Physics.angular import _legendre_all, lm_index
+from Physics.cache import state_cache
+
+'''Angular coupling coefficients.
+   Any integral of a product of angular_wavefunction states (transition
+   elements, Stark matrices, rotations, products of orbitals) ends up as
+     Wigner 3j symbols   ( l1 l2 l3 ; m1 m2 m3 )
+     real Gaunt numbers  G = integral Y_l1m1 Y_l2m2 Y_l3m3 dOmega   (our real Y_lm)
+   Working them out inside a hot loop is what makes those workloads slow.
+   This module has vectorized generators for both and a GauntTable that
+   precomputes them once (optionally saved to disk), after which a lookup is
+   plain array indexing.'''
+
+def _log_factorial(x):
+    # log(x!) on arrays (x >= 0 wherever it is used)
+    import scipy.special as sp
+    return sp.gammaln(np.asarray(x, dtype=np.float64) + 1)
+
+def wigner_3j(j1, j2, j3, m1, m2, m3):
+    """
+    Wigner 3j symbols for integer j's, vectorized (all arguments broadcast).
+    Args:
+        j1, j2, j3 (int or array): angular momenta
+        m1, m2, m3 (int or array): projections
+    Returns:
+        numpy.ndarray (or float): the 3j symbols, 0 wherever a selection rule fails
+    """
+
+    '''The Racah formula:
+         (j1 j2 j3; m1 m2 m3) = (-1)^(j1-j2-m3) sqrt(Delta * prod (j_i +- m_i)!)
+                                * sum_t (-1)^t / [ t! (j3-j2+t+m1)! (j3-j1+t-m2)!
+                                                   (j1+j2-j3-t)! (j1-t-m1)! (j2-t+m2)! ]
+       with Delta = (j1+j2-j3)! (j1-j2+j3)! (-j1+j2+j3)! / (j1+j2+j3+1)!.
+       Every term goes through log-gamma so nothing overflows, and all the
+       entries run the t loop together (masked once they run out of terms).
+       P.S: The sum alternates, so when ALL three j's are large (~100 each) it
+       loses digits. With one small j (the rank of an operator, which is what the
+       GauntTable stores) there are at most 2j+1 terms and it is accurate.'''
+    j1, j2, j3, m1, m2, m3 = np.broadcast_arrays(*(np.asarray(v, dtype=np.int64)
+                                                  for v in (j1, j2, j3, m1, m2, m3)))
+    valid = ((m1 + m2 + m3 == 0) & (np.abs(m1) <= j1) & (np.abs(m2) <= j2) & (np.abs(m3) <= j3)
+             & (j3 >= np.abs(j1 - j2)) & (j3 <= j1 + j2))
+    # Park invalid entries on (0 0 0; 0 0 0) so every factorial argument stays >= 0
+    j1, j2, j3, m1, m2, m3 = (np.where(valid, v, 0) for v in (j1, j2, j3, m1, m2, m3))
+
+    log_prefactor = 0.5 * (_log_factorial(j1 + j2 - j3) + _log_factorial(j1 - j2 + j3)
+                           + _log_factorial(-j1 + j2 + j3) - _log_factorial(j1 + j2 + j3 + 1)
+                           + _log_factorial(j1 + m1) + _log_factorial(j1 - m1)
+                           + _log_factorial(j2 + m2) + _log_factorial(j2 - m2)
+                           + _log_factorial(j3 + m3) + _log_factorial(j3 - m3))
+    t_min = np.maximum.reduce([np.zeros_like(j1), j2 - j3 - m1, j1 - j3 + m2])
+    t_max = np.minimum.reduce([j1 + j2 - j3, j1 - m1, j2 + m2])
+
+    total = np.zeros(j1.shape)
+    for i in range(int(np.max(t_max - t_min, initial=0)) + 1):
+        t = t_min + i
+        active = t <= t_max
+        t = np.where(active, t, t_min)
+        log_denominator = (_log_factorial(t) + _log_factorial(j3 - j2 + t + m1)
+                           + _log_factorial(j3 - j1 + t - m2) + _log_factorial(j1 + j2 - j3 - t)
+                           + _log_factorial(j1 - t - m1) + _log_factorial(j2 - t + m2))
+        term = np.exp(log_prefactor - log_denominator) * np.where(t % 2 == 0, 1.0, -1.0)
+        total += np.where(active, term, 0.0)
+
+    result = np.where(valid, total * np.where((j1 - j2 - m3) % 2 == 0, 1.0, -1.0), 0.0)
+    return result.item() if result.ndim == 0 else result
+
+def _phi_integral(m1, m2, m3):
+    """
+    c_m1 c_m2 c_m3 * integral_0^2pi T_m1 T_m2 T_m3 dphi for the real harmonics
+    (T_m = cos(m phi) for m >= 0, sin(|m| phi) for m < 0, c_0 = 1, c_m = sqrt(2)).
+    """
+
+    '''Writing the product of three cos/sin as a sum of single cosines, only
+       the terms whose frequency adds to 0 survive the phi integral:
+         all cos:      pi/2 * [ (a1=a2+a3) + (a2=a1+a3) + (a3=a1+a2) + (all 0) ]
+         one cos a_i,  pi/2 * [ (sine = sum of the other two) counted +1,
+         two sin:                (a_i = sum of the sines) counted -1 ]
+         odd number of sines: 0 (the integrand is odd in phi)
+       where (condition) is 1 if it holds and 0 if not.'''
+    m = np.broadcast_arrays(*(np.asarray(v, dtype=np.int64) for v in (m1, m2, m3)))
+    a = [np.abs(v) for v in m]
+    sine = [v < 0 for v in m]
+    sines = sine[0].astype(int) + sine[1] + sine[2]
+    total_a = a[0] + a[1] + a[2]
+    count = np.where(sines == 0, (total_a == 0).astype(float), 0.0)
+    for i in range(3):
+        sign = np.where(sine[i] | (sines == 0), 1.0, -1.0)
+        count = count + sign * (2 * a[i] == total_a)
+    weight = np.ones(m[0].shape)
+    for v in m:
+        weight = weight * np.where(v == 0, 1.0, math.sqrt(2))
+    return np.where(sines % 2 == 0, math.pi / 2 * count * weight, 0.0)
+
+def real_gaunt(l1, m1, l2, m2, l3, m3, chunk=2**16):
+    """
+    Real Gaunt coefficients: integral Y_l1m1 Y_l2m2 Y_l3m3 dOmega with the real Y_lm
+    of angular_wavefunction. Vectorized, any l (all arguments broadcast).
+    Args:
+        l1, m1, l2, m2, l3, m3 (int or array): the three orbitals
+        chunk (int): entries per block of the theta quadrature (bounds memory)
+    Returns:
+        numpy.ndarray (or float): the coefficients, 0 wherever a selection rule fails
+    """
+    l1, m1, l2, m2, l3, m3 = np.broadcast_arrays(*(np.asarray(v, dtype=np.int64)
+                                                  for v in (l1, m1, l2, m2, l3, m3)))
+    phi_part = _phi_integral(m1, m2, m3)
+    keep = ((phi_part != 0) & (np.abs(m1) <= l1) & (np.abs(m2) <= l2) & (np.abs(m3) <= l3)
+            & ((l1 + l2 + l3) % 2 == 0) & (l3 >= np.abs(l1 - l2)) & (l3 <= l1 + l2))
+    result = np.zeros(l1.shape)
+    if not keep.any():
+        return result.item() if result.ndim == 0 else result
+
+    '''The theta part is a product of three P~ (times nothing else). Once the phi
+       rules hold, the sin(theta) powers pair up and it is a polynomial in
+       cos(theta) of degree <= l1+l2+l3, so Gauss-Legendre with (l1+l2+l3)/2 + 1
+       points gets it exactly. One Legendre table covers every entry.'''
+    ls = [v[keep] for v in (l1, l2, l3)]
+    mus = [np.abs(v[keep]) for v in (m1, m2, m3)]
+    l_top = int(max(v.max() for v in ls))
+    x, w = np.polynomial.legendre.leggauss(int((ls[0] + ls[1] + ls[2]).max()) // 2 + 1)
+    P = _legendre_all(l_top, x, np.sqrt(1 - x * x))
+    theta_part = np.empty(len(ls[0]))
+    for start in range(0, len(theta_part), chunk):
+        part = slice(start, start + chunk)
+        product = (P[ls[0][part], mus[0][part]] * P[ls[1][part], mus[1][part]]
+                   * P[ls[2][part], mus[2][part]])
+        theta_part[part] = product @ w
+    result[keep] = theta_part * phi_part[keep]
+    return result.item() if result.ndim == 0 else result
+
+class GauntTable:
+    """
+    Precomputed 3j symbols and real Gaunt coefficients for coupling an orbital
+    (l1, m1) through a rank-k piece (k, q) to (l3, m3), with l1 <= l_max and
+    k <= k_max. Lookups are array indexing, vectorized over all arguments.
+
+    Storage (only what the selection rules allow):
+      - (l1, m1) is packed with lm_index, so there is no room wasted on |m1| > l1
+      - m3 = -m1-q for the 3j symbols, so there is no m3 axis at all
+      - for the Gaunt numbers l3 only runs over l1-k, l1-k+2, ..., l1+k (parity),
+        and m3 is fixed up to a choice between |m3| = |m1|+|q| and ||m1|-|q||
+        (its sign follows from the cos/sin types), so that is a 2-wide axis
+    Build one with gaunt_table(l_max, k_max) (cached, and saved to disk if given a path).
+    """
+
+    def __init__(self, l_max, k_max, three_j, gaunt):
+        self.l_max, self.k_max = l_max, k_max
+        self.three_j = three_j  # [lm_index(l1, m1), k, l3 - l1 + k, q + k_max]
+        self.gaunt = gaunt      # [lm_index(l1, m1), k, (l3 - l1 + k) / 2, q + k_max, c], c = 0 (sum) or 1 (difference)
+
+    @classmethod
+    def build(cls, l_max, k_max):
+        """
+        Works out the whole table (vectorized, seconds for l_max=100, k_max=4).
+        """
+        K = k_max
+        lm1, k, d, q = np.meshgrid(np.arange((l_max + 1) ** 2), np.arange(K + 1), np.arange(2 * K + 1),
+                                   np.arange(-K, K + 1), indexing='ij')
+        l1 = np.floor(np.sqrt(lm1)).astype(np.int64)
+        m1 = lm1 - l1 * l1 - l1
+        l3 = l1 - k + d
+        usable = (d <= 2 * k) & (np.abs(q) <= k) & (l3 >= 0)
+        three_j = np.where(usable, wigner_3j(l1, k, np.where(usable, l3, 0), m1, q, -m1 - q), 0.0)
+
+        '''For the real Gaunt numbers only every other d can be non-zero.
+           m3 takes its size from the c axis and its sign from the rule
+           "m3 is sine-type iff exactly one of m1, q is".'''
+        l1, m1, k, q, l3 = (v[:, :, ::2] for v in (l1, m1, k, q, l3))
+        usable = usable[:, :, ::2]
+        l3 = np.where(usable, l3, 0)
+        gaunt = np.zeros(l1.shape + (2,))
+        sine = (m1 < 0) ^ (q < 0)
+        for c, size in enumerate((np.abs(m1) + np.abs(q), np.abs(np.abs(m1) - np.abs(q)))):
+            m3 = np.where(sine, -size, size)
+            gaunt[..., c] = np.where(usable, real_gaunt(l1, m1, k, q, l3, m3), 0.0)
+        return cls(l_max, k_max, three_j, gaunt)
+
+    def _index(self, l1, m1, k, q, l3):
+        # Table position (lm, k, d, q) plus a mask of the entries the table covers
+        l1, m1, k, q, l3 = np.broadcast_arrays(*(np.asarray(v, dtype=np.int64)
+                                                for v in (l1, m1, k, q, l3)))
+        if np.any((l1 > self.l_max) | (k > self.k_max)):
+            raise ValueError(f"GauntTable covers l1 <= {self.l_max} and k <= {self.k_max}")
+        d = l3 - l1 + k
+        inside = ((l1 >= 0) & (np.abs(m1) <= l1) & (k >= 0) & (np.abs(q) <= k)
+                  & (d >= 0) & (d <= 2 * k))
+        index = tuple(np.where(inside, v, 0) for v in (lm_index(l1, m1), k, d, q + self.k_max))
+        return index, inside
+
+    def lookup_3j(self, l1, m1, k, q, l3, m3):
+        """
+        (l1 k l3; m1 q m3) from the table (0 where a selection rule fails).
+        """
+        index, inside = self._index(l1, m1, k, q, l3)
+        inside = inside & (np.asarray(m1) + np.asarray(q) + np.asarray(m3) == 0)
+        result = np.where(inside, self.three_j[index], 0.0)
+        return result.item() if result.ndim == 0 else result
+
+    def lookup_gaunt(self, l1, m1, k, q, l3, m3):
+        """
+        integral Y_l1m1 Y_kq Y_l3m3 dOmega (real harmonics) from the table.
+        """
+        (lm, k_index, d, q_index), inside = self._index(l1, m1, k, q, l3)
+        m1, q, m3 = (np.asarray(v, dtype=np.int64) for v in (m1, q, m3))
+        size, plus, minus = np.abs(m3), np.abs(m1) + np.abs(q), np.abs(np.abs(m1) - np.abs(q))
+        sine = (m1 < 0) ^ (q < 0)
+        inside = inside & (d % 2 == 0) & ((m3 < 0) == sine) & ((size == plus) | (size == minus))
+        c = np.where(size == plus, 0, 1)
+        result = np.where(inside, self.gaunt[lm, k_index, d // 2, q_index, c], 0.0)
+        return result.item() if result.ndim == 0 else result
+
+    def save(self, path):
+        """
+        Writes the table to an .npz file.
+        """
+        np.savez(path, l_max=self.l_max, k_max=self.k_max, three_j=self.three_j, gaunt=self.gaunt)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a table written by save().
+        """
+        with np.load(path) as data:
+            return cls(int(data['l_max']), int(data['k_max']), data['three_j'], data['gaunt'])
+
+@state_cache(maxsize=4)
+def gaunt_table(l_max=100, k_max=4, path=None):
+    """
+    The GauntTable for (l_max, k_max): kept in memory after the first call, and
+    if 'path' is given, read from that .npz file (or built and written there).
+    Args:
+        l_max (int): largest l1 in the table
+        k_max (int): largest coupling rank k (1 = dipole, 2 = quadrupole, ...)
+        path (str): optional on-disk cache file
+    """
+    if path is not None and os.path.exists(path):
+        table = GauntTable.load(path)
+        if table.l_max >= l_max and table.k_max >= k_max:
+            return table
+    table = GauntTable.build(l_max, k_max)
+    if path is not None:
+        table.save(path)
+    return table
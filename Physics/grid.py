@@ -0,0 +1,161 @@
+import functools
+
+import numpy as np
+
+from Physics.precision import resolve_dtype
+
+class Grid:
+    """
+    A set of sample points that many orbitals get evaluated on.
+    Works out the geometry (r, cos/sin theta, cos/sin(m*phi), masks) the first time
+    someone asks for it and keeps it, so rendering 50 orbitals on the same grid
+    only pays for the coordinate transforms once.
+
+    Build one with Grid.xz_slice, Grid.box or Grid.shell, then hand it to
+    radial_wavefunction / angular_wavefunction / wavefunction in place of r or theta.
+    """
+
+    def __init__(self, x, y, z, shape, dtype=np.float64):
+        '''The coordinates are stored "broadcastable", not as full meshes.
+           e.g. for a slice x is a row (1, N) and z a column (N, 1).
+           Everything derived from them broadcasts up to the full shape
+           only when it has to. The dtype of the grid is the precision the
+           Physics functions work in when they are handed this grid.'''
+        self.dtype = resolve_dtype(dtype)
+        self.x = np.asarray(x, dtype=self.dtype)
+        self.y = np.asarray(y, dtype=self.dtype)
+        self.z = np.asarray(z, dtype=self.dtype)
+        self.shape = tuple(shape)
+        self._azimuthal = None
+        self._masks = {}
+
+    @classmethod
+    def xz_slice(cls, range_a0, resolution, y=0.0, dtype=np.float64):
+        """
+        Square cut through the atom in the XZ plane (what plot_density draws).
+        Same layout as x, z = np.meshgrid(lin, lin): rows are z, columns are x.
+        Args:
+            range_a0 (float): half width of the square (Bohr radii)
+            resolution (int): points per side
+            y (float): height of the plane along y (0 = through the nucleus)
+            dtype: float64 (default) or float32
+        """
+        lin = np.linspace(-range_a0, range_a0, resolution)
+        grid = cls(lin[np.newaxis, :], y, lin[:, np.newaxis], (resolution, resolution), dtype)
+        grid.axis = lin
+        return grid
+
+    @classmethod
+    def box(cls, range_a0, resolution, dtype=np.float64):
+        """
+        Full 3-D cube of side 2*range_a0, indexed [z, y, x].
+        Args:
+            range_a0 (float): half width of the cube (Bohr radii)
+            resolution (int): points per side
+            dtype: float64 (default) or float32
+        """
+        lin = np.linspace(-range_a0, range_a0, resolution)
+        grid = cls(lin[np.newaxis, np.newaxis, :], lin[np.newaxis, :, np.newaxis],
+                   lin[:, np.newaxis, np.newaxis], (resolution,) * 3, dtype)
+        grid.axis = lin
+        return grid
+
+    @classmethod
+    def shell(cls, resolution, radius=1.0, dtype=np.float64):
+        """
+        Sphere of fixed radius on a (phi, theta) mesh (what plot_3d draws).
+        Same layout as theta, phi = np.meshgrid(theta_axis, phi_axis).
+        Args:
+            resolution (int): points along theta and along phi
+            radius (float): radius of the shell
+            dtype: float64 (default) or float32
+        """
+        theta = np.linspace(0, np.pi, resolution)[np.newaxis, :]
+        phi = np.linspace(0, 2 * np.pi, resolution)[:, np.newaxis]
+        grid = cls(radius * np.sin(theta) * np.cos(phi), radius * np.sin(theta) * np.sin(phi),
+                   radius * np.cos(theta), (resolution, resolution), dtype)
+
+        '''On a shell we already know the angles, so we fill the caches directly
+           instead of going through x, y, z. They stay 1-D (row/column) which
+           keeps every angular evaluation separable.'''
+        grid.theta, grid.phi = theta, phi
+        grid.__dict__['r'] = np.full((1, 1), radius, dtype=grid.dtype)
+        grid.__dict__['cos_theta'] = np.cos(theta).astype(grid.dtype)
+        grid.__dict__['sin_theta'] = np.sin(theta).astype(grid.dtype)
+        grid.__dict__['cos_phi'] = np.cos(phi).astype(grid.dtype)
+        grid.__dict__['sin_phi'] = np.sin(phi).astype(grid.dtype)
+        return grid
+
+    @functools.cached_property
+    def r2(self):
+        """x^2 + y^2 + z^2"""
+        return self.x * self.x + self.y * self.y + self.z * self.z
+
+    @functools.cached_property
+    def r(self):
+        """Distance from the nucleus."""
+        return np.sqrt(self.r2)
+
+    @functools.cached_property
+    def _rho_xy(self):
+        # Distance from the z axis (r * sin theta)
+        return np.sqrt(self.x * self.x + self.y * self.y)
+
+    @functools.cached_property
+    def cos_theta(self):
+        """
+        cos(theta) = z / r, no arccos needed.
+        At the nucleus theta is undefined, we use theta = 0 there (R_nl takes care of the rest).
+        """
+        r = self.r
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(r > 0, self.z / r, 1.0)
+
+    @functools.cached_property
+    def sin_theta(self):
+        """sin(theta) = sqrt(x^2 + y^2) / r"""
+        r = self.r
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(r > 0, self._rho_xy / r, 0.0)
+
+    @functools.cached_property
+    def cos_phi(self):
+        """cos(phi) = x / sqrt(x^2 + y^2) (phi = 0 on the z axis)"""
+        rho = self._rho_xy
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(rho > 0, self.x / rho, 1.0)
+
+    @functools.cached_property
+    def sin_phi(self):
+        """sin(phi) = y / sqrt(x^2 + y^2)"""
+        rho = self._rho_xy
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(rho > 0, self.y / rho, 0.0)
+
+    def azimuthal(self, m):
+        """
+        cos(m*phi) and sin(m*phi) on this grid, for m >= 0.
+        The table is grown with the angle-addition recurrence and kept,
+        so asking for m=3 after m=2 costs one step.
+        Returns:
+            tuple: (cos(m*phi), sin(m*phi))
+        """
+        if self._azimuthal is None:
+            self._azimuthal = ([np.ones_like(self.cos_phi)], [np.zeros_like(self.sin_phi)])
+        cos_m, sin_m = self._azimuthal
+        c1, s1 = self.cos_phi, self.sin_phi
+        while len(cos_m) <= m:
+            c, s = cos_m[-1], sin_m[-1]
+            cos_m.append(c * c1 - s * s1)
+            sin_m.append(s * c1 + c * s1)
+        return cos_m[m], sin_m[m]
+
+    def mask(self, r_max):
+        """
+        Boolean mask of the points with r <= r_max (cached per r_max).
+        Handy to skip the empty corners of a box where psi is negligible.
+        """
+        key = float(r_max)
+        if key not in self._masks:
+            self._masks[key] = np.broadcast_to(self.r <= key, self.shape)
+        return self._masks[key]
@@ -0,0 +1,93 @@
+import numpy as np
+
+'''Precision modes.
+   Everything in Physics runs in float64 by default. Passing dtype=np.float32
+   halves the memory traffic of every grid-sized temporary, which is what limits
+   the speed of big density maps and volumes. The per-state constants
+   (log normalization, recurrence coefficients) are always float64, only the
+   grid arrays change precision.'''
+
+SUPPORTED_DTYPES = (np.dtype(np.float32), np.dtype(np.float64))
+
+def resolve_dtype(dtype=None, default=np.float64):
+    """
+    Turns a dtype argument into a numpy dtype, refusing anything we don't have kernels for.
+    Args:
+        dtype: None, np.float32/np.float64, or their names ('float32', 'f4', ...)
+        default: used when dtype is None
+    Returns:
+        numpy.dtype
+    """
+    resolved = np.dtype(default if dtype is None else dtype)
+    if resolved not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported dtype {resolved}. Use float32 or float64.")
+    return resolved
+
+def error_bound(n, l, dtype, r_max=None, a0=1.0, values=None):
+    """
+    A-priori bound on |psi(dtype) - psi(float64)| relative to the peak |psi|.
+    Args:
+        n, l (int): quantum numbers (m does not change the bound)
+        dtype: precision the grid is evaluated in
+        r_max (float): largest radius on the grid (default 5*n^2*a0, the plot_density range)
+        a0 (float): Bohr radius
+        values (array, optional): the computed output; if any of it is inf/NaN there is no bound
+    Returns:
+        float or None: relative error bound (0 for float64, it IS the reference),
+        None when values has non-finite entries
+    """
+    if values is not None and not np.all(np.isfinite(values)):
+        return None
+    dtype = resolve_dtype(dtype)
+    if dtype == np.float64:
+        return 0.0
+    if r_max is None:
+        r_max = 5 * n * n * a0
+
+    '''Where the rounding comes from (eps = machine epsilon of dtype):
+       - the Laguerre recurrence: n-l-1 steps, a few roundings each (about 4 eps per step)
+       - the Legendre recurrence: up to l steps, same story
+       - exp(-rho/2): the argument is rounded, so the result is off by about (rho/2)*eps
+       - a handful of final multiplies
+       These add up (worst case, no cancellation luck), so it is a bound, not a typical error.'''
+    eps = float(np.finfo(dtype).eps)
+    rho_max = 2 * r_max / (n * a0)
+    return eps * (4 * (n - l - 1) + 4 * l + rho_max / 2 + 8)
+
+def precision_note(n, l, dtype, r_max=None, a0=1.0, values=None):
+    """
+    One-line summary of the precision mode for the renderers to print.
+    Pass the computed array as 'values' so a broken result is reported instead of a bound.
+    Returns:
+        str or None: None in float64 with finite values (nothing to report)
+    """
+    dtype = resolve_dtype(dtype)
+    bound = error_bound(n, l, dtype, r_max, a0, values)
+    if bound is None:
+        bad = int(np.size(values) - np.count_nonzero(np.isfinite(values)))
+        return f"Precision: {dtype.name}, WARNING: {bad} non-finite values in the output, no error bound"
+    if dtype == np.float64:
+        return None
+    return f"Precision: {dtype.name}, error vs float64 <= {bound:.1e} of the peak value"
+
+def measured_error(n, l, m, dtype, r_max=None, a0=1.0, samples=4096, seed=0):
+    """
+    Measures the actual error of a precision mode against the float64 reference
+    on random points drawn uniformly from the cube [-r_max, r_max]^3.
+    Returns:
+        dict: {'max_error': ..., 'bound': ...}, both relative to the peak |psi|
+        (max_error is inf and bound None if the reduced precision gave inf/NaN anywhere)
+    """
+    from Physics.wavefunction import psi_cartesian
+
+    if r_max is None:
+        r_max = 5 * n * n * a0
+    points = np.random.default_rng(seed).uniform(-r_max, r_max, size=(3, samples))
+    reference = psi_cartesian(n, l, m, *points, a0=a0)
+    reduced = psi_cartesian(n, l, m, *points, a0=a0, dtype=dtype).astype(np.float64)
+    bound = error_bound(n, l, dtype, r_max, a0, values=reduced)
+    if bound is None:
+        return {'max_error': float('inf'), 'bound': None}
+    peak = np.max(np.abs(reference))
+    max_error = float(np.max(np.abs(reduced - reference)) / peak) if peak > 0 else 0.0
+    return {'max_error': max_error, 'bound': bound}
@@ -1,15 +1,82 @@
+import math
+
 import numpy as np
-import scipy.special as sp
 
-def radial_wavefunction(n, l, r, a0=1.0):
+from Physics.cache import state_cache
+from Physics.grid import Grid
+from Physics.precision import resolve_dtype
+
+def generalized_laguerre(k, alpha, x, scale=None, dtype=np.float64):
+    """
+    Evaluates the Generalized Laguerre Polynomial L_k^alpha(x) on a whole array.
+    Uses the three-term recurrence instead of building a polynomial object.
+    Args:
+        k (int): degree of the polynomial (n-l-1 for hydrogen)
+        alpha (float): generalization parameter (2l+1 for hydrogen)
+        x (array): points where the polynomial is evaluated
+        scale (array, optional): per-point factor s, the result is L_k^alpha(x) * s^k
+        dtype: float64 (default) or float32
+    Returns:
+        numpy.ndarray: L_k^alpha(x) (times scale^k if given), same shape as x
+    """
+
+    '''Why not scipy.special.genlaguerre?
+       genlaguerre builds a poly1d from expanded power-basis coefficients.
+       Those coefficients alternate in sign and grow like binomials, so for
+       n around 30-40 the sum cancels itself into garbage (and it is rebuilt
+       on every call, which is slow).
+       The recurrence below only ever combines the two previous values:
+           L_0 = 1
+           L_1 = 1 + alpha - x
+           (j+1) L_{j+1} = (2j+1+alpha-x) L_j - (j+alpha) L_{j-1}
+       It is stable in the oscillating region where the wavefunction lives,
+       and it is just multiply-adds on the full array, so n~500 is fine.'''
+    x = np.asarray(x, dtype=resolve_dtype(dtype))
+    if k < 0:
+        raise ValueError(f"Laguerre degree must be >= 0. You passed k={k}")
+
+    '''The scale trick.
+       For big n the polynomial itself overflows (L ~ 1e300 far from the nucleus)
+       while exp(-rho/2) underflows, so "huge * tiny" turns into inf * 0 = NaN.
+       If we multiply step j by s^j we carry L_j * s^j through the recurrence instead,
+       which stays in range when s^k is the small factor we were going to multiply by anyway.'''
+    s = np.ones_like(x) if scale is None else np.asarray(scale, dtype=x.dtype)
+
+    L_prev = np.ones_like(x)
+    if k == 0:
+        return L_prev
+    L_curr = (1 + alpha - x) * s
+
+    s2 = s * s
+    A, B, C = _laguerre_coefficients(k, float(alpha))
+    for j in range(1, k):
+        L_next = (A[j] - B[j] * x) * s * L_curr - C[j] * s2 * L_prev
+        L_prev, L_curr = L_curr, L_next
+    return L_curr
+
+@state_cache(maxsize=1024)
+def _laguerre_coefficients(k, alpha):
+    """
+    Recurrence coefficients for generalized_laguerre, with the 1/(j+1) already folded in:
+        L_(j+1) = (A_j - B_j * x) * L_j - C_j * L_(j-1)
+    Returns:
+        tuple: (A, B, C) as tuples of floats indexed by j
+    """
+    A = tuple((2 * j + 1 + alpha) / (j + 1) for j in range(k))
+    B = tuple(1 / (j + 1) for j in range(k))
+    C = tuple((j + alpha) / (j + 1) for j in range(k))
+    return A, B, C
+
+def radial_wavefunction(n, l, r, a0=1.0, dtype=None):
     """
     Computes the normalized radial wavefunction R_nl(r).
     Uses Generalized Laguerre Polynomials.
     Args:
         n (int): principal quantum number
         l (int): azimuthal quantum number
-        r (array): radial distance
+        r (array or Grid): radial distance (a Grid hands over its cached r)
         a0 (float): Bohr radius (default 1.0 for atomic units)
+        dtype: float64 or float32 (default: the Grid's dtype, else float64)
     """
     
     '''Step 0: Sanity Check (Don't break physics).
@@ -19,19 +86,120 @@ def radial_wavefunction(n, l, r, a0=1.0):
     if l >= n or n < 1:
         raise ValueError(f"Physics violation: n must be > l. You passed n={n}, l={l}")
 
-    '''Step 1: Generalized Laguerre Polynomials.
-       Scipy function takes arguments (order, alpha).
-       Physics formula (Griffiths/Shankar) uses L_q^p where q=n-l-1 and p=2l+1.
-       So we pass n-l-1 as order and 2l+1 as alpha.
-       P.S: Scipy defines Laguerre differently than some math texts, 
-       but this matches the Physics convention.'''
-    laguerre = sp.genlaguerre(n - l - 1, 2 * l + 1)
-    
+    r, dtype = _radial_input(r, dtype)
+
     # Scaled distance rho. Variable used to make the exponential term unitless
     # WARNING: If a0 is 1.0 (Atomic Units), ensure 'r' is also in atomic units!
-    rho = 2 * r / (n * a0)
-    
-    '''Step 2: Normalization Constant (The messy part).
+    rho = (2 / (n * a0)) * r
+
+    log_prefactor = _log_normalization(n, l, a0)
+
+    '''Step 2: Everything that is not the polynomial, in log form.
+       log( N * exp(-rho/2) * rho^l ) = log N - rho/2 + l*log(rho)
+       For n=500 each piece alone over/underflows, but the sum is a normal number.
+       log N stays a float64 constant, only the grid-dependent part is in dtype.'''
+    with np.errstate(divide='ignore'):
+        log_varying = -rho / 2
+        if l > 0:
+            log_varying = log_varying + l * np.log(rho)
+
+    # Final assembly: R_nl(r) = N * exp(-rho/2) * rho^l * L(rho)
+    R = _laguerre_times_envelope(n, l, rho, log_prefactor, log_varying)
+
+    '''Step 3: Safety net.
+       The scaled recurrence keeps everything finite for the states we sweep,
+       but if some point still came out inf/NaN (absurd r, or n way past 500)
+       we redo just those points in log form. R is then either a real number
+       or a clean 0, never inf * 0.'''
+    bad = ~np.isfinite(R)
+    if bad.any():
+        log_R, sign = log_radial_wavefunction(n, l, r[bad], a0, dtype=np.float64)
+        R[bad] = sign * np.exp(log_R)
+    return R
+
+def log_radial_wavefunction(n, l, r, a0=1.0, dtype=None):
+    """
+    Computes R_nl(r) as log|R_nl(r)| plus its sign, so nothing can overflow or underflow.
+    Use it for log-scale plots, very high n, or far tails where R itself is below 1e-308.
+    Args:
+        n (int): principal quantum number
+        l (int): azimuthal quantum number
+        r (array or Grid): radial distance
+        a0 (float): Bohr radius (default 1.0 for atomic units)
+        dtype: float64 or float32 (default: the Grid's dtype, else float64)
+    Returns:
+        tuple: (log_abs, sign) with R_nl = sign * exp(log_abs).
+        At nodes and at r=0 (for l > 0) log_abs is -inf and sign is 0.
+    """
+    if l >= n or n < 1:
+        raise ValueError(f"Physics violation: n must be > l. You passed n={n}, l={l}")
+
+    r, dtype = _radial_input(r, dtype)
+    rho = (2 / (n * a0)) * r
+
+    '''The log version of the same formula:
+         log|R| = log N - rho/2 + l*log(rho) + log|L(rho)|
+       The only piece that can blow up is L itself (it grows like rho^k/k! far out),
+       so we run the plain recurrence and, every few steps, pull any big values
+       back to 1 and remember the factor we divided out (in log form).'''
+    log_L, sign = _log_laguerre(n - l - 1, 2 * l + 1, rho)
+
+    with np.errstate(divide='ignore'):
+        log_abs = _log_normalization(n, l, a0) - rho / 2 + log_L
+        if l > 0:
+            log_abs = log_abs + l * np.log(rho)
+    sign = np.where(np.isneginf(log_abs), 0, sign).astype(dtype)
+    return log_abs, sign
+
+def _log_laguerre(k, alpha, x):
+    """
+    log|L_k^alpha(x)| and sign(L_k^alpha(x)) with running rescaling.
+    """
+    L_prev = np.ones_like(x)
+    log_scale = np.zeros_like(x)
+    if k == 0:
+        return log_scale, np.ones_like(x)
+    L_curr = 1 + alpha - x
+
+    '''Each step can grow |L| by at most a factor ~(x + 3), so checking every
+       4 steps with a 1e100 threshold leaves plenty of headroom before 1e308
+       (float32 gets a smaller threshold, its ceiling is 1e38).'''
+    big = 1e100 if x.dtype == np.float64 else 1e15
+    A, B, C = _laguerre_coefficients(k, float(alpha))
+    for j in range(1, k):
+        L_prev, L_curr = L_curr, (A[j] - B[j] * x) * L_curr - C[j] * L_prev
+        if j % 4 == 0 or j == k - 1:
+            size = np.maximum(np.abs(L_curr), np.abs(L_prev))
+            rescale = size > big
+            if rescale.any():
+                factor = np.where(rescale, size, 1)
+                L_curr = L_curr / factor
+                L_prev = L_prev / factor
+                log_scale = log_scale + np.log(factor)
+
+    with np.errstate(divide='ignore'):
+        return np.log(np.abs(L_curr)) + log_scale, np.sign(L_curr)
+
+def _radial_input(r, dtype):
+    """
+    Unpacks a Grid (if given) and settles the precision: explicit dtype, else the Grid's, else float64.
+    """
+    if isinstance(r, Grid):
+        dtype = resolve_dtype(dtype, default=r.dtype)
+        r = r.r
+    else:
+        dtype = resolve_dtype(dtype)
+    return np.asarray(r, dtype=dtype), dtype
+
+@state_cache(maxsize=1024)
+def _log_normalization(n, l, a0=1.0):
+    """
+    Log of the radial normalization constant N_nl.
+    Cached per (n, l, a0): it only depends on the state, and gammaln is not free.
+    Always float64, whatever precision the grid is in.
+    """
+
+    '''Normalization Constant (The messy part).
        Formula: N = sqrt( (2/na0)^3 * (n-l-1)! / (2n * (n+l)!) )
        
        I made a chnage to the formula. I switched to 'gammaln' (Log Gamma) here instead of plain factorial.
@@ -42,11 +210,163 @@ def radial_wavefunction(n, l, r, a0=1.0):
     
     # We calculate the log of the factorials first: ln(a/b) = ln(a) - ln(b)
     # Note: Gamma(n+1) = n!, so we pass (n-l) for (n-l-1)! and (n+l+1) for (n+l)!
-    log_factorial_part = sp.gammaln(n - l) - sp.gammaln(n + l + 1)
-    
-    prefactor = np.sqrt(
-        ((2 / (n * a0)) ** 3) * (1 / (2 * n)) * np.exp(log_factorial_part)
-    )
-    
-    # Final assembly: R_nl(r) = N * exp(-rho/2) * rho^l * L(rho)
-    return prefactor * np.exp(-rho / 2) * (rho ** l) * laguerre(rho)
\ No newline at end of file
+    log_factorial_part = math.lgamma(n - l) - math.lgamma(n + l + 1)
+    return float(0.5 * (3 * np.log(2 / (n * a0)) - np.log(2 * n) + log_factorial_part))
+
+def _laguerre_times_envelope(n, l, rho, log_constant, log_varying):
+    """
+    exp(log_constant + log_varying) * L_(n-l-1)^(2l+1)(rho), without ever forming
+    the two factors separately. log_constant is a float64 number, log_varying an
+    array in the grid's precision.
+    """
+
+    '''Generalized Laguerre Polynomials.
+       Physics formula (Griffiths/Shankar) uses L_q^p where q=n-l-1 and p=2l+1.
+       So we ask for degree n-l-1 with alpha 2l+1.
+       The envelope is fed in as the recurrence scale, spread evenly over the
+       n-l-1 steps, so what comes out is already envelope * L(rho).
+       P.S: This used to be scipy's genlaguerre, but that falls apart for big n.'''
+    k = n - l - 1
+    steps = max(k, 1)
+
+    '''Precision.
+       The constant part of the scale, exp(log N / k), is worked out in float64.
+       In float32 it only fits if it is a "normal" sized number; for extreme states
+       (huge n with few Laguerre steps) we quietly do this one state in float64
+       and round the answer, rather than losing it to underflow.'''
+    with np.errstate(over='ignore', under='ignore'):
+        constant = float(np.exp(log_constant / steps))
+    dtype = rho.dtype
+    if dtype != np.float64 and not 1e-30 < constant < 1e30:
+        return _laguerre_times_envelope(n, l, rho.astype(np.float64), log_constant,
+                                        log_varying.astype(np.float64)).astype(dtype)
+
+    # Anything that over/underflows here is redone in log form by the caller, so no warnings
+    with np.errstate(over='ignore', invalid='ignore'):
+        if k == 0:
+            # No recurrence to spread the scale over: one exp of the whole log, in float64
+            # (constant * exp(log_varying) would be 0 * inf for states like (500, 499))
+            return np.exp(log_constant + log_varying.astype(np.float64)).astype(dtype)
+        scale = dtype.type(constant) * np.exp(log_varying / steps)
+        return generalized_laguerre(k, 2 * l + 1, rho, scale=scale, dtype=dtype)
+
+def reduced_radial_wavefunction(n, l, r, a0=1.0, length=1.0, dtype=None):
+    """
+    Computes R_nl(r) * (length / r)^l, i.e. the radial part with the r^l pulled out.
+    Pairs with the solid harmonics (r^l * Y_lm) in Physics.angular, which carry the r^l instead.
+    Args:
+        n (int): principal quantum number
+        l (int): azimuthal quantum number
+        r (array): radial distance
+        a0 (float): Bohr radius (default 1.0 for atomic units)
+        length (float): unit the r^l is measured in (keeps both halves in float range)
+        dtype: float64 or float32 (default: the Grid's dtype, else float64)
+    Returns:
+        numpy.ndarray: N * (2*length/(n*a0))^l * exp(-rho/2) * L(rho)
+    """
+    if l >= n or n < 1:
+        raise ValueError(f"Physics violation: n must be > l. You passed n={n}, l={l}")
+
+    r, dtype = _radial_input(r, dtype)
+    rho = (2 / (n * a0)) * r
+
+    '''Same as radial_wavefunction, minus the l*log(rho) term.
+       R_nl / r^l = N * (2/(n*a0))^l * exp(-rho/2) * L(rho) is smooth and finite at r=0,
+       so there is no 0/0 at the nucleus and no log(rho) call on the grid at all.'''
+    log_constant = _log_normalization(n, l, a0) + l * np.log(2 * length / (n * a0))
+    f = _laguerre_times_envelope(n, l, rho, log_constant, -rho / 2)
+
+    '''Same safety net as radial_wavefunction: points that came out inf/NaN are
+       redone in log form, log|f| = log_constant - rho/2 + log|L(rho)|, in float64.
+       P.S: In float32 a value past 3e38 is still inf afterwards (it really is that
+       big, next to the nucleus for large l); psi_cartesian takes care of those.'''
+    bad = ~np.isfinite(f)
+    if bad.any():
+        rho_bad = rho[bad].astype(np.float64)
+        log_L, sign = _log_laguerre(n - l - 1, 2 * l + 1, rho_bad)
+        with np.errstate(over='ignore'):
+            f[bad] = sign * np.exp(log_constant - rho_bad / 2 + log_L)
+    return f
+
+def _radial_all_l(n, r, a0=1.0):
+    """
+    Computes R_nl(r) for every l = 0 .. n-1 of one shell in a single sweep.
+    Args:
+        n (int): principal quantum number
+        r (numpy.ndarray): radial distance (its dtype is the working precision)
+        a0 (float): Bohr radius
+    Returns:
+        numpy.ndarray: shape (n,) + r.shape, row l holds R_nl(r)
+    """
+    rho = (2 / (n * a0)) * r
+
+    '''The shared factors.
+       Every l of the shell needs exp(-rho/2). We split it as s^n with
+       s = exp(-rho/(2n)): that is the ONLY transcendental call for the whole shell.
+       l+1 copies of s go with N_l * rho^l, the other n-l-1 ride along the Laguerre
+       recurrence (same scale trick as generalized_laguerre). Both pieces stay in
+       floating point range even for n in the hundreds.'''
+    s = np.exp(-rho / (2 * n))
+    ls = np.arange(n)
+
+    '''Step 1: Q_l = N_l * s^(l+1) * rho^l, built by multiplying up in l.
+       N_l^2 is proportional to (n-l-1)!/(n+l)!, so N_l / N_(l-1) = 1/sqrt((n-l)(n+l)).
+       Multiplying the ratio in step by step never forms the giant rho^l on its own.'''
+    log_N0 = _log_normalization(n, 0, a0)
+    Q = np.empty((n,) + rho.shape, dtype=rho.dtype)
+    Q[0] = math.exp(log_N0) * s
+    rho_s = rho * s
+    for l in range(1, n):
+        Q[l] = Q[l - 1] * rho_s / math.sqrt((n - l) * (n + l))
+
+    '''Step 2: M_l = L_(n-l-1)^(2l+1)(rho) * s^(n-l-1) for all l at once.
+       Rows are stacked so every recurrence step is one array operation.
+       Row l is finished after n-l-1 steps, so the active block shrinks from the
+       bottom (largest l) as we go and we store each row the moment it is done.'''
+    alpha = (2 * ls + 1).astype(rho.dtype).reshape((n,) + (1,) * rho.ndim)
+    M = np.ones((n,) + rho.shape, dtype=rho.dtype)
+    if n > 1:
+        M_prev = np.ones((n - 1,) + rho.shape, dtype=rho.dtype)
+        M_curr = (1 + alpha[:n - 1] - rho) * s
+        M[n - 2] = M_curr[n - 2]
+        s2 = s * s
+        for j in range(1, n - 1):
+            active = n - 1 - j
+            M_next = ((2 * j + 1 + alpha[:active] - rho) * s * M_curr[:active]
+                      - (j + alpha[:active]) * s2 * M_prev[:active]) / (j + 1)
+            M_prev, M_curr = M_curr[:active], M_next
+            M[active - 1] = M_curr[active - 1]
+
+    return Q * M
+
+def radial_wavefunction_all(n_max, r, a0=1.0, states=None, dtype=None):
+    """
+    Computes R_nl(r) for all states up to n_max on the same radial grid.
+    Args:
+        n_max (int): largest principal quantum number
+        r (array or Grid): radial distance
+        a0 (float): Bohr radius (default 1.0 for atomic units)
+        states (list of (n, l), optional): only return these states, in this order
+        dtype: float64 or float32 (default: the Grid's dtype, else float64)
+    Returns:
+        numpy.ndarray: shape (n_max, n_max) + r.shape indexed [n-1, l]
+        (entries with l >= n are zero), or (len(states),) + r.shape if states is given
+    """
+    if n_max < 1:
+        raise ValueError(f"n_max must be >= 1. You passed n_max={n_max}")
+
+    r, dtype = _radial_input(r, dtype)
+
+    if states is None:
+        out = np.zeros((n_max, n_max) + r.shape, dtype=dtype)
+        for n in range(1, n_max + 1):
+            out[n - 1, :n] = _radial_all_l(n, r, a0)
+        return out
+
+    for n, l in states:
+        if l >= n or n < 1 or n > n_max:
+            raise ValueError(f"Physics violation: need n_max >= n > l. You passed n={n}, l={l}")
+
+    # Only sweep the shells somebody actually asked for
+    shells = {n: _radial_all_l(n, r, a0) for n in sorted({n for n, _ in states})}
+    return np.stack([shells[n][l] for n, l in states]) if states else np.zeros((0,) + r.shape, dtype=dtype)
@@ -0,0 +1,232 @@
+import warnings
+
+import numpy as np
+import scipy.signal
+import scipy.special as sp
+
+from Physics.transitions import radial_dipole_integrals
+
+'''The hydrogen spectrum.
+   Two halves:
+     1. line_list: every allowed (Delta l = +-1) transition between shells up to
+        n_max, with its wavelength, oscillator strength and Einstein A.
+        The radial dipole integrals come from Physics.transitions, so the
+        whole list is a handful of array operations.
+     2. broaden: spread those lines over a wavelength grid with a Gaussian,
+        Lorentzian or Voigt profile. Never as a (lines x points) matrix, that is
+        10^4 x 10^6 = 80 GB. Either every line only touches the few grid points
+        near its center (windowed), or all lines are dropped onto the grid as
+        spikes and smeared in one FFT convolution.
+
+   Units: energies in Hartree inside, wavelengths in nm outside, A in 1/s.'''
+
+# Physical constants (CODATA 2018)
+RYDBERG_H = 10967758.340     # 1/m, Rydberg constant for hydrogen (reduced-mass corrected)
+FINE_STRUCTURE = 7.2973525693e-3
+ATOMIC_TIME = 2.4188843265857e-17  # s, one atomic unit of time
+
+# Above this many lines the windowed method gets slow (mostly Voigt: ~150 ns per profile value)
+WINDOW_MAX_LINES = 100_000
+
+def line_list(n_max):
+    """
+    All electric dipole lines between states with n <= n_max (summed over m).
+    P.S: The count grows like n_max^3 and the time like n_max^5 (the radial integrals):
+    n_max = 40 is 20k lines in under a second, n_max = 150 is 1.1M lines in about 90 s.
+    Args:
+        n_max (int): largest principal quantum number
+    Returns:
+        dict of numpy.ndarray, one entry per line (lower state -> upper state):
+            'n_lower', 'l_lower', 'n_upper', 'l_upper',
+            'wavelength': vacuum wavelength in nm (Rydberg formula),
+            'energy': photon energy in Hartree,
+            'f': absorption oscillator strength (lower -> upper),
+            'A': Einstein A coefficient in 1/s (upper -> lower)
+    """
+    if n_max < 2:
+        raise ValueError(f"Need n_max >= 2 for any line. You passed n_max={n_max}")
+    D = radial_dipole_integrals(n_max)
+
+    '''Step 1: Which lines exist.
+       Lower (n, l) to upper (n', l') with n < n' and l' = l +- 1.
+       D[n-1, l, n'-1] holds the l' = l+1 integrals and D[n'-1, l', n-1] the l' = l-1 ones
+       (same integral, read from the other state), so both come out of one table.'''
+    n, l, n2 = np.meshgrid(np.arange(1, n_max + 1), np.arange(n_max), np.arange(1, n_max + 1),
+                           indexing='ij')
+    up = (l < n) & (l + 1 < n2) & (n < n2)
+    down = (l < n) & (l >= 1) & (l - 1 < n2) & (n < n2)
+    n_lower = np.concatenate([n[up], n[down]])
+    l_lower = np.concatenate([l[up], l[down]])
+    n_upper = np.concatenate([n2[up], n2[down]])
+    l_upper = np.concatenate([l[up] + 1, l[down] - 1])
+    radial = np.concatenate([D[n[up] - 1, l[up], n2[up] - 1],
+                             D[n2[down] - 1, l[down] - 1, n[down] - 1]])
+
+    '''Step 2: The numbers (atomic units, m-summed, spin cancels out):
+         Delta E = (1/n^2 - 1/n'^2) / 2
+         f  = 2/3 * Delta E * max(l, l') / (2l + 1) * D^2
+         A  = 4/3 * alpha^3 * Delta E^3 * max(l, l') / (2l' + 1) * D^2   (then / atomic time)
+       The wavelengths use the hydrogen Rydberg constant, so Lyman alpha lands on
+       121.567 nm like in the tables.'''
+    inverse_n2 = 1.0 / n_lower**2 - 1.0 / n_upper**2
+    energy = inverse_n2 / 2
+    line_strength = np.maximum(l_lower, l_upper) * radial**2
+    order = np.lexsort((l_upper, n_upper, l_lower, n_lower))
+    lines = {
+        'n_lower': n_lower, 'l_lower': l_lower, 'n_upper': n_upper, 'l_upper': l_upper,
+        'wavelength': 1e9 / (RYDBERG_H * inverse_n2),
+        'energy': energy,
+        'f': 2 / 3 * energy * line_strength / (2 * l_lower + 1),
+        'A': 4 / 3 * FINE_STRUCTURE**3 * energy**3 * line_strength / (2 * l_upper + 1) / ATOMIC_TIME,
+    }
+    return {key: value[order] for key, value in lines.items()}
+
+def line_profile(offset, profile='gaussian', fwhm=0.1, lorentz_fwhm=None):
+    """
+    Unit-area line shape.
+    Args:
+        offset (array): distance from the line center (nm)
+        profile (str): 'gaussian', 'lorentzian' or 'voigt'
+        fwhm (float): full width at half maximum (the Gaussian part for 'voigt')
+        lorentz_fwhm (float): Lorentzian FWHM for 'voigt' (default: same as fwhm)
+    """
+    sigma = fwhm / (2 * np.sqrt(2 * np.log(2)))
+    if profile == 'gaussian':
+        return np.exp(-0.5 * (offset / sigma) ** 2) / (sigma * np.sqrt(2 * np.pi))
+    if profile == 'lorentzian':
+        gamma = fwhm / 2
+        return gamma / np.pi / (offset**2 + gamma**2)
+    if profile == 'voigt':
+        gamma = (fwhm if lorentz_fwhm is None else lorentz_fwhm) / 2
+        return sp.voigt_profile(offset, sigma, gamma)
+    raise ValueError(f"Unknown profile '{profile}'. Use 'gaussian', 'lorentzian' or 'voigt'.")
+
+def broaden(wavelength, centers, strengths, profile='gaussian', fwhm=0.1, lorentz_fwhm=None,
+            method='auto', window=None, chunk_bytes=64 * 2**20):
+    """
+    Synthesizes a spectrum: sum over lines of strength * profile(wavelength - center).
+    Args:
+        wavelength (numpy.ndarray): sorted 1-D grid (nm)
+        centers (numpy.ndarray): line centers (nm)
+        strengths (numpy.ndarray): line intensities (area under each line)
+        profile (str): 'gaussian', 'lorentzian' or 'voigt'
+        fwhm (float): line width (nm), the Gaussian part for 'voigt'
+        lorentz_fwhm (float): Lorentzian width for 'voigt' (default: fwhm)
+        method (str): 'fft' (uniform grids only), 'window', or 'auto' (fft when the grid is uniform).
+                      Use a uniform grid for big line lists: fft costs N log N whatever
+                      the number of lines, window costs lines x window points
+                      (n_max = 150 with Voigt: ~0.4 s vs ~250 s). Window warns above
+                      WINDOW_MAX_LINES lines.
+        window (float): half width of the per-line window, in FWHMs
+                        (default 6 for gaussian, 50 for the long-tailed profiles,
+                        which leaves about 0.6% of a Lorentzian's area outside)
+        chunk_bytes (int): memory budget for the windowed method
+    Returns:
+        numpy.ndarray: the spectrum on 'wavelength'
+    """
+    wavelength = np.asarray(wavelength, dtype=np.float64)
+    centers = np.asarray(centers, dtype=np.float64).ravel()
+    strengths = np.broadcast_to(np.asarray(strengths, dtype=np.float64), centers.shape)
+    step = np.diff(wavelength)
+    if np.any(step <= 0):
+        raise ValueError("The wavelength grid must be strictly increasing")
+    uniform = np.allclose(step, step[0], rtol=1e-6, atol=0)
+    if method == 'auto':
+        method = 'fft' if uniform else 'window'
+    width = max(fwhm, lorentz_fwhm or 0)
+    if window is None:
+        window = 6.0 if profile == 'gaussian' else 50.0
+
+    if method == 'fft':
+        if not uniform:
+            raise ValueError("method='fft' needs a uniform wavelength grid, use method='window'")
+        return _broaden_fft(wavelength, centers, strengths, profile, fwhm, lorentz_fwhm, window * width)
+    if method == 'window':
+        if len(centers) > WINDOW_MAX_LINES:
+            warnings.warn(f"broaden: {len(centers)} lines with method='window' will be slow "
+                          f"(every line evaluates its own {profile} window). Use a uniform "
+                          f"wavelength grid and method='fft' for big line lists.", RuntimeWarning, stacklevel=2)
+        return _broaden_window(wavelength, centers, strengths, profile, fwhm, lorentz_fwhm,
+                               window * width, chunk_bytes)
+    raise ValueError(f"Unknown method '{method}'. Use 'auto', 'fft' or 'window'.")
+
+def _broaden_fft(wavelength, centers, strengths, profile, fwhm, lorentz_fwhm, reach):
+    """
+    Lines -> spikes on the grid -> one FFT convolution with the sampled profile.
+    """
+
+    '''Step 1: Drop every line onto the grid as a spike.
+       A line between two grid points is split between them in proportion
+       (like sharing a weight between two hooks), which keeps its area and its
+       center exact (the shape is off by about (grid step / width)^2, so keep a few
+       grid points per FWHM). The grid is padded by 'reach' on both sides so lines
+       just outside the plotted range still send their wings in.'''
+    h = wavelength[1] - wavelength[0]
+    N = len(wavelength)
+    pad = int(np.ceil(reach / h))
+    position = (centers - wavelength[0]) / h + pad
+    left = np.floor(position).astype(np.int64)
+    share = position - left
+    spikes = np.zeros(N + 2 * pad + 1)
+    inside = (left >= 0) & (left < len(spikes) - 1)
+    np.add.at(spikes, left[inside], strengths[inside] * (1 - share[inside]))
+    np.add.at(spikes, left[inside] + 1, strengths[inside] * share[inside])
+
+    '''Step 2: One convolution for all lines at once.
+       The profile is sampled once on offsets -K..K grid steps (K covers the padded grid,
+       so even Lorentzian wings reach across it). Cost: N log N, whatever the line count.'''
+    K = N + pad
+    kernel = line_profile(np.arange(-K, K + 1) * h, profile, fwhm, lorentz_fwhm) * h
+    full = scipy.signal.fftconvolve(spikes, kernel, mode='full')
+    return full[pad + K:pad + K + N] / h
+
+def _broaden_window(wavelength, centers, strengths, profile, fwhm, lorentz_fwhm, reach, chunk_bytes):
+    """
+    Every line only touches the grid points within 'reach' of its center.
+    """
+
+    '''Each line gets the same number of slots W (the widest window any line needs),
+       as a (lines, W) block of grid indices. The profile is evaluated on that
+       block and np.bincount adds everything up in one pass.
+       Lines are handled in chunks so the block stays inside chunk_bytes.'''
+    N = len(wavelength)
+    start = np.searchsorted(wavelength, centers - reach)
+    stop = np.searchsorted(wavelength, centers + reach)
+    W = int(np.max(stop - start, initial=0))
+    spectrum = np.zeros(N)
+    if W == 0:
+        return spectrum
+    per_chunk = max(1, chunk_bytes // (W * 8 * 4))
+    slots = np.arange(W)
+    for first in range(0, len(centers), per_chunk):
+        part = slice(first, first + per_chunk)
+        index = start[part, np.newaxis] + slots
+        used = index < stop[part, np.newaxis]
+        index = np.where(used, index, 0)
+        values = line_profile(wavelength[index] - centers[part, np.newaxis], profile, fwhm, lorentz_fwhm)
+        values = np.where(used, values * strengths[part, np.newaxis], 0.0)
+        spectrum += np.bincount(index.ravel(), weights=values.ravel(), minlength=N)
+    return spectrum
+
+def synthesize(n_max, wavelength, profile='gaussian', fwhm=0.1, lorentz_fwhm=None,
+               kind='emission', method='auto'):
+    """
+    Line list + broadening in one go.
+    Args:
+        n_max (int): largest principal quantum number in the line list
+        wavelength (numpy.ndarray): sorted grid (nm)
+        profile, fwhm, lorentz_fwhm, method: see broaden
+        kind (str): 'emission' (lines weighted by (2l'+1) A, equal upper populations)
+                    or 'absorption' (weighted by (2l+1) f, equal lower populations)
+    Returns:
+        tuple: (spectrum, lines)
+    """
+    lines = line_list(n_max)
+    if kind == 'emission':
+        strengths = (2 * lines['l_upper'] + 1) * lines['A']
+    elif kind == 'absorption':
+        strengths = (2 * lines['l_lower'] + 1) * lines['f']
+    else:
+        raise ValueError(f"Unknown kind '{kind}'. Use 'emission' or 'absorption'.")
+    spectrum = broaden(wavelength, lines['wavelength'], strengths, profile, fwhm, lorentz_fwhm, method)
+    return spectrum, lines
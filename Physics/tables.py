@@ -0,0 +1,278 @@
+import math
+
+import numpy as np
+
+from Physics.cache import state_cache
+from Physics.precision import resolve_dtype
+from Physics.radial import (_log_normalization, generalized_laguerre, radial_wavefunction,
+                            reduced_radial_wavefunction)
+
+'''Radial lookup tables.
+   Drawing the same orbital at millions of points (a big density map, a volume,
+   every frame of an animation) runs the Laguerre recurrence plus an exp() per
+   point every single time. But R_nl only depends on r, a 1-D function.
+   So we work it out ONCE on a set of knots and afterwards every point is a
+   table lookup plus a cubic polynomial. (For small n the recurrence is only a
+   few steps and already cheap, the table pays off from n ~ 10 upwards.)
+
+   What is tabulated is the reduced radial function f(r) = R_nl(r) * (length/r)^l
+   (length = n^2 * a0, the same split psi_cartesian uses), because it is smooth
+   at the nucleus, together with its exact derivative. Between knots it is a
+   cubic Hermite polynomial, which matches both the values and the slopes.'''
+
+class RadialTable:
+    """
+    Cubic Hermite table of one radial function, built to a checked error.
+    The error target is relative to the peak of |R_nl|: everywhere we checked,
+    |R_table(r) - R_nl(r)| <= rtol * max|R_nl|.
+
+    Use radial_table(n, l) to get a cached one instead of building it by hand.
+    """
+
+    def __init__(self, n, l, rtol=1e-7, r_max=None, a0=1.0, max_knots=2**16):
+        """
+        Args:
+            n (int): principal quantum number
+            l (int): azimuthal quantum number
+            rtol (float): error target, relative to the peak of |R_nl|
+            r_max (float): end of the table, R counts as 0 beyond it
+                           (default: where |R_nl| has dropped below rtol * peak for good)
+            a0 (float): Bohr radius
+            max_knots (int): refuse to grow the table past this (rtol too small)
+        """
+        if l >= n or n < 1:
+            raise ValueError(f"Physics violation: n must be > l. You passed n={n}, l={l}")
+        self.n, self.l, self.a0, self.rtol = n, l, a0, rtol
+        self.length = n * n * a0
+
+        '''Step 1: Knots that know where the nodes are.
+           f has its n-l-1 radial nodes at the Laguerre roots, and it wiggles
+           fastest right around them, so every node is a knot and each gap
+           between nodes starts out split into 4 pieces. That already puts the
+           knots densest where the curve bends the most.'''
+        self.r_max = tail_radius(n, l, rtol, a0) if r_max is None else float(r_max)
+        import scipy.special as sp  # only needed while a table is being built, not for lookups
+        k = n - l - 1
+        nodes = sp.roots_genlaguerre(k, 2 * l + 1)[0] * (n * a0 / 2) if k > 0 else np.zeros(0)
+        breaks = np.unique(np.concatenate([[0.0], nodes[nodes < self.r_max], [self.r_max]]))
+        knots = np.concatenate([np.linspace(a, b, 5)[:-1] for a, b in zip(breaks[:-1], breaks[1:])]
+                               + [[self.r_max]])
+
+        '''Step 2: Refine until the check passes.
+           On every interval we compare the cubic with the real thing at 1/4, 1/2
+           and 3/4 of the way (the cubic Hermite error peaks near the middle).
+           Intervals that miss the target get cut in half and we go again.
+           The error is measured on R = f * (r/length)^l, not on f, so close to the
+           nucleus (where R is tiny for l > 0) the table can stay coarse.
+           P.S: For big l, (r/length)^l can grow by orders of magnitude across one
+           interval, so the worst spot sits right next to the outer knot, where
+           no probe looks. Each interval's error in f is therefore weighted with
+           (r/length)^l at its outer end, the largest it gets there.'''
+        values, slopes = self._exact(knots)
+        peak = None
+        while True:
+            h = np.diff(knots)
+            probes = knots[:-1, np.newaxis] + h[:, np.newaxis] * np.array([0.25, 0.5, 0.75])
+            exact, _ = self._exact(probes.ravel())
+            approx = _hermite(knots, values, slopes, probes.ravel(), np.arange(len(h)).repeat(3))
+            if peak is None:
+                peak = max(np.max(np.abs(values * (knots / self.length) ** l)),
+                           np.max(np.abs(exact * (probes.ravel() / self.length) ** l)))
+            error = np.abs(approx - exact).reshape(-1, 3).max(axis=1) * (knots[1:] / self.length) ** l
+            failed = error > 0.5 * rtol * peak  # half the budget, the probes can miss the exact worst spot
+            if not failed.any():
+                break
+            if len(knots) + failed.sum() > max_knots:
+                raise ValueError(f"Radial table for ({n},{l}) needs more than {max_knots} knots, "
+                                 f"rtol={rtol} is too strict")
+            new = knots[:-1][failed] + h[failed] / 2
+            new_values, new_slopes = self._exact(new)
+            order = np.argsort(np.concatenate([knots, new]), kind='stable')
+            knots = np.concatenate([knots, new])[order]
+            values = np.concatenate([values, new_values])[order]
+            slopes = np.concatenate([slopes, new_slopes])[order]
+
+        '''Step 3: Store each piece as a plain cubic in (r - knot).
+           Evaluating is then an interval lookup and 3 multiply-adds (Horner),
+           no basis functions to rebuild per point.'''
+        h = np.diff(knots)
+        dy = np.diff(values) / h
+        self.knots = knots
+        self.coefficients = np.stack([values[:-1], slopes[:-1],
+                                      (3 * dy - 2 * slopes[:-1] - slopes[1:]) / h,
+                                      (slopes[:-1] + slopes[1:] - 2 * dy) / (h * h)], axis=-1)
+        self.peak = float(peak)
+
+        '''Step 4: Skip the binary search.
+           Chop [0, r_max] into equal buckets no wider than the narrowest interval.
+           Then a bucket holds at most one knot, and the interval of a point is
+           "the first interval of its bucket, plus one if it is past that knot".
+           Two lookups per point instead of log2(knots) of them.'''
+        self._bucket = float(h.min())
+        buckets = int(self.r_max / self._bucket) + 2
+        self._bucket_first = None
+        if buckets <= 2**22:
+            starts = np.arange(buckets) * self._bucket
+            self._bucket_first = np.clip(np.searchsorted(knots, starts, side='right') - 1,
+                                         0, len(knots) - 2).astype(np.int32)
+        self._cast = {}
+
+    @classmethod
+    def from_arrays(cls, n, l, knots, coefficients, bucket_first, bucket, r_max, peak, rtol, a0=1.0):
+        """
+        Rebuilds a table from its stored arrays without recomputing anything
+        (this is how Physics.atlas hands out tables straight from a memory map).
+        Args:
+            knots, coefficients, bucket_first (numpy.ndarray): as on a built table
+                (bucket_first may be None, lookups then fall back to a binary search)
+            bucket, r_max, peak, rtol, a0 (float): as on a built table
+        """
+        table = cls.__new__(cls)
+        table.n, table.l, table.a0, table.rtol = n, l, a0, rtol
+        table.length = n * n * a0
+        table.r_max, table.peak = float(r_max), float(peak)
+        table.knots, table.coefficients = knots, coefficients
+        table._bucket, table._bucket_first = float(bucket), bucket_first
+        table._cast = {}
+        return table
+
+    def _exact(self, r):
+        """
+        f(r) and f'(r) straight from the recurrence (float64).
+        """
+        n, l, a0 = self.n, self.l, self.a0
+        r = np.asarray(r, dtype=np.float64)
+        f = reduced_radial_wavefunction(n, l, r, a0, length=self.length)
+
+        '''The slope, with rho = 2r/(n a0) and d/drho L_k^a = -L_(k-1)^(a+1):
+             f = C exp(-rho/2) L_k^(2l+1)(rho)
+             df/dr = (2/(n a0)) * ( -f/2 - C exp(-rho/2) L_(k-1)^(2l+2)(rho) )
+           The second term gets the same scale trick as the radial function.'''
+        k = n - l - 1
+        rho = (2 / (n * a0)) * r
+        if k == 0:
+            return f, -f / (n * a0)
+        log_constant = _log_normalization(n, l, a0) + l * math.log(2 * self.length / (n * a0))
+        steps = max(k - 1, 1)
+        with np.errstate(over='ignore', under='ignore'):
+            scale = float(np.exp(log_constant / steps)) * np.exp(-rho / (2 * steps))
+        if k == 1:
+            tail = scale
+        else:
+            tail = generalized_laguerre(k - 1, 2 * l + 2, rho, scale=scale)
+        return f, (2 / (n * a0)) * (-f / 2 - tail)
+
+    def reduced(self, r, dtype=None):
+        """
+        The reduced radial function R_nl(r) * (length/r)^l with length = n^2 * a0
+        (drop-in for reduced_radial_wavefunction(n, l, r, a0, length=n^2 * a0)).
+        Args:
+            r (array): radial distance
+            dtype: float64 or float32 (default: r's precision if it is one of those, else float64)
+        """
+        r = np.asarray(r)
+        dtype = resolve_dtype(dtype, default=r.dtype if r.dtype == np.float32 else np.float64)
+        r = r.astype(dtype, copy=False)
+        index = self._interval(r)
+        with np.errstate(over='ignore', invalid='ignore'):
+            value = self._horner(r, index, *self._in_dtype(dtype))
+
+        '''P.S: For large l, f is huge next to the nucleus ((100,50) reaches 1e51),
+           so some float32 coefficients are inf and the cubic gives inf/NaN there.
+           Those points are redone with the float64 coefficients. What is still too
+           big for float32 after that comes back as inf (and gets multiplied by an
+           r^l that is 0 in float32 anyway); __call__ and psi_cartesian handle it.'''
+        bad = ~np.isfinite(value)
+        if bad.any():
+            with np.errstate(over='ignore'):
+                value[bad] = self._horner(r[bad].astype(np.float64), index[bad], self.knots, self.coefficients)
+        return np.where(r <= self.r_max, value, 0).astype(dtype, copy=False)
+
+    @staticmethod
+    def _horner(r, index, knots, coefficients):
+        # The cubic of interval 'index' at r
+        c = coefficients[index]
+        t = r - knots[index]
+        return c[..., 0] + t * (c[..., 1] + t * (c[..., 2] + t * c[..., 3]))
+
+    def _in_dtype(self, dtype):
+        # The knots and cubic coefficients in the working precision (converted once per dtype)
+        if dtype not in self._cast:
+            with np.errstate(over='ignore'):
+                self._cast[dtype] = (self.knots.astype(dtype, copy=False),
+                                     self.coefficients.astype(dtype, copy=False))
+        return self._cast[dtype]
+
+    def _interval(self, r):
+        # Which knot interval each point falls in (clipped to the table)
+        last = len(self.knots) - 2
+        if self._bucket_first is None:
+            return np.clip(np.searchsorted(self.knots, r, side='right') - 1, 0, last)
+        bucket = np.clip((r * (1 / self._bucket)).astype(np.intp), 0, len(self._bucket_first) - 1)
+        index = self._bucket_first[bucket]
+        index = index + (r >= self.knots[np.minimum(index + 1, last + 1)])
+        return np.minimum(index, last)
+
+    def __call__(self, r, dtype=None):
+        """
+        R_nl(r) from the table.
+        """
+        f = self.reduced(r, dtype)
+        r = np.asarray(r, dtype=f.dtype)
+        with np.errstate(over='ignore', invalid='ignore'):
+            R = f * (r * f.dtype.type(1 / self.length)) ** self.l
+
+        '''Same trouble as in psi_cartesian (float32, large l): f is huge at the nucleus
+           where r^l is 0 or subnormal, and r^l overflows far out where f is 0.
+           Those points are redone in float64.'''
+        bad = ~np.isfinite(R)
+        if self.l > 0:
+            bad = bad | (r < self.length * np.finfo(f.dtype).tiny ** (1 / self.l))
+        if bad.any():
+            r_bad = r[bad].astype(np.float64)
+            R[bad] = self.reduced(r_bad) * (r_bad / self.length) ** self.l
+        return R
+
+def _hermite(knots, values, slopes, r, index):
+    # Cubic Hermite on the interval 'index' (used while the table is still growing)
+    h = knots[index + 1] - knots[index]
+    u = (r - knots[index]) / h
+    return ((1 + 2 * u) * (1 - u) ** 2 * values[index] + u * (1 - u) ** 2 * h * slopes[index]
+            + u * u * (3 - 2 * u) * values[index + 1] + u * u * (u - 1) * h * slopes[index + 1])
+
+'''Atlases that have been installed (see Physics.atlas.load_atlas).
+   radial_table looks here before building anything, newest atlas first.'''
+_atlases = []
+
+def install_atlas(atlas):
+    """
+    Lets radial_table serve tables out of a loaded atlas instead of building them.
+    """
+    _atlases.insert(0, atlas)
+    radial_table.cache_clear()  # tables built before the atlas was there would shadow it
+
+@state_cache(maxsize=64)
+def radial_table(n, l, rtol=1e-7, a0=1.0):
+    """
+    Cached RadialTable for (n, l): taken from an installed atlas if one covers
+    the state (at least as accurate, same a0), otherwise built the first time
+    and reused afterwards.
+    Args:
+        n, l (int): quantum numbers
+        rtol (float): error target, relative to the peak of |R_nl|
+        a0 (float): Bohr radius
+    """
+    for atlas in _atlases:
+        if atlas.covers(n, l, rtol, a0):
+            return atlas.table(n, l)
+    return RadialTable(n, l, rtol=rtol, a0=a0)
+
+def tail_radius(n, l, rtol=1e-7, a0=1.0):
+    """
+    A radius past which |R_nl| stays below rtol * peak (past the last bump it only decays).
+    It is where a RadialTable ends, and it needs only one coarse R_nl scan, no table.
+    """
+    r = np.linspace(0, 60 * n * n * a0, 20 * n + 200)
+    R = np.abs(radial_wavefunction(n, l, r, a0))  # not f * (r/length)^l: that is inf * 0 far out for big l
+    above = np.nonzero(R > rtol * R.max())[0]
+    return float(r[min(above[-1] + 1, len(r) - 1)])
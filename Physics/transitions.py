@@ -0,0 +1,208 @@
+import math
+
+import numpy as np
+
+from Physics.angular import _legendre_all, lm_index
+from Physics.cache import state_cache
+from Physics.radial import _radial_all_l
+
+'''Electric dipole matrix elements <n'l'm'| x, y, z |nlm>.
+   Every element splits into a radial integral times an angular factor:
+       <n'l'm'| x |nlm> = [ integral R_n'l' R_nl r^3 dr ] * [ integral Y_l'm' Y_lm sin(theta)cos(phi) dOmega ]
+   and both pieces are exactly zero unless l' = l +- 1 and |m'| = |m| or |m| +- 1.
+   So we never even look at the forbidden pairs, and the non-zero ones are
+   built from two small tables instead of one 3-D integral each.
+
+   Basis order (rows and columns of every matrix): shell by shell in n, and
+   inside a shell the same (l, m) order as angular_wavefunction_all, i.e.
+       index(n, l, m) = (n-1) n (2n-1) / 6 + l^2 + l + m
+   The orbitals are the real ones angular_wavefunction draws, so the
+   matrices are real and symmetric.'''
+
+COMPONENTS = ('x', 'y', 'z')
+
+def basis_index(n, l, m):
+    """
+    Row/column of the real orbital (n, l, m) in the dipole matrices.
+    """
+    return (n - 1) * n * (2 * n - 1) // 6 + lm_index(l, m)
+
+def basis_size(n_max):
+    """
+    Number of orbitals with n <= n_max (sum of n^2).
+    """
+    return n_max * (n_max + 1) * (2 * n_max + 1) // 6
+
+def basis_states(n_max):
+    """
+    The (n, l, m) of every row, in matrix order.
+    Returns:
+        numpy.ndarray: shape (basis_size(n_max), 3), integer
+    """
+    return np.array([(n, l, m) for n in range(1, n_max + 1)
+                     for l in range(n) for m in range(-l, l + 1)], dtype=int).reshape(-1, 3)
+
+@state_cache(maxsize=256)
+def _laguerre_rule(points):
+    """
+    Gauss-Laguerre nodes x and weights w * e^x (so the rule takes plain f(x), not e^-x f(x)).
+    """
+    import scipy.special as sp
+    x, w = sp.roots_laguerre(points)
+    return x, w * np.exp(x)
+
+def radial_dipole_integrals(n_max, a0=1.0):
+    """
+    All the radial dipole integrals up to n_max.
+        D[n-1, l, n'-1] = integral_0^inf R_nl(r) R_n'(l+1)(r) r^3 dr
+    (the l' = l - 1 ones are the same numbers read the other way round).
+    Args:
+        n_max (int): largest principal quantum number
+        a0 (float): Bohr radius (the integrals scale with a0)
+    Returns:
+        numpy.ndarray: shape (n_max, n_max, n_max), zero where the state does not exist
+    """
+    if n_max < 1:
+        raise ValueError(f"n_max must be >= 1. You passed n_max={n_max}")
+
+    '''Why Gauss-Laguerre is exact here.
+       R_nl R_n'l' r^3 is a polynomial of degree n + n' + 1 times exp(-beta r),
+       beta = 1/n + 1/n'. With x = beta r that is exactly the kind of integral
+       Gauss-Laguerre is made for: N points integrate polynomials up to degree 2N-1
+       against e^-x with no error at all (only rounding). So this gives the same
+       numbers as the closed-form (Gordon) hypergeometric formula, without its
+       huge alternating sums that fall apart for big n.
+
+       For one (n, n') pair every l comes out of a single call to _radial_all_l
+       per shell, and the lower n of the pair does the "up" and "down" couplings
+       together, so the cost is one small quadrature per pair of shells.'''
+    D = np.zeros((n_max, n_max, n_max))
+    for n in range(1, n_max + 1):
+        for n2 in range(n, n_max + 1):
+            beta = 1 / n + 1 / n2
+            x, weight = _laguerre_rule((n + n2 + 3) // 2)
+            r = x / beta
+            weight = weight * r ** 3 / beta
+            R1 = _radial_all_l(n, r)
+            R2 = _radial_all_l(n2, r)
+
+            # (n, l) -> (n2, l+1) and (n2, l) -> (n, l+1)
+            up = min(n, n2 - 1)
+            D[n - 1, :up, n2 - 1] = (R1[:up] * R2[1:up + 1]) @ weight
+            if n2 != n:
+                D[n2 - 1, :n - 1, n - 1] = (R2[:n - 1] * R1[1:n]) @ weight
+    return D * a0
+
+@state_cache(maxsize=16)
+def _theta_integrals(l_max):
+    """
+    The theta halves of the angular factors, for l -> l+1 (mu = |m| of the lower state):
+        Z[l, mu] = integral P~_(l+1)mu     P~_l mu cos(theta)  d(cos theta)
+        U[l, mu] = integral P~_(l+1)(mu+1) P~_l mu sin(theta)  d(cos theta)
+        V[l, mu] = integral P~_(l+1)(mu-1) P~_l mu sin(theta)  d(cos theta)
+    All three integrands are polynomials in cos(theta) (the sin(theta) powers
+    always pair up), so Gauss-Legendre with l_max + 3 points is exact.
+    """
+    x, w = np.polynomial.legendre.leggauss(l_max + 3)
+    s = np.sqrt(1 - x * x)
+    P = _legendre_all(l_max + 1, x, s)
+    Z = np.einsum('lmk,lmk,k->lm', P[1:], P[:-1], w * x)
+    U = np.einsum('lmk,lmk,k->lm', P[1:, 1:], P[:-1, :-1], w * s)
+    V = np.zeros_like(Z)
+    V[:, 1:] = np.einsum('lmk,lmk,k->lm', P[1:, :-1], P[:-1, 1:], w * s)
+    return Z[:l_max + 1], U[:l_max + 1], V[:l_max + 1]
+
+@state_cache(maxsize=16)
+def angular_dipole_factors(l_max):
+    """
+    Every non-zero angular factor <l+1, m'| x_i / r |l, m> with l <= l_max - 1.
+    Returns:
+        dict: component -> (l, m, m_prime, value), four 1-D arrays
+    """
+
+    '''The phi halves are done by hand. With Y_lm = c_m P~_l|m| T_m(phi),
+       c_0 = 1, T_0 = 1, and c_m = sqrt(2) with T_m = cos(m phi) (m > 0) or
+       sin(|m| phi) (m < 0), the phi integrals times c_m c_m' come out as
+         z (times 1):        2pi                         (same m)
+         x (times cos phi):  sqrt(2) pi  for 0 <-> cos 1,  pi  for cos a <-> cos a+-1
+                             and sin a <-> sin a+-1
+         y (times sin phi):  sqrt(2) pi  for 0 <-> sin 1,  pi  for cos a <-> sin a+1,
+                             -pi for cos a <-> sin a-1 (a >= 1)
+       Everything else is 0. Those are the selection rules.'''
+    Z, U, V = _theta_integrals(l_max)
+    pi, root2pi = math.pi, math.sqrt(2) * math.pi
+    entries = {c: [] for c in COMPONENTS}
+    for l in range(l_max):
+        for m in range(-l, l + 1):
+            mu = abs(m)
+            entries['z'].append((l, m, m, 2 * pi * Z[l, mu]))
+            if m == 0:
+                entries['x'].append((l, 0, 1, root2pi * U[l, 0]))
+                entries['y'].append((l, 0, -1, root2pi * U[l, 0]))
+                continue
+            sign = 1 if m > 0 else -1
+            entries['x'].append((l, m, sign * (mu + 1), pi * U[l, mu]))
+            if mu >= 2:
+                entries['x'].append((l, m, sign * (mu - 1), pi * V[l, mu]))
+            elif m > 0:
+                entries['x'].append((l, m, 0, root2pi * V[l, 1]))
+            if m > 0:
+                entries['y'].append((l, m, -(mu + 1), pi * U[l, mu]))
+                if mu >= 2:
+                    entries['y'].append((l, m, -(mu - 1), -pi * V[l, mu]))
+            else:
+                entries['y'].append((l, m, mu + 1, -pi * U[l, mu]))
+                if mu >= 2:
+                    entries['y'].append((l, m, mu - 1, pi * V[l, mu]))
+                else:
+                    entries['y'].append((l, m, 0, root2pi * V[l, 1]))
+    return {c: tuple(np.array(column) for column in zip(*rows)) for c, rows in entries.items()}
+
+def dipole_matrices(n_max, components=COMPONENTS, a0=1.0, format='csr'):
+    """
+    Sparse dipole matrices <n'l'm'| x_i |nlm> over every real orbital with n <= n_max.
+    Args:
+        n_max (int): largest principal quantum number
+        components (iterable): any of 'x', 'y', 'z'
+        a0 (float): Bohr radius (elements are in units of a0)
+        format (str): scipy.sparse format of the result ('csr', 'csc', 'coo', ...)
+    Returns:
+        dict: component -> sparse matrix of shape (basis_size(n_max),) * 2.
+        Rows/columns follow basis_index; the matrices are symmetric.
+    """
+    import scipy.sparse
+    for c in components:
+        if c not in COMPONENTS:
+            raise ValueError(f"Unknown component '{c}'. Use 'x', 'y' or 'z'.")
+
+    D = radial_dipole_integrals(n_max, a0)
+    angular = angular_dipole_factors(max(n_max - 1, 1))
+    size = basis_size(n_max)
+    shells = np.arange(1, n_max + 1)
+    offsets = (shells - 1) * shells * (2 * shells - 1) // 6
+
+    '''Assembly.
+       For every pair of shells (n lower-l side, n' upper-l side) the allowed
+       entries are "all angular factors with l < n and l+1 < n'", each scaled by
+       the matching radial integral D[n-1, l, n'-1]. That is one boolean mask and
+       one gather per pair, no loops over m. The l' = l - 1 half of the matrix
+       is the transpose, added at the end.'''
+    result = {}
+    for c in components:
+        l, m, m_prime, value = angular[c]
+        rows, cols, data = [], [], []
+        for n in shells:
+            for n2 in shells:
+                keep = (l < n) & (l + 1 < n2)
+                if not keep.any():
+                    continue
+                lk = l[keep]
+                rows.append(offsets[n2 - 1] + (lk + 1) * (lk + 1) + (lk + 1) + m_prime[keep])
+                cols.append(offsets[n - 1] + lk * lk + lk + m[keep])
+                data.append(value[keep] * D[n - 1, lk, n2 - 1])
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=int)
+        cols = np.concatenate(cols) if cols else np.zeros(0, dtype=int)
+        data = np.concatenate(data) if data else np.zeros(0)
+        upper = scipy.sparse.coo_matrix((data, (rows, cols)), shape=(size, size))
+        result[c] = (upper + upper.T).asformat(format)
+    return result
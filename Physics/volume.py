@@ -0,0 +1,101 @@
+import numpy as np
+
+from Physics.precision import resolve_dtype
+from Physics.wavefunction import psi_cartesian
+
+'''Rough number of full-size temporaries psi_cartesian keeps alive at once
+   (coordinates, r, the radial recurrence, the solid harmonic recurrence, the product),
+   counted in units of the working dtype.
+   The slab budget is divided by this, so slab_bytes bounds the whole evaluation,
+   not just the output slab.'''
+_TEMPORARIES_PER_POINT = 10
+
+def slab_planes(resolution, slab_bytes, dtype=np.float64):
+    """
+    How many z-planes of a resolution^3 box fit in a byte budget.
+    Args:
+        resolution (int): points per side
+        slab_bytes (int): memory budget for one slab, temporaries included
+        dtype: working precision (float32 fits twice the planes)
+    Returns:
+        int: planes per slab (at least 1)
+    """
+    plane_bytes = resolution * resolution * np.dtype(dtype).itemsize * _TEMPORARIES_PER_POINT
+    return max(1, min(resolution, int(slab_bytes // plane_bytes)))
+
+def iter_volume(n, l, m, range_a0=None, resolution=256, density=False,
+                slab_bytes=256 * 2**20, a0=1.0, dtype=np.float64, radial_backend='recurrence'):
+    """
+    Evaluates psi_nlm (or |psi|^2) on a 3-D cube, one z-slab at a time.
+    The cube is [-range_a0, range_a0]^3 with 'resolution' points per side,
+    indexed [z, y, x] like Grid.box.
+    Args:
+        n, l, m (int): quantum numbers
+        range_a0 (float): half width of the cube (default 5*n^2, same as plot_density)
+        resolution (int): points per side
+        density (bool): yield |psi|^2 instead of psi
+        slab_bytes (int): memory budget per slab (temporaries included)
+        a0 (float): Bohr radius
+        dtype: float64 (default) or float32
+        radial_backend (str): 'recurrence' (default) or 'table' (see psi_cartesian)
+    Yields:
+        tuple: (z_start, z_stop, slab) where slab has shape (z_stop - z_start, resolution, resolution)
+    """
+    if range_a0 is None:
+        range_a0 = 5 * n * n
+    dtype = resolve_dtype(dtype)
+
+    '''Why slabs?
+       A 1024^3 float64 cube is 8 GB on its own, and the evaluation needs several
+       temporaries of the same size on top of that. We only ever build a few
+       z-planes at a time: x is a row, y a column, the slab's z values a short
+       stack, and broadcasting fills in the (planes, N, N) block.'''
+    lin = np.linspace(-range_a0, range_a0, resolution).astype(dtype)
+    x = lin[np.newaxis, np.newaxis, :]
+    y = lin[np.newaxis, :, np.newaxis]
+    step = slab_planes(resolution, slab_bytes, dtype)
+
+    for z_start in range(0, resolution, step):
+        z_stop = min(z_start + step, resolution)
+        z = lin[z_start:z_stop, np.newaxis, np.newaxis]
+        psi = psi_cartesian(n, l, m, x, y, z, a0, dtype=dtype, radial_backend=radial_backend)
+        yield z_start, z_stop, psi * psi if density else psi
+
+def evaluate_volume(n, l, m, range_a0=None, resolution=256, density=False,
+                    out=None, path=None, slab_bytes=256 * 2**20, a0=1.0, dtype=np.float64,
+                    radial_backend='recurrence'):
+    """
+    Fills a resolution^3 array with psi_nlm (or |psi|^2), slab by slab.
+    The output can be a caller-supplied array (for example an np.memmap), a new
+    .npy file on disk ('path', opened as a memmap), or a fresh in-memory array.
+    Args:
+        n, l, m (int): quantum numbers
+        range_a0 (float): half width of the cube (default 5*n^2)
+        resolution (int): points per side
+        density (bool): store |psi|^2 instead of psi
+        out (numpy.ndarray): where to write, shape (resolution,)*3
+        path (str): create a .npy memmap here when out is not given
+        slab_bytes (int): memory budget per slab (temporaries included)
+        a0 (float): Bohr radius
+        dtype: float64 (default) or float32, also the dtype of a new output
+        radial_backend (str): 'recurrence' (default) or 'table' (see psi_cartesian)
+    Returns:
+        numpy.ndarray: the filled volume (out, the memmap, or a new array)
+    """
+    shape = (resolution,) * 3
+    dtype = resolve_dtype(dtype)
+    if out is None:
+        if path is not None:
+            out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+        else:
+            out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape:
+        raise ValueError(f"Output array has shape {out.shape}, expected {shape}")
+
+    for z_start, z_stop, slab in iter_volume(n, l, m, range_a0, resolution, density,
+                                             slab_bytes, a0, dtype, radial_backend):
+        out[z_start:z_stop] = slab
+
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
@@ -0,0 +1,97 @@
+import numpy as np
+
+from Physics.angular import angular_wavefunction, real_solid_harmonic
+from Physics.grid import Grid
+from Physics.precision import resolve_dtype
+from Physics.radial import log_radial_wavefunction, radial_wavefunction, reduced_radial_wavefunction
+from Physics.tables import radial_table
+
+def psi_cartesian(n, l, m, x, y, z, a0=1.0, dtype=np.float64, radial_backend='recurrence'):
+    """
+    Computes the full real wavefunction psi_nlm = R_nl(r) * Y_lm(theta, phi) at Cartesian points.
+    Never converts to spherical angles, so there is no arccos/atan2 pass over the grid.
+    Args:
+        n (int): principal quantum number
+        l (int): azimuthal quantum number
+        m (int): magnetic quantum number
+        x, y, z (numpy.ndarray): Cartesian coordinates (broadcastable), same units as a0
+        a0 (float): Bohr radius (default 1.0 for atomic units)
+        dtype: float64 (default) or float32
+        radial_backend (str): 'recurrence' (exact, default) or 'table' (cached
+                              RadialTable lookup, error <= 1e-7 of the radial peak)
+    Returns:
+        numpy.ndarray: psi_nlm at every point
+    """
+    if abs(m) > l:
+        raise ValueError(f"Physics violation: need |m| <= l. You passed l={l}, m={m}")
+
+    '''How it splits.
+       psi = R_nl(r) * Y_lm = [R_nl(r) / r^l] * [r^l * Y_lm]
+       The first bracket is smooth (no r^l, no 0/0 at the nucleus) and the second one
+       is a plain polynomial in x, y, z (the real solid harmonic).
+       Coordinates are measured in units of n^2 * a0 (roughly the size of the orbital),
+       so r^l stays a reasonable number even for big l on a big grid.'''
+    dtype = resolve_dtype(dtype)
+    length = n * n * a0
+    x, y, z = (np.asarray(v, dtype=dtype) for v in (x, y, z))
+    xs, ys, zs = (v * dtype.type(1 / length) for v in (x, y, z))
+
+    r = np.sqrt(xs * xs + ys * ys + zs * zs) * dtype.type(length)
+    with np.errstate(over='ignore', invalid='ignore'):
+        psi = (_reduced_radial(n, l, r, a0, length, dtype, radial_backend)
+               * real_solid_harmonic(l, m, xs, ys, zs, dtype=dtype))
+
+    '''Safety net (same idea as in radial_wavefunction).
+       For big l the two brackets can still leave the float range in opposite
+       directions: near the nucleus the first one is huge while r^l is 0, and in
+       the far corners r^l overflows while the first one is 0. That is inf * 0 = NaN
+       (float32 hits it already around l ~ 40, float64 around l ~ 400).
+       Close to the nucleus r^l can also sink below the smallest normal number and
+       lose its digits while the first bracket is still huge, so the product is
+       finite but wrong. Both kinds of points are redone as R_nl * Y_lm,
+       with R in log form and float64.'''
+    bad = ~np.isfinite(psi)
+    if l > 0:
+        bad = bad | (r < length * np.finfo(dtype).tiny ** (1 / l))
+    if bad.any():
+        psi = np.array(psi)
+        psi[bad] = _psi_log_form(n, l, m, *(np.broadcast_to(v, psi.shape)[bad] for v in (x, y, z)), a0)
+    return psi
+
+def _psi_log_form(n, l, m, x, y, z, a0):
+    # psi at a few points as sign * exp(log|R_nl|) * Y_lm, nothing in it can overflow
+    grid = Grid(x, y, z, x.shape)
+    log_R, sign = log_radial_wavefunction(n, l, grid, a0)
+    return sign * np.exp(log_R) * angular_wavefunction(l, m, grid)
+
+def _reduced_radial(n, l, r, a0, length, dtype, radial_backend):
+    # R_nl / (r/length)^l from the recurrence or from the cached lookup table
+    if radial_backend == 'table':
+        return radial_table(n, l, a0=a0).reduced(r, dtype=dtype)
+    if radial_backend != 'recurrence':
+        raise ValueError(f"Unknown radial_backend '{radial_backend}'. Use 'recurrence' or 'table'.")
+    return reduced_radial_wavefunction(n, l, r, a0, length=length, dtype=dtype)
+
+def wavefunction(n, l, m, grid, a0=1.0, dtype=None, radial_backend='recurrence'):
+    """
+    Computes psi_nlm = R_nl(r) * Y_lm on a Grid.
+    All the geometry (r, cos/sin theta, cos/sin(m*phi)) comes from the grid's cache,
+    so only the radial exp and the Legendre recurrence are paid per orbital.
+    Args:
+        n (int): principal quantum number
+        l (int): azimuthal quantum number
+        m (int): magnetic quantum number
+        grid (Grid): the sample points
+        a0 (float): Bohr radius (default 1.0 for atomic units)
+        dtype: float64 or float32 (default: the grid's dtype)
+        radial_backend (str): 'recurrence' (default) or 'table', as in psi_cartesian
+    Returns:
+        numpy.ndarray: psi_nlm with shape grid.shape
+    """
+    if radial_backend == 'table':
+        R = radial_table(n, l, a0=a0)(grid.r, dtype=resolve_dtype(dtype, default=grid.dtype))
+    elif radial_backend == 'recurrence':
+        R = radial_wavefunction(n, l, grid, a0, dtype)
+    else:
+        raise ValueError(f"Unknown radial_backend '{radial_backend}'. Use 'recurrence' or 'table'.")
+    return R * angular_wavefunction(l, m, grid, dtype=dtype)
@@ -0,0 +1,196 @@
+import glob
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+'''An on-disk cache for the arrays behind the pictures.
+   Changing a colormap or a title used to redo all the physics. Now a render
+   asks the cache first:
+       key  = sha256 of (mode, n, l, m, resolution, range, dtype, ..., code version)
+       file = <folder>/<key>.npy   (or .npz when a render needs several arrays)
+   A hit is opened with mmap_mode='r', so even a huge grid "loads" instantly
+   and only the pages that are actually drawn get read.
+
+   Code version = a hash of every Physics/*.py file plus the module that computes
+   the array (plot_radial picks the r range, plot_density the zoom, ...).
+   Edit either and all the old entries simply stop matching (no stale pictures
+   after a bug fix).
+
+   Size limit: least recently used goes first. "Used" is the file's modification
+   time, touched on every hit, so it also works across processes (the gallery
+   workers share one folder). New files are written to a temp name and renamed,
+   so a reader never sees half a file.
+
+   The cache is off until enable() is called (main.py does it for --cache).'''
+
+_PHYSICS_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Physics')
+_code_versions = {}
+
+def code_version(module=None):
+    """
+    A short hash of the Physics source code, plus the source of 'module' if given
+    (computed once per process and module).
+    Args:
+        module (str): dotted name of the module that computes the array, e.g. 'Visualization.plot_radial'
+    """
+    if module not in _code_versions:
+        paths = sorted(glob.glob(os.path.join(_PHYSICS_FOLDER, '*.py')))
+        source = getattr(sys.modules.get(module), '__file__', None) if module else None
+        if source:
+            paths.append(source)
+        digest = hashlib.sha256()
+        for path in paths:
+            digest.update(os.path.basename(path).encode())
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        _code_versions[module] = digest.hexdigest()[:16]
+    return _code_versions[module]
+
+class ArrayCache:
+    """
+    Content-addressed .npy/.npz store with a byte budget and LRU eviction.
+    """
+
+    def __init__(self, folder, max_bytes=2 * 2**30):
+        """
+        Args:
+            folder (str): where the files live (created if missing)
+            max_bytes (int): total size the folder is trimmed down to
+        """
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(folder, exist_ok=True)
+
+    def key(self, mode, module=None, **params):
+        """
+        The hash that names an entry. Params must be JSON-friendly (dtypes are turned into names).
+        module is the module that computes the array (its source is part of the code version).
+        """
+        clean = {k: (np.dtype(v).name if isinstance(v, (type, np.dtype)) else v) for k, v in params.items()}
+        if 'dtype' in clean:
+            # None, 'float32', np.float32 ... all name the same array; None is what every render turns into float64
+            clean['dtype'] = np.dtype(np.float64 if clean['dtype'] is None else clean['dtype']).name
+        text = json.dumps({'mode': mode, 'params': clean, 'code': code_version(module)},
+                          sort_keys=True, default=str)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _path(self, key, bundle):
+        return os.path.join(self.folder, key + ('.npz' if bundle else '.npy'))
+
+    def get(self, key, bundle=False):
+        """
+        The cached array (read-only memmap), a dict of arrays for bundles, or None.
+        """
+        path = self._path(key, bundle)
+        try:
+            if bundle:
+                with np.load(path) as data:
+                    value = {name: data[name] for name in data.files}
+            else:
+                value = np.load(path, mmap_mode='r')
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        """
+        Stores an array (.npy) or a dict of arrays (.npz), then trims the folder to max_bytes.
+        """
+        bundle = isinstance(value, dict)
+        path = self._path(key, bundle)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as f:
+            if bundle:
+                np.savez(f, **value)
+            else:
+                np.save(f, np.asarray(value))
+        os.replace(temporary, path)
+        self.evict()
+
+    def evict(self):
+        """
+        Deletes least recently used entries until the folder fits in max_bytes.
+        """
+        entries = []
+        for path in glob.glob(os.path.join(self.folder, '*.np[yz]')):
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            entries.append((info.st_mtime, info.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except OSError:
+                pass
+            total -= size
+
+    def fetch(self, mode, params, compute, bundle=False):
+        """
+        The cached result for (mode, params), or compute() stored and returned.
+        Args:
+            mode (str): what kind of array ('density', 'radial', ...)
+            params (dict): everything the result depends on
+            compute (callable): makes the array (or dict of arrays) on a miss;
+                                the source of the module it is defined in is part of the key
+            bundle (bool): the result is a dict of arrays (.npz)
+        """
+        key = self.key(mode, getattr(compute, '__module__', None), **params)
+        value = self.get(key, bundle)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def stats(self):
+        """
+        Counters for monitoring: hits, misses, evictions, plus the folder's current size.
+        """
+        files = glob.glob(os.path.join(self.folder, '*.np[yz]'))
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(files), 'bytes': sum(os.path.getsize(p) for p in files)}
+
+_active = None
+
+def enable(folder, max_bytes=2 * 2**30):
+    """
+    Turns the cache on for every render in this process.
+    """
+    global _active
+    _active = ArrayCache(folder, max_bytes)
+    return _active
+
+def disable():
+    global _active
+    _active = None
+
+def active():
+    """
+    The cache in use, or None when caching is off.
+    """
+    return _active
+
+def fetch(mode, params, compute, bundle=False):
+    """
+    Same as ArrayCache.fetch on the active cache; just compute() when caching is off.
+    """
+    if _active is None:
+        return compute()
+    return _active.fetch(mode, params, compute, bundle)
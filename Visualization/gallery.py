@@ -0,0 +1,156 @@
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Visualization import cache, output, plot_3d, plot_density, plot_radial
+
+'''The gallery: every orbital up to n_max, every mode, in one command.
+   The Legacy_scripts folder has one script per orbital. This replaces all of
+   them (and every orbital they never got to) with a process pool.
+
+   How it works:
+     - Every (mode, n, l, m) is one job. Radial plots don't care about m, so
+       they are one job per (n, l).
+     - The biggest jobs go first. If the slowest job started last, every other
+       worker would sit idle waiting for it at the end.
+     - Each worker process sets up the Agg backend once, and output.figure()
+       hands it the same figure for every render of a mode (one canvas per worker).
+     - Every finished job is appended to manifest.jsonl right away. If the run
+       dies halfway, the next run reads the manifest and skips what is done.
+     - At the end index.json lists everything (with timings) in a fixed order.'''
+
+MODES = ('shape', 'density', 'radial')
+
+# Rough relative cost of one render per mode (density is 800x800 pixels of R_nl * Y_lm)
+_MODE_COST = {'density': 8.0, 'shape': 2.0, 'radial': 1.0}
+
+def gallery_jobs(n_max, modes=MODES):
+    """
+    Every valid job up to n_max, biggest first.
+    Args:
+        n_max (int): largest principal quantum number
+        modes (iterable): any of 'shape', 'density', 'radial'
+    Returns:
+        list of dict: {'mode', 'n', 'l', 'm', 'file'} (m is None for radial)
+    """
+    if n_max < 1:
+        raise ValueError(f"n_max must be at least 1. You passed n_max={n_max}")
+    jobs = []
+    for mode in modes:
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}'. Use {', '.join(MODES)}.")
+        for n in range(1, n_max + 1):
+            for l in range(n):
+                for m in (range(-l, l + 1) if mode != 'radial' else [None]):
+                    name = f"n{n}_l{l}" + ("" if m is None else f"_m{m}")
+                    jobs.append({'mode': mode, 'n': n, 'l': l, 'm': m,
+                                 'file': os.path.join(mode, name)})
+
+    '''The cost guess: the radial recurrence is about n steps per point,
+       the Legendre part about l, everything else is a fixed price per mode.'''
+    jobs.sort(key=lambda job: -_MODE_COST[job['mode']] * (job['n'] + job['l'] + 4))
+    return jobs
+
+def _start_worker(cache_folder=None, cache_bytes=None):
+    # Runs once in every worker process, before its first job
+    output.use_headless()
+    if cache_folder is not None:
+        cache.enable(cache_folder, cache_bytes)
+
+def _run_job(job, folder, extension):
+    """
+    Renders one job in a worker. Never raises: failures come back in the record.
+    """
+    path = os.path.join(folder, job['file'] + extension)
+    start = time.perf_counter()
+    record = dict(job, path=path)
+    try:
+        # The renders chat a lot on stdout; with 8 workers that is just noise
+        with contextlib.redirect_stdout(io.StringIO()):
+            if job['mode'] == 'shape':
+                plot_3d.render(job['n'], job['l'], job['m'], output_path=path)
+            elif job['mode'] == 'density':
+                plot_density.render(job['n'], job['l'], job['m'], output_path=path)
+            else:
+                plot_radial.render(job['n'], job['l'], output_path=path)
+        record['ok'] = True
+    except Exception as e:
+        record['ok'] = False
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['seconds'] = round(time.perf_counter() - start, 4)
+    return record
+
+def _read_manifest(path):
+    """
+    The finished jobs of an earlier run: output path -> record (a half-written last line is ignored).
+    Keyed on the full path, extension included, so a run in another format does not count as done.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get('ok') and os.path.exists(record['path']):
+                done[record['path']] = record
+    return done
+
+def build_gallery(folder, n_max, modes=MODES, workers=None, extension='.png', resume=True):
+    """
+    Renders every orbital up to n_max in every mode, in parallel.
+    Args:
+        folder (str): where the images, manifest.jsonl and index.json go
+        n_max (int): largest principal quantum number
+        modes (iterable): any of 'shape', 'density', 'radial'
+        workers (int): worker processes (default: one per CPU)
+        extension (str): '.png', '.svg', '.pdf' or '.npy'
+        resume (bool): skip jobs an earlier run already finished
+    Returns:
+        list of dict: one record per job (mode, n, l, m, path, ok, seconds[, error])
+    """
+    output.check_output('gallery' + extension)
+    jobs = gallery_jobs(n_max, modes)
+    os.makedirs(folder, exist_ok=True)
+    for mode in set(job['mode'] for job in jobs):
+        os.makedirs(os.path.join(folder, mode), exist_ok=True)
+
+    manifest = os.path.join(folder, 'manifest.jsonl')
+    done = _read_manifest(manifest) if resume else {}
+    if not resume and os.path.exists(manifest):
+        os.remove(manifest)
+    path_of = lambda job: os.path.join(folder, job['file'] + extension)
+    todo = [job for job in jobs if path_of(job) not in done]
+    print(f"Gallery: {len(jobs)} jobs, {len(jobs) - len(todo)} already done, {len(todo)} to render")
+
+    '''Fan out.
+       Results come back in whatever order they finish; each one is written to the
+       manifest (and flushed) before the next, so a crash loses at most the jobs in flight.'''
+    records = dict(done)
+    start = time.perf_counter()
+    shared = cache.active()  # the workers use the same cache folder as this process
+    setup = (shared.folder, shared.max_bytes) if shared is not None else ()
+    with open(manifest, 'a') as log, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_start_worker, initargs=setup) as pool:
+        futures = [pool.submit(_run_job, job, folder, extension) for job in todo]
+        for count, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            log.write(json.dumps(record) + "\n")
+            log.flush()
+            records[record['path']] = record
+            label = f"{record['mode']:7s} n={record['n']} l={record['l']}" + \
+                    ("" if record['m'] is None else f" m={record['m']}")
+            status = f"{record['seconds']:.2f}s" if record['ok'] else f"FAILED ({record['error']})"
+            print(f"[{count}/{len(todo)}] {label}  {status}")
+    print(f"Gallery done in {time.perf_counter() - start:.1f}s")
+
+    '''The index: every job in the same order as gallery_jobs, whatever order they finished in.'''
+    index = [records[path_of(job)] for job in jobs if path_of(job) in records]
+    with open(os.path.join(folder, 'index.json'), 'w') as f:
+        json.dump(index, f, indent=1)
+    return index
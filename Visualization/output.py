@@ -0,0 +1,92 @@
+import os
+import sys
+
+import numpy as np
+
+'''Where a picture goes when it is done.
+   Every render used to end in plt.show(), which needs a screen and blocks until
+   somebody closes the window. Now a render takes an 'output' path:
+       None              -> plt.show(), same as before
+       .png / .svg / .pdf -> saved with the Agg backend (no screen needed)
+       .npy              -> only the computed array is saved, nothing is drawn at all
+
+   P.S: Making a new figure per render is surprisingly slow (new canvas, new
+   renderer, fonts...) and they pile up in memory if nobody closes them.
+   So each render mode keeps ONE figure (looked up by name), and the next
+   render just wipes it and draws again.
+   matplotlib itself is only imported once something is drawn, so a .npy
+   output never loads it.'''
+
+IMAGE_FORMATS = ('.png', '.svg', '.pdf')
+DATA_FORMATS = ('.npy',)
+
+class OutputFormatError(ValueError):
+    """
+    The output path has an extension we can't write (a file name problem, not a physics one).
+    """
+
+def use_headless():
+    """
+    Switches matplotlib to the non-interactive Agg backend (call before rendering to files).
+    """
+    if 'matplotlib' not in sys.modules:
+        # Nothing imported it yet, so just make Agg the default for when something does
+        os.environ['MPLBACKEND'] = 'Agg'
+        return
+    import matplotlib
+    import matplotlib.pyplot as plt
+    if matplotlib.get_backend().lower() != 'agg':
+        plt.switch_backend('Agg')
+
+def check_output(path):
+    """
+    Makes sure 'path' has a format we can write. None is fine (means: show on screen).
+    """
+    if path is None:
+        return
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in IMAGE_FORMATS + DATA_FORMATS:
+        raise OutputFormatError(f"Can't write '{path}'. Use one of {', '.join(IMAGE_FORMATS + DATA_FORMATS)}")
+
+def wants_data_only(path):
+    """
+    True if the output is a raw .npy file (the render can skip drawing).
+    """
+    return path is not None and os.path.splitext(path)[1].lower() in DATA_FORMATS
+
+def figure(name, figsize):
+    """
+    The reusable figure for one render mode, wiped clean.
+    Args:
+        name (str): which figure ('density', 'radial', ...)
+        figsize (tuple): size in inches (only used the first time)
+    Returns:
+        matplotlib.figure.Figure: an empty figure, also made the current one
+    """
+    import matplotlib.pyplot as plt
+    fig = plt.figure(num=name, figsize=figsize)
+    fig.clf()
+    return fig
+
+def finish(fig, output=None, data=None, dpi=100):
+    """
+    Shows the figure, or writes it (or its data) to 'output'.
+    Args:
+        fig (Figure): the drawn figure (may be None for .npy outputs)
+        output (str): None, or a .png/.svg/.pdf/.npy path
+        data (numpy.ndarray): what a .npy output stores
+        dpi (int): resolution of .png files
+    """
+    if output is None:
+        import matplotlib.pyplot as plt
+        plt.show()
+        return
+    check_output(output)
+    folder = os.path.dirname(output)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    if wants_data_only(output):
+        np.save(output, np.asarray(data))
+    else:
+        fig.savefig(output, dpi=dpi)
+    print(f"Saved {output}")
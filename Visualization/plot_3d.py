@@ -1,6 +1,7 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+from Visualization import cache, output
 '''Importing the Math Logic.
    Since our file structure puts 'physics' and 'visualization' as 
    neighbor folders inside 'Hydrogen_Engine', we can import directly 
@@ -10,13 +11,25 @@ from mpl_toolkits.mplot3d import Axes3D
    If you run this script directly, Python gets lost and can't find 'physics'.'''
 try:
     from Physics.angular import angular_wavefunction
+    from Physics.grid import Grid
+    from Physics.isosurface import isosurface
+    from Physics.precision import precision_note, resolve_dtype
 except ImportError:
     print("Error: Could not find angular_wavefunction.py. Make sure it's in the Physics folder and Run this from the project root!!")
 
-def render(n, l, m, resolution=100):
+def render(n, l, m, resolution=100, grid=None, dtype=None, iso=False, enclosed=0.9, output_path=None):
     """
     Renders the 3D angular shape. 
+    iso=True draws the real |psi|^2 surface holding 'enclosed' of the probability
+    instead (radial nodes and size included), see render_isosurface.
+    Pass the same Grid.shell(resolution) as 'grid' when drawing many orbitals,
+    the sphere geometry is then only worked out once.
+    dtype=np.float32 gives a cheaper preview (default: float64, or the grid's dtype).
+    output_path: None shows the plot, .png/.svg/.pdf saves it, .npy saves the (3, ...) surface [x, y, z].
+    Returns that same [x, y, z] surface.
     """
+    if iso:
+        return render_isosurface(n, l, m, enclosed=enclosed, dtype=dtype, output_path=output_path)
     print(f"Rendering 3D Surface for Orbital ({n},{l},{m})...")
     
     '''Step 1: The Grid (The mesh).
@@ -24,25 +37,39 @@ def render(n, l, m, resolution=100):
        Think of this like a wireframe globe.
        P.S: I set default resolution to 100. If you go to 200+, 
        Matplotlib gets super laggy and my laptop fans start screaming.'''
-    theta_grid = np.linspace(0, np.pi, resolution)
-    phi_grid = np.linspace(0, 2 * np.pi, resolution)
-    theta, phi = np.meshgrid(theta_grid, phi_grid)
+    own_grid = grid is None
+    if own_grid:
+        grid = Grid.shell(resolution, dtype=dtype)
 
     '''Step 2: The Shape Trick.
        We call our math function to get Y_lm.
        Then we set the radius 'r' equal to the magnitude of Y_lm.
        Because we want the "shape" to bulge out where the probability is high.
-       It's a visualization hack, but it's how every textbook does it.'''
-    Y_lm = angular_wavefunction(l, m, theta, phi)
+       It's a visualization hack, but it's how every textbook does it.
+       P.S: No meshgrid here anymore. The shell grid keeps theta as a row and phi
+       as a column, and Y_lm is separable in them, so the math only runs on the
+       two 1-D axes and broadcasting builds the (phi, theta) mesh.
+       That is what makes resolution 1000+ usable.'''
+    if own_grid:
+        # Same (l, m, resolution, dtype) as before -> the mesh comes from the cache (with --cache)
+        Y_lm = cache.fetch('shape', dict(l=l, m=m, resolution=resolution, dtype=dtype),
+                           lambda: angular_wavefunction(l, m, grid, dtype=dtype))
+    else:
+        Y_lm = angular_wavefunction(l, m, grid, dtype=dtype)
     r = np.abs(Y_lm)
 
     '''Step 3: Coordinate Conversion.
        Computer screens work in x,y,z (Cartesian).
        We have r, theta, phi (Spherical).
-       Standard conversion formulas apply here.'''
-    x = r * np.sin(theta) * np.cos(phi)
-    y = r * np.sin(theta) * np.sin(phi)
-    z = r * np.cos(theta)
+       Standard conversion formulas apply here.
+       The sin/cos of theta and phi are cached on the grid (row/column again).'''
+    x = r * (grid.cos_phi * grid.sin_theta)
+    y = r * (grid.sin_phi * grid.sin_theta)
+    z = r * grid.cos_theta
+    surface = np.stack(np.broadcast_arrays(x, y, z))
+    if output.wants_data_only(output_path):
+        output.finish(None, output_path, surface)
+        return surface
 
     '''Step 4: Painting the Phases.
        We want to see the positive lobes vs negative lobes.
@@ -55,8 +82,8 @@ def render(n, l, m, resolution=100):
     phase_colors[Y_lm > 0] = [0.1, 0.5, 1, 1.0] # Nice Dark Blue
     phase_colors[Y_lm < 0] = [1, 0.2, 0.2, 1.0] # Nice Dark Red
 
-    # Step 5: Plotting
-    fig = plt.figure(figsize=(10, 10))
+    # Step 5: Plotting (one reused figure, see Visualization/output.py)
+    fig = output.figure('shape', (10, 10))
     ax = fig.add_subplot(111, projection='3d')
     
     # rstride/cstride determines how detailed the wireframe is drawn.
@@ -74,5 +101,47 @@ def render(n, l, m, resolution=100):
     ax.set_zlim(-max_lim, max_lim)
     
     ax.axis() 
-    plt.show()
+    output.finish(fig, output_path, surface)
+    return surface
+
+def render_isosurface(n, l, m, enclosed=0.9, resolution=65, dtype=None, output_path=None):
+    """
+    Renders the surface |psi_nlm|^2 = const that holds 'enclosed' of the probability.
+    Unlike render(), this is the whole orbital: radial nodes show up as nested shells.
+    P.S: resolution 65 is already ~50k triangles, matplotlib is not a game engine.
+    output_path works like in render(); .npy saves the (T, 3, 3) triangles.
+    """
+    print(f"Rendering {enclosed:.0%} Isosurface for Orbital ({n},{l},{m})...")
+
+    '''Step 1: The triangles (Physics/isosurface.py does the heavy lifting).'''
+    surface = cache.fetch('isosurface', dict(n=n, l=l, m=m, enclosed=enclosed, resolution=resolution,
+                                             dtype=dtype),
+                          lambda: isosurface(n, l, m, enclosed=enclosed, resolution=resolution, dtype=dtype),
+                          bundle=True)
+    triangles = surface['triangles']
+    print(f"{len(triangles)} triangles, {surface['evaluated']:.0%} of the fine grid evaluated")
+
+    # The radial error bound is about psi, so it only means something here (the angular shape has no R_nl)
+    reach = np.sqrt(3) * np.max(np.abs(triangles)) if len(triangles) else None
+    note = precision_note(n, l, resolve_dtype(dtype), r_max=reach)
+    if note:
+        print(note)
+    if output.wants_data_only(output_path):
+        output.finish(None, output_path, triangles)
+        return surface
 
+    '''Step 2: Same phase colors as the angular plot.
+       Blue = positive lobe, Red = negative lobe.'''
+    colors = np.where(surface['signs'][:, np.newaxis] > 0, [0.1, 0.5, 1, 0.6], [1, 0.2, 0.2, 0.6])
+
+    fig = output.figure('isosurface', (10, 10))
+    ax = fig.add_subplot(111, projection='3d')
+    ax.add_collection3d(Poly3DCollection(triangles, facecolors=colors, linewidths=0))
+    ax.set_title(f"{enclosed:.0%} Probability Surface (n={n}, l={l}, m={m})", fontsize=20)
+
+    max_lim = np.max(np.abs(triangles)) if len(triangles) else 1.0
+    ax.set_xlim(-max_lim, max_lim)
+    ax.set_ylim(-max_lim, max_lim)
+    ax.set_zlim(-max_lim, max_lim)
+    output.finish(fig, output_path, triangles)
+    return surface
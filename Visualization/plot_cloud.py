@@ -0,0 +1,49 @@
+import numpy as np
+
+from Visualization import output
+
+'''Importing the Math.
+   Run this from main.py so Python can find the Physics folder.'''
+try:
+    from Physics.sampling import sample_positions
+except ImportError:
+    print("Error: Can't find the physics modules. Make sure it's in the Physics folder and Run this from the project root!!")
+
+def render(n, l, m, points=50000, seed=None, dtype=None, output_path=None):
+    """
+    Renders the orbital as a cloud of sampled electron positions.
+    Cheaper than plot_surface: no mesh, just one scatter call, and it shows
+    the radial nodes too (plot_3d only draws the angular shape).
+    Args:
+        n, l, m (int): quantum numbers
+        points (int): how many electrons to draw (50k looks good, 200k+ gets slow to rotate)
+        seed (int): same seed = same picture
+        dtype: float64 (default) or float32
+        output_path (str): None shows the plot, .png/.svg/.pdf saves it, .npy saves the (points, 3) positions
+    """
+    print(f"Rendering Point Cloud for Orbital ({n},{l},{m}) with {points} points...")
+
+    '''Step 1: Throw the dice.
+       Every point is one "measurement" of where the electron is.'''
+    positions, signs = sample_positions(n, l, m, points, seed=seed, dtype=dtype, signs=True)
+    if output.wants_data_only(output_path):
+        output.finish(None, output_path, positions)
+        return positions
+
+    '''Step 2: Same colors as plot_3d.
+       Blue = positive lobe, Red = negative lobe.
+       Tiny see-through dots, so dense regions look darker (that IS the probability).'''
+    colors = np.where(signs[:, np.newaxis] > 0, [0.1, 0.5, 1, 0.3], [1, 0.2, 0.2, 0.3])
+
+    fig = output.figure('cloud', (10, 10))
+    ax = fig.add_subplot(111, projection='3d')
+    ax.scatter(positions[:, 0], positions[:, 1], positions[:, 2], c=colors, s=1, linewidths=0)
+    ax.set_title(f"Electron Cloud (n={n}, l={l}, m={m})", fontsize=20)
+
+    # Cube limits so the cloud is not squashed (the 99.5% radius, so stray far points don't shrink it)
+    max_lim = np.quantile(np.linalg.norm(positions, axis=1), 0.995)
+    ax.set_xlim(-max_lim, max_lim)
+    ax.set_ylim(-max_lim, max_lim)
+    ax.set_zlim(-max_lim, max_lim)
+    output.finish(fig, output_path, positions)
+    return positions
@@ -1,21 +1,29 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from Visualization import cache, output
 
 '''Importing the Math.
    We need the two parts of the wavefunction we wrote earlier.
    If these imports fail, you are probably running this script from the wrong folder.
    Run 'main.py' instead of running this file directly.'''
 try:
-    from Physics.angular import angular_wavefunction
-    from Physics.radial import radial_wavefunction
+    from Physics.precision import precision_note
+    from Physics.wavefunction import psi_cartesian, wavefunction
 except ImportError:
     print("Error: Can't find the physics modules. Make sure it's in the Physics folder and Run this from the project root!!")
 
-def render(n, l, m, resolution=800, range_a0=None):
+def render(n, l, m, resolution=800, range_a0=None, grid=None, dtype=None, radial_backend='recurrence',
+           output_path=None):
     """
     Renders the 2D Probability Density Heatmap in the XZ plane.
     Basically: Taking a slice through the middle of the atom.
+    Pass a Grid.xz_slice as 'grid' to reuse its cached geometry across many orbitals
+    (resolution and range_a0 are then taken from the grid).
+    dtype=np.float32 halves the memory traffic for previews (default: float64, or the grid's dtype).
+    radial_backend='table' looks R_nl up in a cached cubic table instead of running the
+    Laguerre recurrence per pixel (worth it for big n, error <= 1e-7 of the radial peak).
+    output_path: None shows the plot, .png/.svg/.pdf saves it, .npy saves just the density.
+    Returns the density array (shape (resolution, resolution), [z, x]).
     """
     print(f"Rendering 2D Density Map for ({n},{l},{m})...")
 
@@ -25,51 +33,64 @@ def render(n, l, m, resolution=800, range_a0=None):
        
        P.S: If range_a0 is not set, I'll guess a good zoom level based on n.
        Larger n = bigger atom = we need to zoom out more.'''
-    if range_a0 is None:
+    if grid is not None:
+        range_a0 = grid.axis[-1]
+    elif range_a0 is None:
         range_a0 = 5 * n * n  # A rough heuristic: radius scales with n^2
     
-    # Create a square grid of points
-    lin = np.linspace(-range_a0, range_a0, resolution)
-    x, z = np.meshgrid(lin, lin)
-    
-    # We are slicing XZ plane, so Y is always 0.
-    y = 0
+    '''Step 2 + 3: The Assembly, straight from x, y, z.
+       This used to convert every pixel to r, theta, phi (arccos + a np.where for phi)
+       just so the angular part could take cos/sin of them again.
+       psi_cartesian works with the real solid harmonics, which are plain
+       polynomials in x, y, z, so the only transcendental left per pixel is
+       the exp() in the radial part. It also works off the XZ plane (any y),
+       where the old "phi is 0 or pi" shortcut would be wrong.'''
+    def compute():
+        if grid is not None:
+            # Shared grid: r, cos/sin theta and cos/sin(m*phi) are already cached on it
+            psi = wavefunction(n, l, m, grid, a0=1.0, dtype=dtype, radial_backend=radial_backend)
+        else:
+            # Create a square grid of points (x as a row, z as a column, broadcasting makes the square)
+            lin = np.linspace(-range_a0, range_a0, resolution)
+            x, z = lin[np.newaxis, :], lin[:, np.newaxis]
 
-    '''Step 2: The Coordinate Swap.
-       Computer screens use X,Z (Cartesian).
-       Physics equations use r, theta, phi (Spherical).
-       We just convert them here. No fancy math, just geometry.'''
-    r = np.sqrt(x**2 + z**2)
-    
-    # Theta is the angle from top (Z axis).
-    # We clip z/r to stay between -1 and 1 so arccos doesn't crash.
-    eps = 1e-10
-    theta = np.arccos(np.clip(z / (r + eps), -1, 1))
-    
-    # Phi is the angle around the middle. 
-    # Since we are on a flat slice (XZ), right side is 0, left side is Pi.
-    phi = np.where(x >= 0, 0, np.pi)
+            # We are slicing XZ plane, so Y is always 0.
+            y = 0
+            psi = psi_cartesian(n, l, m, x, y, z, a0=1.0, dtype=dtype, radial_backend=radial_backend)
 
-    '''Step 3: The Assembly.
-       We grab the Radial part (how far from center) and Angular part (the shape).
-       Multiply them together to get the Wavefunction (Psi).'''
-    R_nl = radial_wavefunction(n, l, r, a0=1.0)
-    Y_lm = angular_wavefunction(l, m, theta, phi)
-    
-    psi = R_nl * Y_lm
-    
-    '''Step 4: The Physics to Visuals part.
-       Wavefunction (Psi) can be negative.
-       Probability Density is Psi squared (always positive).
-       This tells us where the electron actually is.'''
-    density = np.abs(psi)**2
+        '''Step 4: The Physics to Visuals part.
+           Wavefunction (Psi) can be negative.
+           Probability Density is Psi squared (always positive).
+           This tells us where the electron actually is.'''
+        return np.abs(psi)**2
+
+    '''P.S: With --cache the density comes from disk when this exact picture
+       (same orbital, size, zoom, dtype) was computed before. A shared grid
+       can be anything, so that case always computes.'''
+    if grid is None:
+        density = cache.fetch('density', dict(n=n, l=l, m=m, resolution=resolution, range_a0=range_a0,
+                                              dtype=dtype, radial_backend=radial_backend), compute)
+    else:
+        density = compute()
+
+    note = precision_note(n, l, density.dtype, r_max=np.sqrt(2) * range_a0, values=density)
+    if note:
+        print(note)
+    if output.wants_data_only(output_path):
+        output.finish(None, output_path, density)
+        return density
 
     '''Step 5: The Plotting.
        We use a Heatmap.
        We plot sqrt(density) instead of raw density.
        Because electron density fades SUPER fast. If we didn't use sqrt,
        you would only see a tiny dot in the center and nothing else.'''
-    fig, ax = plt.subplots(figsize=(10, 8))
+    '''P.S: seaborn is only here for the 'rocket' colormap, and importing it drags in
+       pandas and scipy.stats (about a second). So it is imported right here,
+       when a picture is really drawn, not when the module loads.'''
+    import seaborn as sns
+    fig = output.figure('density', (10, 8))
+    ax = fig.add_subplot()
     
     im = ax.imshow(np.sqrt(density), cmap='rocket', origin='lower',
                    extent=[-range_a0, range_a0, -range_a0, range_a0])
@@ -80,5 +101,6 @@ def render(n, l, m, resolution=800, range_a0=None):
     ax.set_ylabel("z (Bohr Radii)")
     
     # Add a colorbar so we know what 'bright' means
-    plt.colorbar(im, label="Relative Probability (Sqrt scale)")
-    plt.show()
\ No newline at end of file
+    fig.colorbar(im, label="Relative Probability (Sqrt scale)")
+    output.finish(fig, output_path, density)
+    return density
\ No newline at end of file
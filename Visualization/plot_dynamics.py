@@ -0,0 +1,62 @@
+import numpy as np
+import matplotlib.pyplot as plt
+
+'''Importing the Math.
+   Run this through main.py so Python can find the Physics folder.'''
+try:
+    from Physics.dynamics import DrivenAtom, density_frames, oscillating_field
+except ImportError:
+    print("Error: Can't find the physics modules. Make sure it's in the Physics folder and Run this from the project root!!")
+
+from Visualization.plot_wavepacket import animate
+
+def render(n_max, initial, amplitude, omega, duration, samples=200, polarization='z',
+           ramp=0.0, method='split', show_density=False, resolution=200):
+    """
+    Drives hydrogen with F(t) = amplitude * cos(omega t) and plots the shell populations.
+    Args:
+        n_max (int): largest n in the basis
+        initial (tuple): starting (n, l, m)
+        amplitude (float): field strength (atomic units)
+        omega (float): field frequency (Hartree)
+        duration (float): how long to drive (atomic units)
+        samples (int): number of points on the time axis
+        polarization (str): 'x', 'y' or 'z'
+        ramp (float): field turn-on time (atomic units)
+        method (str): 'split' or 'krylov' (see Physics.dynamics)
+        show_density (bool): also animate |Psi(t)|^2 in the XZ plane
+        resolution (int): pixels per side of that animation
+    """
+    atom = DrivenAtom(n_max, polarization)
+    print(f"Driving hydrogen in a basis of {len(atom.states)} states (n <= {n_max})...")
+
+    '''Step 1: The physics.
+       One propagate call, sampled at 'samples' times.'''
+    times = np.linspace(0, duration, samples)
+    field = oscillating_field(amplitude, omega, ramp=ramp)
+    result = atom.propagate(tuple(initial), times, field, method=method)
+
+    '''Step 2: Populations per shell.
+       Only shells that ever get more than 0.1% are worth a line on the plot.'''
+    import seaborn as sns  # slow import, so only when drawing
+    sns.set_theme(style="whitegrid")
+    plt.figure(figsize=(10, 6))
+    shells = result['shell_populations']
+    for n in range(n_max):
+        if shells[:, n].max() > 1e-3:
+            plt.plot(times, shells[:, n], label=f"n={n + 1}")
+    plt.title(f"Shell Populations, F0={amplitude:g} a.u., omega={omega:g} Ha")
+    plt.xlabel("Time (atomic units)")
+    plt.ylabel("Population")
+    plt.ylim(0, 1.05)
+    plt.legend()
+
+    '''Step 3 (optional): The cloud itself.
+       Hands the coefficients to the same animation the wavepacket mode uses.'''
+    animation = None
+    if show_density:
+        extent = 5 * n_max * n_max
+        frames = density_frames(atom, result, range_a0=extent, resolution=resolution)
+        animation = animate(frames, extent, samples, "Driven")
+    plt.show()
+    return result, animation
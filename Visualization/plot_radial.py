@@ -1,19 +1,26 @@
 import numpy as np
-import matplotlib.pyplot as plt
+
+from Visualization import cache, output
 
 '''Importing the Math.
    We need the radial logic from the physics folder.
    If you get an error here, you are likely running this script directly 
    instead of running main.py.'''
 try:
-    from Physics.radial import radial_wavefunction
+    from Physics.expectation import most_probable_radius, radial_moment, radial_spread
+    from Physics.precision import precision_note, resolve_dtype
+    from Physics.radial import log_radial_wavefunction, radial_wavefunction
 except ImportError:
     print("Error: Could not find physics module. Make sure it's in the Physics folder and Run this from the project root!!")
 
-def render(n, l):
+def render(n, l, dtype=None, log_scale=False, output_path=None):
     """
     Renders the Radial Distribution Function P(r).
     This graph shows 'How likely is it to find the electron at distance r?'
+    dtype=np.float32 computes in single precision (default: float64).
+    log_scale=True plots log10 P(r) instead, so the far tail stays visible.
+    output_path: None shows the plot, .png/.svg/.pdf saves it, .npy saves the (2, points) array [r, P(r)].
+    Returns that same [r, P(r)] array.
     """
     print(f"Rendering Radial Distribution for n={n}, l={l}...")
 
@@ -25,11 +32,67 @@ def render(n, l):
        Electron distance scales with n^2 (Basic QM).
        So we set the max distance to roughly 3 * n^2 + 20 just to be safe.'''
     max_r = 3 * n**2 + 20
-    r = np.linspace(0, max_r, 1000) 
+
+    # With --cache a curve computed before (same n, l, dtype, scale) comes straight from disk
+    curve = cache.fetch('radial', dict(n=n, l=l, dtype=dtype, log_scale=log_scale),
+                        lambda: _curve(n, l, max_r, dtype, log_scale))
+    r, P_r = curve
+    note = precision_note(n, l, resolve_dtype(dtype), r_max=max_r, values=None if log_scale else P_r)
+    if note:
+        print(note)
+
+    if output.wants_data_only(output_path):
+        output.finish(None, output_path, curve)
+        return curve
+
+    '''Step 4: The Plotting.
+       Standard matplotlib stuff to make it look nice.
+       P.S: pyplot is imported only here, a .npy output never needs it.'''
+    import matplotlib.pyplot as plt
+    fig = output.figure('radial', (10, 6))
+    
+    # Plot the line
+    plt.plot(r, P_r, lw=2, color='purple', label=f'n={n}, l={l}')
     
+    # Fill under the curve so it looks like a probability distribution
+    # (not on the log plot, there is no "zero" to fill down to)
+    if not log_scale:
+        plt.fill_between(r, P_r, alpha=0.3, color='purple')
+
+    '''P.S: <r>, the peak and the spread are exact (Kramers' recursion),
+       not read off the sampled curve, so they don't depend on the 1000 points.'''
+    mean_r = radial_moment(n, l, 1)
+    peak_r = most_probable_radius(n, l)
+    print(f"<r> = {mean_r:.4g}, most probable r = {peak_r:.4g}, spread = {radial_spread(n, l):.4g} (Bohr radii)")
+    plt.axvline(mean_r, color='black', ls='--', lw=1, label=f'<r> = {mean_r:.4g}')
+    plt.axvline(peak_r, color='gray', ls=':', lw=1, label=f'most probable r = {peak_r:.4g}')
+    
+    plt.title(f"Radial Distribution Function (n={n}, l={l})")
+    plt.xlabel("Distance from Nucleus (Bohr Radii)")
+    plt.ylabel("log10 P(r)" if log_scale else "Probability P(r)")
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    output.finish(fig, output_path, curve)
+    return curve
+
+def _curve(n, l, max_r, dtype, log_scale):
+    """
+    The [r, P(r)] array that render() plots (log10 P(r) when log_scale).
+    """
+    r = np.linspace(0, max_r, 1000) 
+
+    '''P.S: On a log axis the tail drops below 1e-308 long before the plot ends
+       (and P(r) would just turn into 0 there). So in log mode we never build R or P(r)
+       at all: log10 P = (2 log r + 2 log|R|) / ln(10), straight from the log path.'''
+    if log_scale:
+        log_R, _ = log_radial_wavefunction(n, l, r, a0=1.0, dtype=dtype)
+        with np.errstate(divide='ignore'):
+            log_P = (2 * np.log(r.astype(log_R.dtype)) + 2 * log_R) / log_R.dtype.type(np.log(10))
+        return np.stack([r, log_P])
+
     '''Step 2: Get the raw math.
        We call the function we wrote in physics/radial.py.'''
-    R_nl = radial_wavefunction(n, l, r, a0=1.0)
+    R_nl = radial_wavefunction(n, l, r, a0=1.0, dtype=dtype)
     
     '''Step 3: The Probability Transformation.
        R_nl is just the amplitude.
@@ -45,19 +108,4 @@ def render(n, l):
        This explains why the electron is rarely at the nucleus (r=0).'''
     P_r = (r**2) * (np.abs(R_nl)**2)
 
-    '''Step 4: The Plotting.
-       Standard matplotlib stuff to make it look nice.'''
-    plt.figure(figsize=(10, 6))
-    
-    # Plot the line
-    plt.plot(r, P_r, lw=2, color='purple', label=f'n={n}, l={l}')
-    
-    # Fill under the curve so it looks like a probability distribution
-    plt.fill_between(r, P_r, alpha=0.3, color='purple')
-    
-    plt.title(f"Radial Distribution Function (n={n}, l={l})")
-    plt.xlabel("Distance from Nucleus (Bohr Radii)")
-    plt.ylabel("Probability P(r)")
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    plt.show()
\ No newline at end of file
+    return np.stack([r, P_r])
@@ -0,0 +1,75 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
+
+'''Importing the Math.
+   Same story as plot_density: run this through main.py, not directly.'''
+try:
+    from Physics.wavepacket import Wavepacket
+except ImportError:
+    print("Error: Can't find the physics modules. Make sure it's in the Physics folder and Run this from the project root!!")
+
+def render(states, coefficients, frames=120, duration=None, resolution=300, range_a0=None,
+           dtype=None, interval=40):
+    """
+    Animates |Psi(t)|^2 of a superposition in the XZ plane.
+    Args:
+        states (list of (n, l, m)): the states in the packet
+        coefficients (list): their complex amplitudes (normalized for you)
+        frames (int): number of frames
+        duration (float): time span in atomic units (default: one slowest beat)
+        resolution (int): pixels per side
+        range_a0 (float): half width of the view (default 5 * n_max^2)
+        dtype: float64 (default) or float32
+        interval (int): milliseconds between frames
+    """
+    print(f"Rendering Wavepacket of {len(states)} states...")
+
+    '''Step 1: The expensive part, done once.
+       Every state gets evaluated on the slice exactly one time, right here.
+       After this the frames are just phases times a stored matrix.'''
+    packet = Wavepacket(states, coefficients, resolution=resolution, range_a0=range_a0, dtype=dtype)
+    if duration is None:
+        duration = packet.beat_period() or 1.0
+    times = np.linspace(0, duration, frames)
+    extent = packet.grid.axis[-1]
+
+    '''Step 2: The animation.
+       Same look as plot_density (sqrt of the density, 'rocket' colors).
+       P.S: The frames come from a generator, so only one batch of
+       frames lives in memory at a time, not the whole movie.'''
+    animation = animate(packet.frames(times), extent, frames, "Wavepacket", interval)
+    plt.show()
+    return animation
+
+def animate(stream, extent, frames, label, interval=40):
+    """
+    Plays a stream of (t, density) frames in the XZ plane.
+    Args:
+        stream (iterator): yields (t, density) pairs
+        extent (float): half width of the view (Bohr radii)
+        frames (int): how many frames the stream has
+        label (str): what goes in front of the title
+        interval (int): milliseconds between frames
+    Returns:
+        FuncAnimation: keep a reference to it, or matplotlib throws it away
+    """
+    import seaborn as sns  # registers the 'rocket' colormap (slow import, so only when drawing)
+    _, first = next(stream)
+    fig, ax = plt.subplots(figsize=(10, 8))
+    vmax = np.sqrt(first.max())
+    im = ax.imshow(np.sqrt(first), cmap='rocket', origin='lower', vmin=0, vmax=vmax,
+                   extent=[-extent, extent, -extent, extent])
+    title = ax.set_title(f"{label} |Psi|^2, t = 0 a.u.")
+    ax.set_xlabel("x (Bohr Radii)")
+    ax.set_ylabel("z (Bohr Radii)")
+    plt.colorbar(im, label="Relative Probability (Sqrt scale)")
+
+    def update(_):
+        t, density = next(stream, (None, None))
+        if density is not None:
+            im.set_data(np.sqrt(density))
+            title.set_text(f"{label} |Psi|^2, t = {t:.4g} a.u.")
+        return im, title
+
+    return FuncAnimation(fig, update, frames=frames - 1, interval=interval, blit=False, repeat=False)
@@ -0,0 +1,145 @@
+import json
+import os
+
+import matplotlib
+import numpy as np
+from PIL import Image
+
+'''Importing the Math.
+   Run this through main.py so Python can find the Physics folder.'''
+try:
+    from Physics.precision import resolve_dtype
+    from Physics.tables import tail_radius
+    from Physics.wavefunction import psi_cartesian
+except ImportError:
+    print("Error: Can't find the physics modules. Make sure it's in the Physics folder and Run this from the project root!!")
+
+'''Tile pyramids: density maps far too big for one array.
+   A 32768 x 32768 float64 image is 8 GB, and plot_density would want a few
+   of those at once. Instead the picture is cut into square tiles (512 x 512 by
+   default) and stored like an online map:
+       <folder>/<level>/<x>_<y>.png (or .npy)
+   Level 0 is the whole slice in ONE tile, and every level below splits each
+   tile into 4, down to the full resolution at the last level.
+   x counts tiles left to right, y top to bottom (row 0 is the top, biggest z),
+   the usual map convention, so any tile viewer can browse it.
+
+   Only the last level is ever computed. A tile one level up is its 4 children
+   glued together and shrunk 2x (each pixel = average of 4), so it costs no
+   physics at all. Going depth first means only a handful of tiles per level
+   are in memory at a time, whatever the total size.
+
+   P.S: Pixel brightness is sqrt(density), same as plot_density. All tiles must share one
+   color scale, so a quick low-resolution pass finds the maximum first.
+   The PNGs are 8-bit palette images with the 'rocket' colors as the palette:
+   one byte per pixel and light compression, ~10x faster to write than
+   matplotlib's imsave (which was most of the run time).'''
+
+def _tile_density(n, l, m, axis, ix, iz, tile, dtype, radial_backend, r_tail):
+    """
+    |psi|^2 on one full-resolution tile, rows from top (big z) to bottom.
+    """
+    x = axis[ix * tile:(ix + 1) * tile][np.newaxis, :]
+    z = axis[::-1][iz * tile:(iz + 1) * tile][:, np.newaxis]
+
+    # The whole tile is out in the tail (|R| < 1e-7 of its peak everywhere): nothing to compute
+    nearest_x = 0.0 if x[0, 0] <= 0 <= x[0, -1] else min(abs(x[0, 0]), abs(x[0, -1]))
+    nearest_z = 0.0 if z[-1, 0] <= 0 <= z[0, 0] else min(abs(z[0, 0]), abs(z[-1, 0]))
+    if np.hypot(nearest_x, nearest_z) > r_tail:
+        return np.zeros((tile, tile), dtype=dtype)
+    psi = psi_cartesian(n, l, m, x, 0, z, a0=1.0, dtype=dtype, radial_backend=radial_backend)
+    return psi * psi
+
+def _shrink(block):
+    """
+    2x2 average: (2k, 2k) -> (k, k).
+    """
+    k = block.shape[0] // 2
+    return block.reshape(k, 2, k, 2).mean(axis=(1, 3))
+
+def _palette(name='rocket'):
+    """
+    A colormap as a flat [r, g, b, r, g, b, ...] list of 256 colors, for PIL palette images.
+    """
+    import seaborn as sns  # registers the 'rocket' colormap (slow import, so only when needed)
+    colors = matplotlib.colormaps[name](np.linspace(0, 1, 256))[:, :3]
+    return np.round(colors * 255).astype(np.uint8).ravel().tolist()
+
+def build_tiles(folder, n, l, m, resolution=32768, tile=512, range_a0=None, image_format='png',
+                dtype=None, radial_backend='table'):
+    """
+    Writes the XZ density of psi_nlm as a multi-resolution tile pyramid.
+    Args:
+        folder (str): output folder (levels go in numbered subfolders, plus tiles.json)
+        n, l, m (int): quantum numbers
+        resolution (int): pixels per side at full detail (tile * a power of 2)
+        tile (int): pixels per side of one tile
+        range_a0 (float): half width of the slice (default 5*n^2, same as plot_density)
+        image_format (str): 'png' (colored, sqrt scale) or 'npy' (raw density)
+        dtype: float64 (default) or float32 for the evaluation
+        radial_backend (str): 'table' (default, fast for big n) or 'recurrence'
+    Returns:
+        dict: the tiles.json metadata
+    """
+    if tile < 1 or resolution < tile:
+        raise ValueError(f"resolution must be at least one tile. You passed resolution={resolution}, tile={tile}")
+    levels = int(round(np.log2(resolution / tile)))
+    if resolution % tile or tile << levels != resolution:
+        raise ValueError(f"resolution must be tile * 2^k. You passed resolution={resolution}, tile={tile}")
+    if image_format not in ('png', 'npy'):
+        raise ValueError(f"Unknown format '{image_format}'. Use 'png' or 'npy'.")
+    if range_a0 is None:
+        range_a0 = 5 * n * n
+    dtype = resolve_dtype(dtype)
+    axis = np.linspace(-range_a0, range_a0, resolution)
+
+    '''Step 1: The shared color scale, from a cheap 1024 x 1024 pass.'''
+    preview = np.linspace(-range_a0, range_a0, min(resolution, 1024))
+    vmax = float(np.sqrt(np.max(psi_cartesian(n, l, m, preview[np.newaxis, :], 0, preview[:, np.newaxis],
+                                              a0=1.0, dtype=dtype, radial_backend=radial_backend) ** 2)))
+    palette = _palette('rocket')
+
+    '''P.S: Big-n slices are mostly empty corners. Past the tail radius (where a
+       radial table would end) R_nl is below 1e-7 of its peak (the density below 1e-14),
+       so tiles entirely out there are just zeros and skip the physics.
+       It is one coarse R_nl scan, so the recurrence backend never builds a table for it.'''
+    r_tail = tail_radius(n, l)
+
+    def save(level, ix, iz, density):
+        path = os.path.join(folder, str(level), f"{ix}_{iz}.{image_format}")
+        if image_format == 'npy':
+            np.save(path, density)
+        else:
+            index = np.clip(np.sqrt(density) * (255 / vmax) + 0.5, 0, 255).astype(np.uint8)
+            image = Image.frombytes('P', (index.shape[1], index.shape[0]), index.tobytes())
+            image.putpalette(palette)
+            image.save(path, compress_level=1)
+
+    '''Step 2: Depth first through the pyramid.
+       build(level, ix, iz) returns that tile's density and saves it on the way.
+       At the last level that means evaluating psi; above it, asking the 4
+       children and shrinking them.'''
+    def build(level, ix, iz):
+        if level == levels:
+            density = _tile_density(n, l, m, axis, ix, iz, tile, dtype, radial_backend, r_tail)
+        else:
+            block = np.empty((2 * tile, 2 * tile), dtype=dtype)
+            for dz in (0, 1):
+                for dx in (0, 1):
+                    block[dz * tile:(dz + 1) * tile, dx * tile:(dx + 1) * tile] = \
+                        build(level + 1, 2 * ix + dx, 2 * iz + dz)
+            density = _shrink(block)
+        save(level, ix, iz, density)
+        return density
+
+    for level in range(levels + 1):
+        os.makedirs(os.path.join(folder, str(level)), exist_ok=True)
+    print(f"Building {levels + 1} levels, {sum(4**k for k in range(levels + 1))} tiles of {tile}x{tile}...")
+    build(0, 0, 0)
+
+    metadata = {'n': n, 'l': l, 'm': m, 'resolution': resolution, 'tile': tile, 'levels': levels + 1,
+                'range_a0': range_a0, 'format': image_format, 'vmax_sqrt_density': vmax,
+                'layout': '<level>/<x>_<y>, level 0 = whole slice, y = 0 is the top (largest z)'}
+    with open(os.path.join(folder, 'tiles.json'), 'w') as f:
+        json.dump(metadata, f, indent=1)
+    return metadata
@@ -1,4 +1,5 @@
 import argparse
+import os
 import sys
 
 '''The Path Hack.
@@ -11,7 +12,11 @@ import sys
          Gemini AI , subreddit r/python and stackoverflow. kindly forgive me for mistakes and errors'''
 sys.path.append('.')
 
-from Visualization import plot_3d, plot_density, plot_radial
+'''P.S: No "from Visualization import ..." up here anymore.
+   Importing every plot module at startup loaded matplotlib, seaborn (which loads
+   pandas and scipy.stats) and scipy before argparse even looked at the command,
+   so even --help took seconds. Now every mode imports only what it uses,
+   right where it is dispatched below.'''
 
 def main():
     '''Setting up the Argument Parser.
@@ -23,6 +28,12 @@ def main():
        This is like the main menu. The user has to pick ONE mode.
        dest='command' means: "Whatever the user types (shape/density/radial), 
        save it in a variable called 'args.command' so I can check it later."'''
+    # --cache goes BEFORE the mode: python main.py --cache ~/.hydrogen_cache density -n 3 -l 2 -m 0
+    # Computed arrays are kept there, so re-rendering the same orbital skips the physics.
+    parser.add_argument('--cache', default=os.environ.get('HYDROGEN_CACHE'),
+                        help='Folder for cached arrays (default: $HYDROGEN_CACHE, off if unset)')
+    parser.add_argument('--cache-size', type=float, default=2048, help='Cache size limit in MB')
+
     subparsers = parser.add_subparsers(dest='command', help='Select Visualization Mode')
 
     # ==========================================
@@ -40,6 +51,18 @@ def main():
     shape_parser.add_argument('-l', type=int, required=True, help='Azimuthal Quantum Number')
     shape_parser.add_argument('-m', type=int, required=True, help='Magnetic Quantum Number')
 
+    # float32 is for quick previews: half the memory traffic, error bound gets printed
+    shape_parser.add_argument('--dtype', choices=['float64', 'float32'], default='float64',
+                              help='Compute precision (float32 = faster preview)')
+
+    # --iso draws the real probability surface instead of the angular |Y_lm| shape
+    shape_parser.add_argument('--iso', action='store_true',
+                              help='Draw the |psi|^2 isosurface (radial nodes included)')
+    shape_parser.add_argument('--enclosed', type=float, default=0.9,
+                              help='Probability inside the isosurface (with --iso)')
+    shape_parser.add_argument('-o', '--output', default=None,
+                                help='Save to .png/.svg/.pdf (or raw data .npy) instead of opening a window')
+
     # ==========================================
     # MODE 2: 2D Density
     # ==========================================
@@ -48,6 +71,12 @@ def main():
     density_parser.add_argument('-n', type=int, required=True)
     density_parser.add_argument('-l', type=int, required=True)
     density_parser.add_argument('-m', type=int, required=True)
+    density_parser.add_argument('--dtype', choices=['float64', 'float32'], default='float64',
+                                help='Compute precision (float32 = faster preview)')
+    density_parser.add_argument('--radial', choices=['recurrence', 'table'], default='recurrence',
+                                help='How R_nl is evaluated (table = cached cubic lookup, faster for big n)')
+    density_parser.add_argument('-o', '--output', default=None,
+                                  help='Save to .png/.svg/.pdf (or raw data .npy) instead of opening a window')
 
     # ==========================================
     # MODE 3: Radial Graph
@@ -56,6 +85,85 @@ def main():
     radial_parser = subparsers.add_parser('radial', help='1D Radial Distribution')
     radial_parser.add_argument('-n', type=int, required=True)
     radial_parser.add_argument('-l', type=int, required=True)
+    radial_parser.add_argument('--dtype', choices=['float64', 'float32'], default='float64',
+                               help='Compute precision (float32 = faster preview)')
+    radial_parser.add_argument('--log', action='store_true',
+                               help='Plot log10 P(r) (keeps the far tail visible)')
+    radial_parser.add_argument('-o', '--output', default=None,
+                                 help='Save to .png/.svg/.pdf (or raw data .npy) instead of opening a window')
+
+    # ==========================================
+    # MODE 4: Wavepacket Animation
+    # ==========================================
+    # This creates the command: python main.py wavepacket --state 1,0,0 --state 2,1,0 ...
+    # Each --state is n,l,m with an optional complex amplitude: n,l,m,re or n,l,m,re,im
+    packet_parser = subparsers.add_parser('wavepacket', help='Animated superposition of states')
+    packet_parser.add_argument('--state', action='append', required=True,
+                               help='n,l,m[,re[,im]] (repeat for every state)')
+    packet_parser.add_argument('--frames', type=int, default=120)
+    packet_parser.add_argument('--duration', type=float, default=None,
+                               help='Time span in atomic units (default: one slowest beat)')
+    packet_parser.add_argument('--dtype', choices=['float64', 'float32'], default='float64',
+                               help='Compute precision (float32 = faster preview)')
+
+    # ==========================================
+    # MODE 5: Driven Atom
+    # ==========================================
+    # This creates the command: python main.py driven --n-max 5 --omega 0.375 ...
+    # Field and time are in atomic units (omega in Hartree, 0.375 = Lyman alpha)
+    driven_parser = subparsers.add_parser('driven', help='Hydrogen in an oscillating field (populations vs time)')
+    driven_parser.add_argument('--n-max', type=int, default=5, help='Largest n in the basis')
+    driven_parser.add_argument('--initial', default='1,0,0', help='Starting state n,l,m')
+    driven_parser.add_argument('--field', type=float, default=1e-3, help='Field amplitude (a.u.)')
+    driven_parser.add_argument('--omega', type=float, default=0.375, help='Field frequency (Hartree)')
+    driven_parser.add_argument('--duration', type=float, default=5000.0, help='Time span (a.u.)')
+    driven_parser.add_argument('--polarization', choices=['x', 'y', 'z'], default='z')
+    driven_parser.add_argument('--method', choices=['split', 'krylov'], default='split')
+    driven_parser.add_argument('--density', action='store_true', help='Also animate |Psi(t)|^2')
+
+    # ==========================================
+    # MODE 6: Point Cloud
+    # ==========================================
+    # This creates the command: python main.py cloud -n 3 -l 2 -m 0 --points 100000
+    cloud_parser = subparsers.add_parser('cloud', help='3D cloud of sampled electron positions')
+    cloud_parser.add_argument('-n', type=int, required=True)
+    cloud_parser.add_argument('-l', type=int, required=True)
+    cloud_parser.add_argument('-m', type=int, required=True)
+    cloud_parser.add_argument('--points', type=int, default=50000, help='Number of sampled positions')
+    cloud_parser.add_argument('--seed', type=int, default=None, help='Same seed = same cloud')
+    cloud_parser.add_argument('-o', '--output', default=None,
+                                help='Save to .png/.svg/.pdf (or raw data .npy) instead of opening a window')
+    cloud_parser.add_argument('--dtype', choices=['float64', 'float32'], default='float64',
+                              help='Compute precision (float32 = faster preview)')
+
+    # ==========================================
+    # MODE 7: Gallery (every orbital, every mode)
+    # ==========================================
+    # This creates the command: python main.py gallery --n-max 4 --out gallery
+    gallery_parser = subparsers.add_parser('gallery', help='Render every orbital up to n_max to files')
+    gallery_parser.add_argument('--n-max', type=int, default=4, help='Largest n to render')
+    # Same list as Visualization.gallery.MODES (written out so --help doesn't import the plot modules)
+    gallery_modes = ['shape', 'density', 'radial']
+    gallery_parser.add_argument('--modes', nargs='+', choices=gallery_modes, default=gallery_modes)
+    gallery_parser.add_argument('--out', default='gallery', help='Output folder')
+    gallery_parser.add_argument('--format', choices=['png', 'svg', 'pdf', 'npy'], default='png')
+    gallery_parser.add_argument('--workers', type=int, default=None, help='Processes (default: all CPUs)')
+    gallery_parser.add_argument('--fresh', action='store_true', help='Ignore an earlier run and redo everything')
+
+    # ==========================================
+    # MODE 8: Tile Pyramid
+    # ==========================================
+    # This creates the command: python main.py tiles -n 30 -l 5 -m 2 --resolution 32768 --out tiles
+    tiles_parser = subparsers.add_parser('tiles', help='Huge density map as a zoomable tile pyramid')
+    tiles_parser.add_argument('-n', type=int, required=True)
+    tiles_parser.add_argument('-l', type=int, required=True)
+    tiles_parser.add_argument('-m', type=int, required=True)
+    tiles_parser.add_argument('--resolution', type=int, default=32768, help='Pixels per side (tile * 2^k)')
+    tiles_parser.add_argument('--tile', type=int, default=512, help='Pixels per side of one tile')
+    tiles_parser.add_argument('--format', choices=['png', 'npy'], default='png')
+    tiles_parser.add_argument('--out', default='tiles', help='Output folder')
+    tiles_parser.add_argument('--dtype', choices=['float64', 'float32'], default='float64',
+                              help='Compute precision (float32 = faster preview)')
 
     '''The Processing Step.
        This line actually reads the command line.
@@ -79,21 +187,93 @@ def main():
        I added a try/except block here. 
        Because if the user asks for n=1, l=2, the physics engine will raise a ValueError.
        We want to catch that error and print a nice message, not show a scary stack trace.'''
+    if args.cache:
+        from Visualization import cache
+        cache.enable(args.cache, int(args.cache_size * 2**20))
+
+    '''Headless mode.
+       With -o there is no window to open, so matplotlib switches to the Agg
+       backend (works without a display, e.g. on a server over ssh).'''
+    # output.py itself only needs numpy, and the except below needs its OutputFormatError
+    from Visualization import output
+    if getattr(args, 'output', None):
+        output.use_headless()
+
     try:
+        if getattr(args, 'output', None):
+            output.check_output(args.output)
+
         if args.command == 'shape':
-            plot_3d.render(args.n, args.l, args.m)
+            from Visualization import plot_3d
+            plot_3d.render(args.n, args.l, args.m, dtype=args.dtype, iso=args.iso, enclosed=args.enclosed,
+                           output_path=args.output)
             
         elif args.command == 'density':
-            plot_density.render(args.n, args.l, args.m)
+            from Visualization import plot_density
+            plot_density.render(args.n, args.l, args.m, dtype=args.dtype, radial_backend=args.radial,
+                                output_path=args.output)
             
         elif args.command == 'radial':
-            plot_radial.render(args.n, args.l)
+            from Visualization import plot_radial
+            plot_radial.render(args.n, args.l, dtype=args.dtype, log_scale=args.log, output_path=args.output)
+
+        elif args.command == 'wavepacket':
+            from Visualization import plot_wavepacket
+            states, coefficients = parse_states(args.state)
+            plot_wavepacket.render(states, coefficients, frames=args.frames,
+                                   duration=args.duration, dtype=args.dtype)
+
+        elif args.command == 'cloud':
+            from Visualization import plot_cloud
+            plot_cloud.render(args.n, args.l, args.m, points=args.points, seed=args.seed, dtype=args.dtype,
+                              output_path=args.output)
+
+        elif args.command == 'gallery':
+            from Visualization import gallery
+            gallery.build_gallery(args.out, args.n_max, args.modes, workers=args.workers,
+                                  extension='.' + args.format, resume=not args.fresh)
+
+        elif args.command == 'tiles':
+            from Visualization import tiles
+            output.use_headless()
+            tiles.build_tiles(args.out, args.n, args.l, args.m, resolution=args.resolution, tile=args.tile,
+                              image_format=args.format, dtype=args.dtype)
+
+        elif args.command == 'driven':
+            from Visualization import plot_dynamics
+            initial = tuple(int(p) for p in args.initial.split(','))
+            plot_dynamics.render(args.n_max, initial, args.field, args.omega, args.duration,
+                                 polarization=args.polarization, method=args.method,
+                                 show_density=args.density)
             
+        if args.cache:
+            stats = cache.active().stats()
+            print(f"Cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evicted, "
+                  f"{stats['entries']} entries ({stats['bytes'] / 2**20:.1f} MB)")
+
+    except output.OutputFormatError as e:
+        # A bad file name (e.g. -o x.txt) is not a physics mistake, so no l < n tip for it
+        print(f"\n❌ OUTPUT ERROR: {e}\n")
     except ValueError as e:
         print(f"\n❌ PHYSICS ERROR: {e}")
         print("Tip: Remember that l must be less than n, and |m| must be less than or equal to l.\n")
     except Exception as e:
         print(f"\n❌ UNEXPECTED ERROR: {e}\n")
 
+def parse_states(entries):
+    """
+    Turns ['1,0,0', '2,1,0,0.5,1'] into states [(1,0,0), (2,1,0)] and amplitudes [1, 0.5+1j].
+    """
+    states, coefficients = [], []
+    for entry in entries:
+        parts = entry.split(',')
+        if len(parts) not in (3, 4, 5):
+            raise ValueError(f"Bad --state '{entry}', expected n,l,m[,re[,im]]")
+        states.append(tuple(int(p) for p in parts[:3]))
+        re = float(parts[3]) if len(parts) > 3 else 1.0
+        im = float(parts[4]) if len(parts) > 4 else 0.0
+        coefficients.append(complex(re, im))
+    return states, coefficients
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,10 @@
+import os
+import sys
+
+import matplotlib
+
+'''The tests import Physics and Visualization the same way main.py does,
+   so the project root has to be on the path (run pytest from the project root).
+   Agg keeps any figure a test draws off the screen.'''
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+matplotlib.use('Agg')
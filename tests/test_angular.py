@@ -0,0 +1,51 @@
+import math
+
+import numpy as np
+import pytest
+
+from Physics.angular import angular_wavefunction, angular_wavefunction_all, lm_index
+from Physics.grid import Grid
+
+def test_missing_phi():
+    theta = np.linspace(0, np.pi, 7)
+    # m = 0 does not depend on phi, so leaving it out is fine
+    assert np.allclose(angular_wavefunction(1, 0, theta), math.sqrt(3 / (4 * math.pi)) * np.cos(theta))
+    with pytest.raises(ValueError, match='phi'):
+        angular_wavefunction(2, 1, 0.3)
+    with pytest.raises(ValueError, match='phi'):
+        angular_wavefunction_all(2, theta)
+
+def test_all_matches_single():
+    rng = np.random.default_rng(1)
+    theta, phi = rng.uniform(0, np.pi, 50), rng.uniform(0, 2 * np.pi, 50)
+    Y = angular_wavefunction_all(6, theta, phi)
+    for l in range(7):
+        for m in range(-l, l + 1):
+            assert np.allclose(Y[lm_index(l, m)], angular_wavefunction(l, m, theta, phi), atol=1e-13)
+
+def test_real_orbital_convention_and_orthonormality():
+    # no Condon-Shortley phase: Y_1,1 is +sqrt(3/4pi) x/r and Y_1,-1 is +sqrt(3/4pi) y/r
+    theta, phi = 0.7, 0.4
+    c = math.sqrt(3 / (4 * math.pi))
+    assert angular_wavefunction(1, 1, theta, phi) == pytest.approx(c * math.sin(theta) * math.cos(phi))
+    assert angular_wavefunction(1, -1, theta, phi) == pytest.approx(c * math.sin(theta) * math.sin(phi))
+
+    x, w = np.polynomial.legendre.leggauss(20)
+    phi = np.linspace(0, 2 * np.pi, 40, endpoint=False)
+    Y = angular_wavefunction_all(8, np.arccos(x)[:, np.newaxis], phi[np.newaxis, :]).reshape(81, -1)
+    weights = np.repeat(w, len(phi)) * 2 * np.pi / len(phi)
+    assert np.allclose((Y * weights) @ Y.T, np.eye(81), atol=1e-13)
+
+def test_separable_evaluation_matches_meshgrid():
+    # theta as a row and phi as a column (what Grid.shell and plot_3d use) give the same
+    # mesh as evaluating on the full meshgrid
+    resolution = 41
+    theta_axis, phi_axis = np.linspace(0, np.pi, resolution), np.linspace(0, 2 * np.pi, resolution)
+    theta, phi = np.meshgrid(theta_axis, phi_axis)
+    grid = Grid.shell(resolution)
+    for l in (0, 1, 4, 7):
+        for m in range(-l, l + 1):
+            reference = angular_wavefunction(l, m, theta, phi)
+            separable = angular_wavefunction(l, m, theta_axis[np.newaxis, :], phi_axis[:, np.newaxis])
+            assert np.allclose(np.broadcast_to(separable, theta.shape), reference, rtol=0, atol=1e-14)
+            assert np.allclose(angular_wavefunction(l, m, grid), reference, rtol=0, atol=1e-14)
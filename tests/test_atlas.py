@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from Physics import tables
+from Physics.atlas import build_atlas, load_atlas
+from Physics.radial import _log_normalization, radial_wavefunction
+
+def test_round_trip(tmp_path):
+    path = build_atlas(str(tmp_path / 'orbitals.atlas'), 5, rtol=1e-7, a0=2.0)
+    atlas = load_atlas(path, install=False)
+    assert sorted(atlas.states()) == [(n, l) for n in range(1, 6) for l in range(n)]
+    (tmp_path / 'bad').write_bytes(b'x' * 64)
+    with pytest.raises(ValueError, match='magic'):
+        load_atlas(str(tmp_path / 'bad'), install=False)
+
+    for n, l in atlas.states():
+        r = np.linspace(0, 6 * n * n * 2.0, 2001)
+        R = radial_wavefunction(n, l, r, a0=2.0)
+        peak = np.max(np.abs(R))
+        assert np.max(np.abs(atlas.table(n, l)(r) - R)) <= 1e-7 * peak
+        assert atlas.log_normalization(n, l) == _log_normalization(n, l, 2.0)
+
+        # node radii are absolute (same units as r, not divided by a0)
+        nodes = atlas.nodes(n, l)
+        assert len(nodes) == n - l - 1
+        assert np.all(np.abs(radial_wavefunction(n, l, nodes, a0=2.0)) <= 1e-9 * peak)
+
+def test_installed_atlas_serves_radial_table(tmp_path, monkeypatch):
+    atlas = load_atlas(build_atlas(str(tmp_path / 'orbitals.atlas'), 3), install=False)
+    monkeypatch.setattr(tables, '_atlases', [])
+    try:
+        tables.install_atlas(atlas)
+        assert tables.radial_table(3, 1) is atlas.table(3, 1)
+        assert tables.radial_table(4, 1) is not None  # not covered: built as usual
+        assert not atlas.covers(3, 1, rtol=1e-9)
+    finally:
+        tables.radial_table.cache_clear()
@@ -0,0 +1,25 @@
+import numpy as np
+
+from Visualization import cache, plot_radial
+from Visualization.cache import ArrayCache, code_version
+
+def test_dtype_spellings_share_one_key(tmp_path):
+    store = ArrayCache(str(tmp_path))
+    keys = {store.key('radial', n=2, l=1, dtype=d) for d in (None, 'float64', np.float64, np.dtype('f8'))}
+    assert len(keys) == 1
+    assert store.key('radial', n=2, l=1, dtype='float32') not in keys
+
+def test_producing_module_is_part_of_the_key(tmp_path):
+    store = ArrayCache(str(tmp_path))
+    assert code_version('Visualization.plot_radial') != code_version()
+    assert store.key('radial', 'Visualization.plot_radial', n=2) != store.key('radial', None, n=2)
+
+def test_render_hits_on_second_run(tmp_path):
+    store = cache.enable(str(tmp_path))
+    try:
+        first = plot_radial.render(3, 1, output_path=str(tmp_path / 'a.npy'))
+        second = plot_radial.render(3, 1, dtype='float64', output_path=str(tmp_path / 'b.npy'))
+    finally:
+        cache.disable()
+    assert (store.hits, store.misses) == (1, 1)
+    assert np.array_equal(first, second)
@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+'''Import budget of the command line.
+   Every mode imports only what it needs (see main.py), so a fresh interpreter
+   runs main.py with the given arguments and reports which heavy packages ended
+   up in sys.modules. A stray module-level import brings them straight back.'''
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('scipy', 'seaborn', 'pandas', 'matplotlib')
+
+def _loaded_after(*arguments):
+    script = ("import json, runpy, sys\n"
+              f"sys.argv = ['main.py'] + {list(arguments)!r}\n"
+              "try:\n"
+              "    runpy.run_path('main.py', run_name='__main__')\n"
+              "except SystemExit:\n"
+              "    pass\n"
+              "print(json.dumps(sorted({name.split('.')[0] for name in sys.modules})))\n")
+    environment = dict(os.environ)
+    environment.pop('MPLBACKEND', None)
+    environment.pop('HYDROGEN_CACHE', None)
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=environment,
+                            capture_output=True, text=True, timeout=120, check=True)
+    return set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+@pytest.mark.parametrize('arguments', [('--help',), ('radial', '--help')])
+def test_help_loads_no_heavy_packages(arguments):
+    assert _loaded_after(*arguments) & set(HEAVY) == set()
+
+def test_radial_data_output_loads_no_heavy_packages(tmp_path):
+    target = str(tmp_path / 'x.npy')
+    assert _loaded_after('radial', '-n', '3', '-l', '1', '-o', target) & set(HEAVY) == set()
+    assert os.path.exists(target)
+
+def test_density_data_output_skips_seaborn_and_scipy(tmp_path):
+    # seaborn is only for the colormap of a drawn picture, and the density math is numpy only
+    target = str(tmp_path / 'd.npy')
+    loaded = _loaded_after('density', '-n', '2', '-l', '1', '-m', '0', '-o', target)
+    assert loaded & {'scipy', 'seaborn', 'pandas'} == set()
+    assert os.path.exists(target)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from Physics.angular import angular_wavefunction_all, rotation_blocks
+from Physics.dynamics import DrivenAtom, oscillating_field
+from Physics.grid import Grid
+
+def test_rotation_blocks_rotate_the_harmonics():
+    angle = 1.1
+    R = np.array([[np.cos(angle), 0, np.sin(angle)], [0, 1, 0], [-np.sin(angle), 0, np.cos(angle)]])
+    blocks = rotation_blocks(6, R)
+    points = np.random.default_rng(3).normal(size=(3, 40))
+    points /= np.linalg.norm(points, axis=0)
+    Y = angular_wavefunction_all(6, Grid(*points, (40,)))
+    Y_moved = angular_wavefunction_all(6, Grid(*(R.T @ points), (40,)))
+    for l, U in enumerate(blocks):
+        rows = slice(l * l, (l + 1) ** 2)
+        assert np.allclose(U @ U.T, np.eye(2 * l + 1), atol=1e-12)
+        assert np.allclose(U.T @ Y[rows], Y_moved[rows], atol=1e-12)
+
+@pytest.mark.parametrize('polarization', ['x', [1, 1, 1], [0, 0, -1], [0.2, -0.5, 0.1]])
+def test_split_matches_krylov_for_any_polarization(polarization):
+    atom = DrivenAtom(4, polarization)
+    field = oscillating_field(2e-3, 0.375, ramp=50)
+    times = np.linspace(0, 150, 4)
+    split = atom.propagate((1, 0, 0), times, field, dt=0.05)['coefficients']
+    krylov = atom.propagate((1, 0, 0), times, field, dt=0.05, method='krylov')['coefficients']
+    assert np.max(np.abs(split - krylov)) < 1e-5
+
+def test_oblique_field_keeps_blocks_small():
+    # e = (1,1,1) used to put all 2870 states of n_max = 20 into one dense block
+    atom = DrivenAtom(20, [1, 1, 1])
+    _, V, _, rotation = atom._diagonalize()
+    assert rotation is not None
+    assert V.nnz < 0.05 * V.shape[0] ** 2
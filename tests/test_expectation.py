@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from Physics.expectation import most_probable_radius, radial_moment, radial_spread
+from Physics.radial import radial_wavefunction
+
+STATES = [(1, 0), (2, 1), (3, 0), (5, 2), (8, 7), (12, 4)]
+
+def _quadrature(n, l, k):
+    # <r^k> on a fine grid (the integrand is smooth and dies off well before 8 n^2)
+    r = np.linspace(0, 8 * n * n + 20, 400_001)[1:]
+    P = r * r * radial_wavefunction(n, l, r) ** 2
+    return np.trapezoid(P * r ** k, r)
+
+@pytest.mark.parametrize('n, l', STATES)
+def test_moments_match_quadrature(n, l):
+    for k in (-2, -1, 0, 1, 2, 3):
+        if k <= -2 * l - 2:
+            continue  # r^k near 0 needs a finer grid than this, checked by the closed form below
+        assert radial_moment(n, l, k) == pytest.approx(_quadrature(n, l, k), rel=1e-6)
+    assert radial_moment(n, l, 1) == pytest.approx((3 * n * n - l * (l + 1)) / 2, rel=1e-14)
+    assert radial_moment(n, l, -2) == pytest.approx(1 / (n ** 3 * (l + 0.5)), rel=1e-14)
+
+def test_vectorized_and_divergent():
+    n, l = np.array(STATES).T
+    assert np.allclose(radial_moment(n, l, 2), [radial_moment(*s, 2) for s in STATES], rtol=1e-15)
+    assert radial_moment(2, 0, -3) == np.inf
+    assert radial_spread(n, l) == pytest.approx(np.sqrt(radial_moment(n, l, 2) - radial_moment(n, l, 1) ** 2))
+    assert radial_moment(3, 1, 1, a0=2.0) == pytest.approx(2 * radial_moment(3, 1, 1))
+
+@pytest.mark.parametrize('n, l', STATES + [(40, 3), (100, 99)])
+def test_most_probable_radius_is_the_peak(n, l):
+    peak = most_probable_radius(n, l)
+    if l == n - 1:
+        assert peak == pytest.approx(n * n, rel=1e-12)
+    r = np.linspace(0, 3 * n * n + 20, 200_001)
+    P = r * r * radial_wavefunction(n, l, r) ** 2
+    assert peak == pytest.approx(r[np.argmax(P)], abs=2 * (r[1] - r[0]))
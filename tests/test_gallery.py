@@ -0,0 +1,21 @@
+import json
+import os
+
+from Visualization.gallery import build_gallery, gallery_jobs
+
+def test_resume_is_per_format(tmp_path):
+    folder = str(tmp_path)
+    first = build_gallery(folder, 2, modes=('radial',), workers=1, extension='.npy')
+    assert len(first) == len(gallery_jobs(2, ('radial',))) == 3
+    assert all(record['ok'] for record in first)
+
+    # Same format again: everything is already there
+    again = build_gallery(folder, 2, modes=('radial',), workers=1, extension='.npy')
+    assert [r['seconds'] for r in again] == [r['seconds'] for r in first]
+
+    # Another format is new work, not "done" because the .npy files exist
+    svg = build_gallery(folder, 2, modes=('radial',), workers=1, extension='.svg')
+    assert len(svg) == 3
+    assert all(record['path'].endswith('.svg') and os.path.exists(record['path']) for record in svg)
+    with open(os.path.join(folder, 'index.json')) as f:
+        assert [r['path'] for r in json.load(f)] == [r['path'] for r in svg]
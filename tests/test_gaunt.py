@@ -0,0 +1,78 @@
+import itertools
+import math
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from Physics.angular import angular_wavefunction
+from Physics.gaunt import GauntTable, gaunt_table, real_gaunt, wigner_3j
+from Physics.transitions import angular_dipole_factors
+
+def _exact_3j(j1, j2, j3, m1, m2, m3):
+    # Racah formula in exact rational arithmetic: the symbol squared is sum^2 * square
+    if (m1 + m2 + m3 != 0 or not abs(j1 - j2) <= j3 <= j1 + j2
+            or abs(m1) > j1 or abs(m2) > j2 or abs(m3) > j3):
+        return 0.0
+    f = math.factorial
+    square = Fraction(f(j1 + j2 - j3) * f(j1 - j2 + j3) * f(-j1 + j2 + j3), f(j1 + j2 + j3 + 1))
+    square *= f(j1 + m1) * f(j1 - m1) * f(j2 + m2) * f(j2 - m2) * f(j3 + m3) * f(j3 - m3)
+    total = Fraction(0)
+    for t in range(max(0, j2 - j3 - m1, j1 - j3 + m2), min(j1 + j2 - j3, j1 - m1, j2 + m2) + 1):
+        total += Fraction((-1) ** t, f(t) * f(j3 - j2 + t + m1) * f(j3 - j1 + t - m2)
+                          * f(j1 + j2 - j3 - t) * f(j1 - t - m1) * f(j2 - t + m2))
+    sign = (-1) ** (j1 - j2 - m3) * (1 if total >= 0 else -1)
+    return sign * math.sqrt(total * total * square)
+
+def test_3j_matches_exact_values():
+    cases = [(j1, j2, j3, m1, m2, -m1 - m2)
+             for j1, j2, j3 in itertools.product(range(5), repeat=3)
+             for m1 in range(-j1, j1 + 1) for m2 in range(-j2, j2 + 1)]
+    values = wigner_3j(*np.array(cases).T)
+    exact = np.array([_exact_3j(*case) for case in cases])
+    assert np.max(np.abs(values - exact)) <= 1e-14
+    assert wigner_3j(1, 1, 0, 0, 0, 0) == pytest.approx(-1 / math.sqrt(3), abs=1e-15)
+    # a small rank against big l, the case the GauntTable stores
+    assert wigner_3j(60, 2, 61, 7, -1, -6) == pytest.approx(_exact_3j(60, 2, 61, 7, -1, -6), abs=1e-14)
+
+def test_real_gaunt_matches_brute_force_quadrature():
+    # Gauss-Legendre in cos(theta) and the trapezoid rule in phi, on the real harmonics themselves
+    x, w = np.polynomial.legendre.leggauss(24)
+    phi = np.linspace(0, 2 * np.pi, 48, endpoint=False)
+    theta = np.arccos(x)[:, np.newaxis]
+
+    def Y(l, m):
+        return angular_wavefunction(l, m, theta, phi[np.newaxis, :])
+
+    rng = np.random.default_rng(3)
+    for _ in range(60):
+        l1, l2, l3 = rng.integers(0, 7, 3)
+        m1, m2, m3 = (int(rng.integers(-l, l + 1)) for l in (l1, l2, l3))
+        brute = np.sum(w[:, np.newaxis] * Y(l1, m1) * Y(l2, m2) * Y(l3, m3)) * 2 * np.pi / len(phi)
+        assert real_gaunt(l1, m1, l2, m2, l3, m3) == pytest.approx(brute, abs=1e-13)
+
+def test_rank_one_table_reproduces_dipole_factors():
+    # x/r, y/r, z/r are sqrt(4 pi / 3) times the real Y_1,1, Y_1,-1 and Y_1,0
+    table = GauntTable.build(8, 1)
+    scale = math.sqrt(4 * math.pi / 3)
+    for component, q in (('x', 1), ('y', -1), ('z', 0)):
+        l, m, m_prime, value = angular_dipole_factors(9)[component]
+        assert np.allclose(scale * table.lookup_gaunt(l, m, 1, q, l + 1, m_prime), value, rtol=0, atol=1e-14)
+
+def test_table_lookups_match_generators(tmp_path):
+    path = str(tmp_path / 'gaunt.npz')
+    table = gaunt_table(12, 3, path=path)
+    l1, k = np.meshgrid(np.arange(13), np.arange(4), indexing='ij')
+    rng = np.random.default_rng(5)
+    l1, k = l1.ravel(), k.ravel()
+    m1 = np.array([rng.integers(-l, l + 1) for l in l1])
+    q = np.array([rng.integers(-j, j + 1) for j in k])
+    l3 = np.abs(l1 - k) + 2 * np.array([rng.integers(0, j + 1) for j in np.minimum(l1, k)])
+    m3 = -m1 - q
+    assert np.allclose(table.lookup_3j(l1, m1, k, q, l3, m3), wigner_3j(l1, k, l3, m1, q, m3), atol=1e-15)
+    for m3 in (np.abs(m1) + np.abs(q), np.abs(np.abs(m1) - np.abs(q))):
+        m3 = np.where((m1 < 0) ^ (q < 0), -m3, m3)
+        assert np.allclose(table.lookup_gaunt(l1, m1, k, q, l3, m3), real_gaunt(l1, m1, k, q, l3, m3),
+                           atol=1e-15)
+    loaded = GauntTable.load(path)
+    assert np.array_equal(loaded.gaunt, table.gaunt) and np.array_equal(loaded.three_j, table.three_j)
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from Physics.isosurface import isosurface
+
+def _edge_counts(triangles):
+    # Vertices are matched by coordinates (shared edges are cut at the same point in both cubes)
+    _, vertex = np.unique(np.round(triangles.reshape(-1, 3), 9), axis=0, return_inverse=True)
+    vertex = vertex.reshape(-1, 3)
+    edges = np.sort(np.concatenate([vertex[:, [0, 1]], vertex[:, [1, 2]], vertex[:, [0, 2]]]), axis=1)
+    _, counts = np.unique(edges, axis=0, return_counts=True)
+    return counts
+
+@pytest.mark.parametrize('n, l, m', [(1, 0, 0), (2, 1, 0), (3, 2, 1), (4, 1, -1), (3, 0, 0)])
+def test_surface_is_watertight_and_matches_the_full_grid(n, l, m):
+    surface = isosurface(n, l, m, resolution=41)
+    triangles = surface['triangles']
+    assert len(triangles) > 0
+    # closed surface: every edge belongs to exactly two triangles
+    assert np.all(_edge_counts(triangles) == 2)
+    assert set(np.unique(surface['signs'])) <= {-1, 1}
+
+    # the coarse pass only skips work, the triangles are the same as evaluating every point
+    full = isosurface(n, l, m, resolution=41, refine=1)
+    assert surface['evaluated'] < 1
+    order = lambda t: np.sort(np.round(t.reshape(len(t), -1), 9), axis=0)
+    assert np.array_equal(order(triangles), order(full['triangles']))
@@ -0,0 +1,18 @@
+import sys
+
+import pytest
+
+import main
+
+@pytest.mark.parametrize('arguments, expected, unexpected', [
+    (['radial', '-n', '3', '-l', '1', '-o', 'x.txt'], 'OUTPUT ERROR', 'PHYSICS ERROR'),
+    (['radial', '-n', '1', '-l', '2', '-o', 'x.npy'], 'PHYSICS ERROR', 'OUTPUT ERROR'),
+])
+def test_bad_output_is_not_reported_as_physics(monkeypatch, capsys, tmp_path, arguments, expected, unexpected):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, 'argv', ['main.py'] + arguments)
+    main.main()
+    printed = capsys.readouterr().out
+    assert expected in printed and unexpected not in printed
+    assert ('l must be less than n' in printed) == (expected == 'PHYSICS ERROR')
+    assert not list(tmp_path.iterdir())
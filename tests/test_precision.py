@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from Physics.grid import Grid
+from Physics.precision import error_bound, measured_error, precision_note
+from Physics.wavefunction import psi_cartesian, wavefunction
+
+def _slice(n, l, m, dtype, resolution=201):
+    # psi on the plot_density slice (half width 5 n^2) plus the float64 reference from R_nl * Y_lm
+    range_a0 = 5 * n * n
+    lin = np.linspace(-range_a0, range_a0, resolution)
+    psi = psi_cartesian(n, l, m, lin[np.newaxis, :], 0, lin[:, np.newaxis], dtype=dtype)
+    reference = wavefunction(n, l, m, Grid.xz_slice(range_a0, resolution))
+    return psi, reference, np.sqrt(2) * range_a0
+
+@pytest.mark.parametrize('n, l, m', [(50, 48, 0), (60, 48, 3), (80, 36, 2), (30, 29, 29),
+                                     (100, 60, 0), (120, 80, 1)])
+def test_float32_high_l_is_finite_and_within_bound(n, l, m):
+    # inf * 0 used to turn whole regions of these slices into NaN, and a subnormal r^l
+    # next to the nucleus made the last two finite but wrong (errors up to 4e-2)
+    psi, reference, r_max = _slice(n, l, m, np.float32)
+    assert psi.dtype == np.float32
+    assert np.all(np.isfinite(psi))
+    error = np.max(np.abs(psi - reference)) / np.max(np.abs(reference))
+    assert error <= error_bound(n, l, np.float32, r_max)
+
+def test_measured_error_stays_under_bound():
+    result = measured_error(50, 48, 0, np.float32)
+    assert result['bound'] is not None
+    assert result['max_error'] <= result['bound']
+
+def test_non_finite_output_has_no_bound():
+    values = np.array([1.0, np.nan, np.inf])
+    assert error_bound(3, 1, np.float32, values=values) is None
+    note = precision_note(3, 1, np.float32, values=values)
+    assert '2 non-finite' in note and '<=' not in note
+    assert precision_note(3, 1, np.float64, values=values) is not None
+    assert precision_note(3, 1, np.float64, values=np.ones(3)) is None
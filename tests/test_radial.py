@@ -0,0 +1,64 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from Physics.radial import (log_radial_wavefunction, radial_wavefunction, radial_wavefunction_all,
+                            reduced_radial_wavefunction)
+from Physics.wavefunction import psi_cartesian
+
+@pytest.mark.parametrize('n, l', [(400, 399), (500, 499), (500, 450), (300, 0)])
+def test_rydberg_states_are_finite_without_warnings(n, l):
+    r = np.linspace(0, 8 * n * n, 4001)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        R = radial_wavefunction(n, l, r)
+        f = reduced_radial_wavefunction(n, l, r, length=n * n)
+    assert np.all(np.isfinite(R)) and np.all(np.isfinite(f))
+
+    # Both agree with the log form wherever that is a normal float64 number
+    log_R, sign = log_radial_wavefunction(n, l, r)
+    with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+        reference = sign * np.exp(log_R - l * np.log(r / (n * n)))
+    usable = np.isfinite(reference)
+    assert np.max(np.abs(R - sign * np.exp(log_R))) <= 1e-10 * np.max(np.abs(R))
+    assert np.max(np.abs(f - reference)[usable]) <= 1e-10 * np.max(np.abs(reference[usable]))
+
+@pytest.mark.parametrize('n, l, m', [(400, 399, 0), (500, 499, 0), (500, 450, 5)])
+def test_cartesian_rydberg_slice_is_finite(n, l, m):
+    range_a0 = 5 * n * n
+    lin = np.linspace(-range_a0, range_a0, 101)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        psi = psi_cartesian(n, l, m, lin[np.newaxis, :], 0, lin[:, np.newaxis])
+    assert np.all(np.isfinite(psi))
+    assert np.max(np.abs(psi)) > 0
+
+def _mpmath_radial(n, l, r):
+    mpmath = pytest.importorskip('mpmath')
+    with mpmath.workdps(60):
+        rho = mpmath.mpf(2) * r / n
+        norm = mpmath.sqrt((mpmath.mpf(2) / n) ** 3 * mpmath.factorial(n - l - 1)
+                           / (2 * n * mpmath.factorial(n + l)))
+        return float(norm * mpmath.exp(-rho / 2) * rho ** l * mpmath.laguerre(n - l - 1, 2 * l + 1, rho))
+
+@pytest.mark.parametrize('n, l', [(1, 0), (3, 1), (20, 5), (100, 0), (100, 60), (250, 120), (500, 0),
+                                  (500, 250), (500, 499)])
+def test_radial_matches_mpmath(n, l):
+    r = np.array([0.05, 0.1, 0.4, 1.0, 1.7, 2.6, 4.0]) * n * n
+    R = radial_wavefunction(n, l, r)
+    reference = np.array([_mpmath_radial(n, l, x) for x in r])
+    # absolute error against the size of the function (near a node only that is meaningful)
+    peak = np.max(np.abs(radial_wavefunction(n, l, np.linspace(0, 3 * n * n, 20001))))
+    assert np.max(np.abs(R - reference)) <= 1e-10 * peak
+
+def test_all_states_match_single_calls():
+    r = np.linspace(0, 400, 1001)
+    table = radial_wavefunction_all(12, r)
+    for n in range(1, 13):
+        for l in range(n):
+            single = radial_wavefunction(n, l, r)
+            assert np.max(np.abs(table[n - 1, l] - single)) <= 1e-12 * np.max(np.abs(single))
+        assert not np.any(table[n - 1, n:])
+    picked = radial_wavefunction_all(12, r, states=[(7, 3), (2, 0)])
+    assert np.array_equal(picked, table[[6, 1], [3, 0]])
@@ -0,0 +1,34 @@
+import numpy as np
+
+from Physics.radial import log_radial_wavefunction
+from Visualization import plot_3d, plot_radial
+
+def test_shape_has_no_radial_precision_note(tmp_path, capsys):
+    surface = plot_3d.render(3, 2, 1, resolution=20, dtype='float32', output_path=str(tmp_path / 's.npy'))
+    assert surface.shape == (3, 20, 20)
+    assert 'Precision' not in capsys.readouterr().out
+
+def test_isosurface_reports_precision(tmp_path, capsys):
+    surface = plot_3d.render(2, 1, 0, iso=True, dtype='float32', output_path=str(tmp_path / 'i.npy'))
+    assert len(surface['triangles']) > 0
+    assert 'Precision: float32' in capsys.readouterr().out
+    assert np.load(tmp_path / 'i.npy').shape[1:] == (3, 3)
+
+def test_log_radial_curve_skips_the_linear_path_and_keeps_dtype(monkeypatch):
+    linear = plot_radial._curve(3, 1, 47, 'float64', False)
+    calls = []
+    def spy(n, l, r, a0=1.0, dtype=None):
+        calls.append(dtype)
+        return log_radial_wavefunction(n, l, r, a0, dtype=dtype)
+    monkeypatch.setattr(plot_radial, 'radial_wavefunction', None)
+    monkeypatch.setattr(plot_radial, 'log_radial_wavefunction', spy)
+    # away from the nodes, where float32 loses every digit of a tiny P(r)
+    finite = linear[1] > 1e-6 * linear[1].max()
+    errors = {}
+    for dtype in ('float64', 'float32'):
+        r, log_P = plot_radial._curve(3, 1, 47, dtype, True)
+        errors[dtype] = np.max(np.abs(log_P[finite] - np.log10(linear[1][finite])))
+    assert calls == ['float64', 'float32']
+    assert errors['float64'] < 1e-12
+    # float32 really ran in single precision: close, but not float64 close
+    assert 1e-9 < errors['float32'] < 1e-4
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from Physics.expectation import radial_moment
+from Physics.sampling import iter_positions, sample_positions
+
+def test_same_points_streamed_in_one_array_and_on_threads():
+    reference = sample_positions(4, 2, -1, 50_000, seed=7, chunk_size=8192)
+    threaded = sample_positions(4, 2, -1, 50_000, seed=7, chunk_size=8192, workers=4)
+    streamed = np.concatenate(list(iter_positions(4, 2, -1, 50_000, seed=7, chunk_size=8192)))
+    assert np.array_equal(reference, threaded)
+    assert np.array_equal(reference, streamed)
+    positions, signs = sample_positions(4, 2, -1, 50_000, seed=7, chunk_size=8192, workers=3, signs=True)
+    assert np.array_equal(reference, positions) and set(np.unique(signs)) <= {-1, 1}
+
+@pytest.mark.parametrize('n, l, m', [(1, 0, 0), (3, 1, 1), (5, 3, -2)])
+def test_moments_match_closed_forms(n, l, m):
+    count = 400_000
+    positions = sample_positions(n, l, m, count, seed=11)
+    r = np.sqrt(np.sum(positions ** 2, axis=1))
+    for k in (1, 2):
+        spread = np.sqrt(radial_moment(n, l, 2 * k) - radial_moment(n, l, k) ** 2)
+        assert abs(np.mean(r ** k) - radial_moment(n, l, k)) <= 5 * spread / np.sqrt(count)
+    # the real orbitals have no preferred sign of x, y or z
+    assert np.all(np.abs(np.mean(positions, axis=0)) <= 5 * np.std(positions, axis=0) / np.sqrt(count))
+
+def test_float32_positions_follow_the_float64_draw():
+    single = sample_positions(2, 1, 0, 10_000, seed=2, dtype=np.float32)
+    double = sample_positions(2, 1, 0, 10_000, seed=2)
+    assert single.dtype == np.float32
+    assert np.array_equal(single, double.astype(np.float32))
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from Physics import spectrum
+from Physics.spectrum import broaden, line_list
+
+def test_lyman_alpha():
+    lines = line_list(2)
+    assert len(lines['wavelength']) == 1
+    assert lines['wavelength'][0] == pytest.approx(121.567, abs=2e-3)  # Rydberg formula, no fine structure
+    assert lines['f'][0] == pytest.approx(0.4162, abs=1e-4)
+    assert lines['A'][0] == pytest.approx(6.265e8, rel=1e-3)
+
+@pytest.mark.parametrize('profile', ['gaussian', 'lorentzian', 'voigt'])
+def test_fft_matches_window(profile):
+    grid = np.linspace(100, 700, 60001)
+    lines = line_list(12)
+    fft = broaden(grid, lines['wavelength'], lines['f'], profile, fwhm=0.5, method='fft')
+    window = broaden(grid, lines['wavelength'], lines['f'], profile, fwhm=0.5, method='window', window=400)
+    assert np.max(np.abs(fft - window)) <= 2e-3 * np.max(window)
+
+def test_window_warns_for_big_line_lists(monkeypatch):
+    monkeypatch.setattr(spectrum, 'WINDOW_MAX_LINES', 10)
+    grid = np.linspace(100, 200, 1001)
+    with pytest.warns(RuntimeWarning, match="method='fft'"):
+        broaden(grid, np.linspace(120, 180, 11), 1.0, method='window')
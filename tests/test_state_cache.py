@@ -0,0 +1,49 @@
+import numpy as np
+
+from Physics.cache import cache_stats, clear_caches, state_cache
+from Physics.radial import radial_wavefunction
+
+calls = []
+
+@state_cache(maxsize=2)
+def _constant(n, l):
+    calls.append((n, l))
+    return float(n * 10 + l)
+
+NAME = f"{__name__}._constant"
+
+def test_repeated_calls_hit_the_cache():
+    clear_caches()
+    calls.clear()
+    assert _constant(3, 1) == 31.0
+    assert _constant(3, 1) == 31.0
+    assert calls == [(3, 1)]
+    stats = cache_stats()[NAME]
+    assert (stats['hits'], stats['misses'], stats['size'], stats['maxsize']) == (1, 1, 1, 2)
+
+def test_bounded_and_cleared():
+    clear_caches()
+    calls.clear()
+    for state in [(1, 0), (2, 0), (3, 0), (1, 0)]:
+        _constant(*state)
+    # maxsize 2: (1, 0) was pushed out by (3, 0), so the last call is a miss again
+    assert calls == [(1, 0), (2, 0), (3, 0), (1, 0)]
+    assert cache_stats()[NAME]['size'] == 2
+
+    clear_caches()
+    stats = cache_stats()[NAME]
+    assert (stats['hits'], stats['misses'], stats['size']) == (0, 0, 0)
+    _constant(2, 0)
+    assert calls[-1] == (2, 0)  # recomputed after the clear
+
+def test_physics_constants_are_registered():
+    clear_caches()
+    r = np.linspace(0, 50, 101)
+    radial_wavefunction(4, 2, r)
+    before = cache_stats()
+    radial_wavefunction(4, 2, r)
+    after = cache_stats()
+    assert any(name.startswith('Physics.radial') for name in after)
+    # the second evaluation of the same state computes no constant again
+    assert all(after[name]['misses'] == s['misses'] for name, s in before.items())
+    assert sum(s['hits'] for s in after.values()) > sum(s['hits'] for s in before.values())
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from Physics.precision import error_bound
+from Physics.radial import radial_wavefunction
+from Physics.tables import radial_table
+from Physics.wavefunction import psi_cartesian
+
+STATES = [(3, 1), (10, 3), (40, 20), (60, 48), (100, 50), (100, 99), (150, 0), (300, 299)]
+
+@pytest.mark.parametrize('n, l', STATES)
+def test_table_matches_recurrence_in_both_precisions(n, l):
+    table = radial_table(n, l)
+    r = np.linspace(0, 1.2 * table.r_max, 20001)
+    exact = radial_wavefunction(n, l, r)
+    peak = np.max(np.abs(exact))
+    assert np.max(np.abs(table(r) - exact)) <= table.rtol * peak
+
+    # float32 never hands out inf/NaN, and only adds float32 rounding on top
+    single = table(r.astype(np.float32), dtype=np.float32)
+    assert single.dtype == np.float32
+    assert np.all(np.isfinite(single))
+    budget = table.rtol + error_bound(n, l, np.float32, r[-1])
+    assert np.max(np.abs(single - exact)) <= budget * peak
+
+@pytest.mark.parametrize('n, l', STATES)
+def test_reduced_float32_is_finite_where_it_fits(n, l):
+    # f itself can be past 3e38 next to the nucleus; everywhere else it must come out finite
+    table = radial_table(n, l)
+    r = np.linspace(0, table.r_max, 20001)
+    wide = table.reduced(r)
+    single = table.reduced(r.astype(np.float32), dtype=np.float32)
+    fits = np.abs(wide) < 0.5 * np.finfo(np.float32).max
+    assert np.all(np.isfinite(single[fits]))
+    assert np.all(~np.isnan(single))
+
+def test_table_backend_float32_slice():
+    n, l = 100, 50
+    lin = np.linspace(-5 * n * n, 5 * n * n, 201)
+    x, z = lin[np.newaxis, :], lin[:, np.newaxis]
+    psi = psi_cartesian(n, l, 0, x, 0, z, dtype=np.float32, radial_backend='table')
+    reference = psi_cartesian(n, l, 0, x, 0, z)
+    assert np.all(np.isfinite(psi))
+    error = np.max(np.abs(psi - reference)) / np.max(np.abs(reference))
+    assert error <= error_bound(n, l, np.float32, np.sqrt(2) * 5 * n * n)
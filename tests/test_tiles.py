@@ -0,0 +1,39 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from Physics.cache import cache_stats, clear_caches
+from Physics.tables import RadialTable, tail_radius
+from Physics.wavefunction import psi_cartesian
+from Visualization.tiles import build_tiles
+
+def test_float32_table_tiles_match_direct_evaluation(tmp_path):
+    # the default 'table' backend in float32 used to hand out NaN for high-l states like this one
+    n, l, m = 100, 50, 0
+    build_tiles(str(tmp_path), n, l, m, resolution=512, tile=128, image_format='npy', dtype='float32')
+    with open(os.path.join(tmp_path, 'tiles.json')) as f:
+        assert json.load(f)['levels'] == 3
+
+    full = np.block([[np.load(os.path.join(tmp_path, '2', f"{x}_{y}.npy")) for x in range(4)]
+                     for y in range(4)])
+    axis = np.linspace(-5 * n * n, 5 * n * n, 512)
+    direct = psi_cartesian(n, l, m, axis[np.newaxis, :], 0, axis[::-1, np.newaxis]) ** 2
+    assert np.all(np.isfinite(full))
+    assert np.max(np.abs(full - direct)) <= 1e-3 * np.max(direct)
+
+    top = np.load(os.path.join(tmp_path, '0', '0_0.npy'))
+    assert np.allclose(top, full.reshape(128, 4, 128, 4).mean(axis=(1, 3)), rtol=1e-5, atol=1e-7 * top.max())
+
+def test_resolution_below_one_tile_is_refused(tmp_path):
+    with pytest.raises(ValueError, match='at least one tile'):
+        build_tiles(str(tmp_path), 2, 1, 0, resolution=256, tile=512)
+
+def test_recurrence_tiles_build_no_radial_table(tmp_path):
+    # the tail radius used to come from radial_table(n, l).r_max, a whole table build for nothing
+    clear_caches()
+    build_tiles(str(tmp_path), 30, 5, 2, resolution=256, tile=128, image_format='npy',
+                radial_backend='recurrence')
+    assert cache_stats()['Physics.tables.radial_table']['misses'] == 0
+    assert tail_radius(30, 5) == RadialTable(30, 5).r_max
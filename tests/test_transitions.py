@@ -0,0 +1,46 @@
+import math
+
+import pytest
+
+from Physics.transitions import basis_index, dipole_matrices, radial_dipole_integrals
+
+def _exact_dipole(n, l, n2):
+    """
+    integral R_nl R_n2(l+1) r^3 dr in exact arithmetic: both radial functions are
+    polynomials times exp(-r/n), and integral r^p exp(-beta r) dr = p! / beta^(p+1).
+    """
+    mpmath = pytest.importorskip('mpmath')
+
+    def coefficients(n, l):
+        # R_nl = sum_i c_i r^(l+i) exp(-r/n)
+        norm = mpmath.sqrt((mpmath.mpf(2) / n) ** 3 * mpmath.factorial(n - l - 1)
+                           / (2 * n * mpmath.factorial(n + l)))
+        k, alpha = n - l - 1, 2 * l + 1
+        return [norm * (mpmath.mpf(2) / n) ** (l + i) * (-1) ** i * mpmath.binomial(k + alpha, k - i)
+                / mpmath.factorial(i) for i in range(k + 1)]
+
+    with mpmath.workdps(120):
+        beta = mpmath.mpf(1) / n + mpmath.mpf(1) / n2
+        total = mpmath.mpf(0)
+        for i, a in enumerate(coefficients(n, l)):
+            for j, b in enumerate(coefficients(n2, l + 1)):
+                p = 2 * l + i + j + 4
+                total += a * b * mpmath.factorial(p) / beta ** (p + 1)
+        return float(total)
+
+def test_radial_integrals_match_exact_arithmetic():
+    D = radial_dipole_integrals(40)
+    for n, l, n2 in [(1, 0, 2), (2, 1, 3), (5, 2, 9), (20, 3, 21), (30, 10, 40), (39, 20, 40),
+                     (39, 38, 40), (40, 38, 40), (12, 0, 40), (1, 0, 40)]:
+        assert D[n - 1, l, n2 - 1] == pytest.approx(_exact_dipole(n, l, n2), rel=1e-12)
+
+def test_lyman_alpha_matrix_elements():
+    # <2p|z|1s> = 128 sqrt(2) / 243, and the real 2p_x / 2p_y orbitals pair with x / y the same way
+    value = 128 * math.sqrt(2) / 243
+    matrices = dipole_matrices(2)
+    ground = basis_index(1, 0, 0)
+    for component, m in (('z', 0), ('x', 1), ('y', -1)):
+        M = matrices[component]
+        assert M[basis_index(2, 1, m), ground] == pytest.approx(value, rel=1e-13)
+        assert abs(M - M.T).max() == 0
+    assert matrices['z'][basis_index(2, 1, 1), ground] == 0
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from Physics.volume import evaluate_volume, iter_volume
+from Physics.wavefunction import psi_cartesian
+
+def test_slabs_match_one_evaluation(tmp_path):
+    n, l, m, resolution = 3, 2, -1, 33
+    lin = np.linspace(-45, 45, resolution)
+    reference = psi_cartesian(n, l, m, lin[np.newaxis, np.newaxis, :], lin[np.newaxis, :, np.newaxis],
+                              lin[:, np.newaxis, np.newaxis])
+
+    # a tiny budget forces many slabs
+    slabs = list(iter_volume(n, l, m, resolution=resolution, slab_bytes=64 * 2**10))
+    assert len(slabs) > 1 and slabs[-1][1] == resolution
+    assert np.allclose(np.concatenate([slab for _, _, slab in slabs]), reference, rtol=1e-13, atol=0)
+
+    path = str(tmp_path / 'density.npy')
+    evaluate_volume(n, l, m, resolution=resolution, density=True, path=path, slab_bytes=64 * 2**10)
+    assert np.allclose(np.load(path), reference ** 2, rtol=1e-12, atol=0)
+
+    with pytest.raises(ValueError):
+        evaluate_volume(n, l, m, resolution=resolution, out=np.empty((2, 2, 2)))
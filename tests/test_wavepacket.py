@@ -0,0 +1,29 @@
+import numpy as np
+
+from Physics.wavefunction import psi_cartesian
+from Physics.wavepacket import Wavepacket
+
+def test_frames_match_the_direct_sum():
+    states = [(1, 0, 0), (2, 1, 0), (2, 0, 0), (3, 2, 1)]
+    c = np.array([1, 0.5j, -0.3, 0.2 + 0.1j])
+    packet = Wavepacket(states, c, range_a0=30, resolution=41)
+    c = c / np.linalg.norm(c)
+    lin = np.linspace(-30, 30, 41)
+    x, z = lin[np.newaxis, :], lin[:, np.newaxis]
+    basis = [psi_cartesian(n, l, m, x, 0, z) for n, l, m in states]
+    energies = [-0.5 / (n * n) for n, _, _ in states]
+
+    times = np.linspace(0, 2 * packet.beat_period(), 7)
+    # a tiny batch budget so the frames come out of several products
+    for t, frame in packet.frames(times, batch_bytes=3 * 41 * 41 * 16):
+        psi = sum(ck * np.exp(-1j * E * t) * b for ck, E, b in zip(c, energies, basis))
+        assert np.allclose(frame, np.abs(psi) ** 2, rtol=1e-10, atol=1e-14)
+    assert np.allclose(packet.density(times[3]), dict(packet.frames(times))[times[3]])
+    # 2s and 2p share an energy, so there are three shells and the slowest beat is n=2 <-> n=3
+    assert len(packet.shell_energies) == 3
+    assert np.isclose(packet.beat_period(), 2 * np.pi / (0.5 / 4 - 0.5 / 9))
+
+def test_single_energy_is_stationary():
+    packet = Wavepacket([(2, 1, 1), (2, 0, 0)], [1, 1j], range_a0=20, resolution=21)
+    assert packet.beat_period() is None
+    assert np.allclose(packet.density(0.0), packet.density(123.4))